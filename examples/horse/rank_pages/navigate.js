@@ -10,18 +10,76 @@
 /* jshint esversion: 6 */
 
 
+/// requires 'rankworker.js'
+
+
+/// number of results presented on page
+const RESULTS_LIMIT = 200;
+
+/// callback waiting for weights script
+let WEIGHTS_CALLBACK = null;
+
+
 function start_navigate() {
-	const queryString = window.location.search;
-	const urlParams = new URLSearchParams(queryString);
-	const entries = urlParams.entries();
-	let nav_data = {};
-	for(const entry of entries) {
-		nav_data[ entry[0] ] = entry[1];
-	}
+	const nav_data = parse_nav_params(window.location.search);
 
     let target = document.getElementById("container");
-    let navigator = new Navigator(VALUES_DICT, WEIGHTS_DICT, CATEGORY_PAGE, DETAILS_PAGE, ANSWER_COLUMN, TRANSLATION_DICT);
-    target.innerHTML = navigator.generate_content(nav_data);
+    let navigator = new Navigator(VALUES_DICT, WEIGHTS_DICT, CATEGORY_PAGE, DETAILS_PAGE, ANSWER_COLUMN, TRANSLATION_DICT,
+                                  BITSETS_DICT, SHARDS_DICT);
+    /// weights are not embedded in page if results are precomputed - loaded on first full ranking
+    navigator.weights_path = WEIGHTS_PATH;
+    /// ranking is calculated in background worker if possible
+    navigator.use_worker = true;
+    navigator.init_ranking();
+    if ( Object.keys(nav_data).length > 0 || target.getAttribute("data-prerendered") !== "true" ) {
+    	/// initial state without filters is already rendered in page
+    	navigator.render(target, nav_data);
+    }
+
+    if ( navigator.rank_client === null && navigator.weights_dict !== null ) {
+    	return;
+    }
+    /// navigate without reloading page
+    target.addEventListener("click", function(event) {
+    	const link = event.target.closest("a.navlink");
+    	if ( link === null ) {
+    		return;
+    	}
+    	try {
+    		window.history.pushState(null, "", link.href);
+    	} catch (error) {
+    		/// e.g. not allowed for 'file://' - fallback to regular navigation
+    		return;
+    	}
+    	event.preventDefault();
+    	navigator.render(target, parse_nav_params(window.location.search));
+    });
+    window.addEventListener("popstate", function() {
+    	navigator.render(target, parse_nav_params(window.location.search));
+    });
+}
+
+
+/// returns dict: [category, list of selected values]
+/// matching mode is stored under MODE_PARAM key
+function parse_nav_params(query_string) {
+	const urlParams = new URLSearchParams(query_string);
+	let nav_data = {};
+	for (const entry of urlParams.entries()) {
+		const key = entry[0];
+		const value = entry[1];
+		if ( key == MODE_PARAM ) {
+			nav_data[key] = value;
+			continue;
+		}
+		if ( key in nav_data === false ) {
+			nav_data[key] = [];
+		}
+		if ( nav_data[key].includes(value) === false ) {
+			nav_data[key].push(value);
+		}
+	}
+	return nav_data;
 }
 
 
@@ -29,21 +87,123 @@ function start_navigate() {
 
 
 class Navigator {
-	constructor(values_dict, weights_dict, category_pages, detail_pages, answer_column, translation_dict) {
+	/// 'shards_dict' contains paths to precomputed results of single selected values
+	/// 'weights_dict' is null if weights have to be loaded from 'weights_path'
+	constructor(values_dict, weights_dict, category_pages, detail_pages, answer_column, translation_dict, bitsets_dict,
+				shards_dict) {
 		this.values_dict = values_dict;
 		this.weights_dict = weights_dict;
 		this.category_pages = category_pages;
 		this.detail_pages = detail_pages;
 		this.answer_column = answer_column;
 		this.translation_dict = translation_dict;
+		this.answer_list = [];
+		if ( answer_column in values_dict ) {
+			this.answer_list = values_dict[answer_column];
+		}
+		this.bitsets_dict = bitsets_dict;
+		this.ranker = new Ranker(this.answer_list, weights_dict, bitsets_dict);
+		this.rank_client = null;
+		this.use_worker = false;
+		this.weights_path = null;
+		this.weights_promise = null;
+		this.shards_dict = shards_dict || {};
+		this.render_counter = 0;
+	}
+
+	/// creates ranking objects if weights are available
+	init_ranking() {
+		if ( this.weights_dict === null ) {
+			return;
+		}
+		this.ranker = new Ranker(this.answer_list, this.weights_dict, this.bitsets_dict);
+		if ( this.use_worker ) {
+			this.rank_client = RankClient.create(this.answer_list, this.weights_dict, this.bitsets_dict);
+		}
+	}
+
+	/// returns promise resolved when weights are available
+	load_weights() {
+		if ( this.weights_dict !== null ) {
+			return Promise.resolve();
+		}
+		if ( this.weights_promise === null ) {
+			this.weights_promise = load_weights_script(this.weights_path).then((weights_dict) => {
+				this.weights_dict = weights_dict;
+				this.init_ranking();
+			});
+		}
+		return this.weights_promise;
 	}
 
 	generate_content(nav_data = {}) {
+		nav_data = normalize_nav_data(nav_data);
 		let content = this.generate_filter_table(nav_data);
 		content += this.generate_results(nav_data);
 		return content;
 	}
+
+	/// present content in 'target' element, ranking is calculated asynchronously if worker
+	/// or precomputed shard is available
+	render(target, nav_data = {}) {
+		nav_data = normalize_nav_data(nav_data);
+		this.render_counter += 1;
+		const render_id = this.render_counter;
+		const shard_path = this.get_shard_path(nav_data);
+		const sync_rank = (this.rank_client === null && this.weights_dict !== null && shard_path === null);
+		if ( get_filters(nav_data).length < 1 || sync_rank ) {
+			target.innerHTML = this.generate_content(nav_data);
+			return;
+		}
+		const filters_content = this.generate_filter_table(nav_data);
+		target.innerHTML = filters_content + this.generate_results_table("");
+		this.rank(nav_data, shard_path).then((result) => {
+			if ( result === null || render_id != this.render_counter ) {
+				/// query replaced by newer one
+				return;
+			}
+			const rows_content = this.generate_weighted_rows(result.weights_list, result.total);
+			target.innerHTML = filters_content + this.generate_results_table(rows_content);
+		});
+	}
 	
+	/// returns promise resolved with ranking result
+	/// precomputed shard is used if available, full ranking otherwise
+	rank(nav_data, shard_path = null) {
+		if ( shard_path !== null ) {
+			const mode = get_mode(nav_data);
+			return load_shard(shard_path).then(
+				(shard) => shard_to_result(shard, mode, RESULTS_LIMIT),
+				() => this.rank_full(nav_data)
+			);
+		}
+		return this.rank_full(nav_data);
+	}
+
+	rank_full(nav_data) {
+		return this.load_weights().then(() => {
+			if ( this.rank_client === null ) {
+				return this.ranker.rank(nav_data, RESULTS_LIMIT);
+			}
+			return this.rank_client.rank(nav_data, RESULTS_LIMIT);
+		});
+	}
+
+	/// shards exist only for single selected value
+	get_shard_path(nav_data) {
+		const filters = get_filters(nav_data);
+		if ( filters.length != 1 || filters[0][1].length != 1 ) {
+			return null;
+		}
+		const [category, values] = filters[0];
+		const category_shards = this.shards_dict[category] || {};
+		const shard_path = category_shards[values[0]];
+		if ( typeof shard_path === 'undefined' ) {
+			return null;
+		}
+		return shard_path;
+	}
+
 	generate_filter_table(nav_data) {
 		let content = "";
 		content += `<table cellspacing="0" class="filterstable">`;
@@ -60,19 +220,23 @@ class Navigator {
 		    	category_content = `<a href="${link_href}">${category_content}</a>`;
 			}
 
-	    	const nav_value = nav_data[option_key];
+	    	const nav_values = nav_data[option_key] || [];
 	    	let option_values = this.values_dict[option_key];
 			let link_list = [];
 	    	for (let option_index in option_values) {
 	    		const option_val = option_values[option_index];
+	    		const is_selected = contains_value(nav_values, option_val);
 	
 	    		let next_nav = deep_copy(nav_data);
-	    		if ( option_val == nav_value ) {
+	    		if ( is_selected ) {
 	    			/// remove
-	    			delete next_nav[ option_key ];
+	    			next_nav[ option_key ] = nav_values.filter(item => item != option_val);
+	    			if ( next_nav[ option_key ].length < 1 ) {
+	    				delete next_nav[ option_key ];
+	    			}
 	    		} else {
 	    			/// add
-		    		next_nav[ option_key ] = option_val;
+		    		next_nav[ option_key ] = nav_values.concat([option_val]);
 	    		}
 	    		
 	    		let val_label = option_val;
@@ -81,11 +245,11 @@ class Navigator {
 	    			val_label = `[${this.get_translation("empty")}]`;
 	    		}
 	    		const reqest_url = this.make_request_params(next_nav);
-	    		let link_style = "";
-	    		if ( nav_value == option_val ) {
-	    			link_style = `class="activeoption"`;
+	    		let link_style = "navlink";
+	    		if ( is_selected ) {
+	    			link_style += " activeoption";
 	    		}
-	    		link_list.push(`<a href='${reqest_url}' ${link_style}>${val_label}</a> `);
+	    		link_list.push(`<a href='${reqest_url}' class="${link_style}">${val_label}</a> `);
 	    	}
 
 			let separator = this.get_translation("filterseparator");
@@ -95,22 +259,57 @@ class Navigator {
 	    	const links_string = link_list.join(` ${separator} `);
 	    	content += `<tr> <td>${category_content}</td> <td>${links_string}</td> </tr>`;
 	    }
+	    if ( this.get_categories().length > 0 ) {
+	    	content += this.generate_mode_row(nav_data);
+	    }
 	    content += "</table>";
 	    return content;
 	}
+
+	generate_mode_row(nav_data) {
+		const curr_mode = get_mode(nav_data);
+		let link_list = [];
+		for (const mode of [MODE_RANK, MODE_FILTER]) {
+    		let next_nav = deep_copy(nav_data);
+			next_nav[MODE_PARAM] = mode;
+    		const reqest_url = this.make_request_params(next_nav);
+    		let link_style = "navlink";
+    		if ( mode == curr_mode ) {
+    			link_style += " activeoption";
+    		}
+    		let mode_label = "Rank";
+    		if ( mode == MODE_FILTER ) {
+    			mode_label = "Filter";
+    		}
+    		mode_label = this.get_translation(mode_label);
+    		link_list.push(`<a href='${reqest_url}' class="${link_style}">${mode_label}</a> `);
+		}
+		let separator = this.get_translation("filterseparator");
+		if ( separator === "filterseparator" ) {
+			separator = "|";
+		}
+		const links_string = link_list.join(` ${separator} `);
+		return `<tr> <td>${this.get_translation("Matching")}</td> <td>${links_string}</td> </tr>`;
+	}
+
+	get_categories() {
+		return Object.keys(this.values_dict).filter(key => key != this.answer_column);
+	}
 	
 	/// calculate and present weighted answers
 	generate_results(nav_data) {
+	    if (get_filters(nav_data).length < 1) {
+			return this.generate_results_table(this.find_simple_answer());
+	    }
+		return this.generate_results_table(this.find_weighted_answer(nav_data));
+	}
+
+	generate_results_table(rows_content) {
 		let content = "";
 		content += `<table cellspacing="0" class="resultstable">`;
 		content += `<tr> <th>${this.get_translation("Results")}:</th> </tr>`;
-	    if (Object.keys(nav_data).length < 1) {
-			content += this.find_simple_answer();
-	    } else {
-			content += this.find_weighted_answer(nav_data);
-		}
+		content += rows_content;
 		content += "</table>";
-// 	    content += `</div>`;
 	    return content;
 	}
 
@@ -133,32 +332,18 @@ class Navigator {
 	    return content;
 	}
 
+	/// list of pairs: [answer, weight percentage]
+	calculate_weights( nav_data ) {
+		return this.ranker.calculate_weights(normalize_nav_data(nav_data));
+	}
+
 	find_weighted_answer( nav_data ) {
-		const nav_length = Object.keys(nav_data).length;
-	    const answer_list = this.values_dict[this.answer_column];
-	    let weights_list = [];
-		for (let item_index in answer_list) {
-			let answer_weight = 0.0;
-			const answer_id = answer_list[item_index];
-			const answer_weights = WEIGHTS_DICT[answer_id];
-		    for (let nav_key in nav_data) {
-		    	const nav_value = nav_data[nav_key];
-				const weight_val = answer_weights[nav_key][nav_value];
-				answer_weight += weight_val;
-	        }
-	        answer_weight = answer_weight / nav_length * 100.0;
-	        weights_list.push([answer_id, answer_weight]);
-	    }
-	    weights_list.sort(function(item_a, item_b) {
-	    	if (item_a[1] < item_b[1]) {
-	    		return 1;
-	    	}
-	    	if (item_a[1] == item_b[1]) {
-	    		return item_a[0].localeCompare(item_b[0]);
-	    	}
-	    	return -1;
-	    });
-	
+		const result = this.ranker.rank(nav_data, RESULTS_LIMIT);
+		return this.generate_weighted_rows(result.weights_list, result.total);
+	}
+
+	/// present only best rows of results
+	generate_weighted_rows( weights_list, total ) {
 	    let content = "";
 		for (let item_index in weights_list) {
 			const item_data = weights_list[item_index];
@@ -176,6 +361,10 @@ class Navigator {
 			}
 			content += `<tr> <td>${item_content}</td> <td>${percent_val}%</td> ${photo_gallery}</tr>`;
 	    }
+	    if ( total > weights_list.length ) {
+	    	const more_num = total - weights_list.length;
+	    	content += `<tr> <td>${this.get_translation("More results")}: ${more_num}</td> <td></td> </tr>`;
+	    }
 	    return content;
 	}
 
@@ -203,7 +392,18 @@ class Navigator {
 		}
 		curr_url += window.location.pathname;
 		let url = new URL(curr_url);
-		url.search = new URLSearchParams(data_dict);
+		let params = new URLSearchParams();
+		for (const key in data_dict) {
+			const value = data_dict[key];
+			if ( Array.isArray(value) ) {
+				for (const item of value) {
+					params.append(key, item);
+				}
+			} else {
+				params.append(key, value);
+			}
+		}
+		url.search = params;
 		return url.toString();
 	}
 
@@ -233,12 +433,86 @@ function get_translation(translation_dict, key, group) {
 }
 
 
+/// returns promise resolved with content of shard file
+/// fetching can fail e.g. for 'file://' pages
+function load_shard(shard_path) {
+	if ( typeof fetch === 'undefined' ) {
+		return Promise.reject(new Error("fetch not supported"));
+	}
+	return fetch(shard_path).then((response) => {
+		if ( !response.ok ) {
+			throw new Error(`unable to load shard: ${shard_path}`);
+		}
+		return response.json();
+	});
+}
+
+
+/// weights are loaded as script, so pages work also from 'file://'
+/// returns promise resolved with weights dict
+function load_weights_script(weights_path) {
+	return new Promise((resolve, reject) => {
+		WEIGHTS_CALLBACK = resolve;
+		let script = document.createElement("script");
+		script.src = weights_path;
+		script.onerror = () => reject(new Error(`unable to load weights: ${weights_path}`));
+		document.head.appendChild(script);
+	});
+}
+
+
+/// called by loaded weights script
+function load_weights(weights_dict) {
+	if ( WEIGHTS_CALLBACK === null ) {
+		return;
+	}
+	WEIGHTS_CALLBACK(weights_dict);
+	WEIGHTS_CALLBACK = null;
+}
+
+
+/// shard contains ranking of single value, in filter mode only fully matching answers are presented
+function shard_to_result(shard, mode, limit) {
+	let weights_list = shard.weights_list;
+	let total = shard.total;
+	if ( mode == MODE_FILTER ) {
+		weights_list = weights_list.filter(item => item[1] >= 100.0);
+		total = shard.matching;
+	}
+	return {weights_list: weights_list.slice(0, limit), total: total};
+}
+
+
 function deep_copy(data) {
 	return JSON.parse(JSON.stringify(data));
 }
 
 
+/// ensure every filter is list of values
+function normalize_nav_data(nav_data) {
+	let ret_dict = {};
+	for (const key in nav_data) {
+		const value = nav_data[key];
+		if ( key == MODE_PARAM || Array.isArray(value) ) {
+			ret_dict[key] = value;
+		} else {
+			ret_dict[key] = [value];
+		}
+	}
+	return ret_dict;
+}
+
+
+function contains_value(values_list, value) {
+	/// values from URL are strings
+	return values_list.some(item => item == value);
+}
+
+
 /// exporting required by unit tests
 if (typeof exports !== 'undefined') {
 	exports.Navigator = Navigator;
+	exports.parse_nav_params = parse_nav_params;
+	exports.shard_to_result = shard_to_result;
+	exports.load_weights = load_weights;
 }
@@ -0,0 +1,346 @@
+//
+// Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+// All rights reserved.
+//
+// This source code is licensed under the BSD 3-Clause license found in the
+// LICENSE file in the root directory of this source tree.
+//
+
+
+/* jshint esversion: 8 */
+
+
+/// name of URL parameter holding matching mode
+const MODE_PARAM = "_mode";
+/// answer has to match at least one selected value of each category
+const MODE_FILTER = "filter";
+/// answers are ordered by weights of selected values
+const MODE_RANK = "rank";
+
+
+// ==========================================================
+
+
+/// calculates weights of answers for given filters
+class Ranker {
+	/// 'bitsets_dict' values can be base64 strings or ArrayBuffers
+	constructor(answer_list, weights_dict, bitsets_dict) {
+		this.answer_list = answer_list || [];
+		this.weights_dict = weights_dict;
+		this.bitsets_dict = bitsets_dict || {};
+		this.words_num = Math.ceil(this.answer_list.length / 32);
+		this.bitsets_cache = {};
+	}
+
+	/// returns object: {weights_list: list of pairs [answer, weight percentage], total: number of found answers}
+	/// only 'limit' best answers are returned
+	rank( nav_data, limit ) {
+		let weights_list = this.calculate_weights(nav_data);
+		sort_weights(weights_list);
+		const total = weights_list.length;
+		if ( typeof limit !== 'undefined' && limit !== null ) {
+			weights_list = weights_list.slice(0, limit);
+		}
+		return {weights_list: weights_list, total: total};
+	}
+
+	/// list of pairs: [answer, weight percentage]
+	/// weight of category with many selected values is the best weight of the values
+	calculate_weights( nav_data ) {
+		const filters = get_filters(nav_data);
+		const nav_length = filters.length;
+	    const answer_list = this.answer_list;
+	    let answer_indexes = null;
+	    if ( get_mode(nav_data) == MODE_FILTER ) {
+	    	answer_indexes = this.find_matching_indexes(filters);
+	    } else {
+	    	answer_indexes = Array.from(answer_list.keys());
+	    }
+	    let weights_list = [];
+		for (const item_index of answer_indexes) {
+			let answer_weight = 0.0;
+			const answer_id = answer_list[item_index];
+			const answer_weights = this.weights_dict[answer_id];
+		    for (const [nav_key, nav_values] of filters) {
+		    	const category_weights = answer_weights[nav_key];
+		    	let weight_val = 0.0;
+		    	for (const nav_value of nav_values) {
+		    		weight_val = Math.max(weight_val, category_weights[nav_value] || 0.0);
+		    	}
+				answer_weight += weight_val;
+	        }
+	        answer_weight = answer_weight / nav_length * 100.0;
+	        weights_list.push([answer_id, answer_weight]);
+	    }
+	    return weights_list;
+	}
+
+	/// evaluate filters using bitsets: OR of values inside category, AND between categories
+	find_matching_indexes( filters ) {
+	    const words_num = this.words_num;
+	    let result = new Uint32Array(words_num).fill(0xFFFFFFFF);
+	    for (const [nav_key, nav_values] of filters) {
+	    	let category_bits = new Uint32Array(words_num);
+	    	for (const nav_value of nav_values) {
+	    		const value_bits = this.get_bitset(nav_key, nav_value);
+	    		for (let i = 0; i < words_num; ++i) {
+	    			category_bits[i] |= value_bits[i];
+	    		}
+	    	}
+	    	for (let i = 0; i < words_num; ++i) {
+	    		result[i] &= category_bits[i];
+	    	}
+	    }
+	    let ret_list = [];
+	    if ( popcount_array(result) < 1 ) {
+	    	return ret_list;
+	    }
+	    for (let i = 0; i < this.answer_list.length; ++i) {
+	    	if ( (result[i >>> 5] >>> (i & 31)) & 1 ) {
+	    		ret_list.push(i);
+	    	}
+	    }
+	    return ret_list;
+	}
+
+	get_bitset(category, value) {
+		const key = JSON.stringify([category, value]);
+		if ( key in this.bitsets_cache ) {
+			return this.bitsets_cache[key];
+		}
+	    const answer_list = this.answer_list;
+		let bits = new Uint32Array(this.words_num);
+		const category_bitsets = this.bitsets_dict[category] || {};
+		const value_bitset = category_bitsets[value];
+		if ( typeof value_bitset === 'string' ) {
+			bits = decode_bitset(value_bitset, this.words_num);
+		} else if ( typeof value_bitset !== 'undefined' ) {
+			bits = new Uint32Array(value_bitset);
+		} else {
+			/// no bitsets given - calculate from weights
+			for (let i = 0; i < answer_list.length; ++i) {
+				const answer_weights = this.weights_dict[answer_list[i]][category] || {};
+				if ( answer_weights[value] == 1.0 ) {
+					bits[i >>> 5] |= (1 << (i & 31));
+				}
+			}
+		}
+		this.bitsets_cache[key] = bits;
+		return bits;
+	}
+}
+
+
+/// sort pairs [answer, weight] by descending weight and then by answer name
+function sort_weights(weights_list) {
+    weights_list.sort(function(item_a, item_b) {
+    	if (item_a[1] < item_b[1]) {
+    		return 1;
+    	}
+    	if (item_a[1] == item_b[1]) {
+    		return item_a[0].localeCompare(item_b[0]);
+    	}
+    	return -1;
+    });
+    return weights_list;
+}
+
+
+/// list of pairs: [category, list of values]
+function get_filters(nav_data) {
+	return Object.entries(nav_data).filter(entry => entry[0] != MODE_PARAM);
+}
+
+
+function get_mode(nav_data) {
+	if ( nav_data[MODE_PARAM] == MODE_FILTER ) {
+		return MODE_FILTER;
+	}
+	return MODE_RANK;
+}
+
+
+/// decode base64 string to Uint32Array
+function decode_bitset(data, words_num) {
+	const binary = atob(data);
+	let bytes = new Uint8Array(words_num * 4);
+	for (let i = 0; i < binary.length; ++i) {
+		bytes[i] = binary.charCodeAt(i);
+	}
+	return new Uint32Array(bytes.buffer);
+}
+
+
+function popcount(value) {
+	value = value - ((value >>> 1) & 0x55555555);
+	value = (value & 0x33333333) + ((value >>> 2) & 0x33333333);
+	return (((value + (value >>> 4)) & 0x0F0F0F0F) * 0x01010101) >>> 24;
+}
+
+
+function popcount_array(bits) {
+	let counter = 0;
+	for (let i = 0; i < bits.length; ++i) {
+		counter += popcount(bits[i]);
+	}
+	return counter;
+}
+
+
+// ==========================================================
+
+
+/// body of worker - executed inside worker context
+function rank_worker_main() {
+	let ranker = null;
+	/// only most recent query is processed, older queued queries are dropped
+	let pending_query = null;
+	let scheduled = false;
+
+	function process_query() {
+		scheduled = false;
+		const query = pending_query;
+		pending_query = null;
+		if ( query === null || ranker === null ) {
+			return;
+		}
+		const result = ranker.rank(query.nav_data, query.limit);
+		self.postMessage({type: "result", query_id: query.query_id, result: result});
+	}
+
+	self.onmessage = function(event) {
+		const message = event.data;
+		if ( message.type == "init" ) {
+			ranker = new Ranker(message.answer_list, message.weights_dict, message.bitsets_dict);
+			return;
+		}
+		if ( message.type == "rank" ) {
+			pending_query = message;
+			if ( scheduled === false ) {
+				/// let newer messages arrive before processing
+				scheduled = true;
+				setTimeout(process_query, 0);
+			}
+			return;
+		}
+		if ( message.type == "cancel" ) {
+			if ( pending_query !== null && pending_query.query_id <= message.query_id ) {
+				pending_query = null;
+			}
+		}
+	};
+}
+
+
+/// source of worker built from functions of this file
+/// Blob URL allows to start worker also from 'file://' pages
+function get_rank_worker_source() {
+	const items = [
+		`const MODE_PARAM = ${JSON.stringify(MODE_PARAM)};`,
+		`const MODE_FILTER = ${JSON.stringify(MODE_FILTER)};`,
+		`const MODE_RANK = ${JSON.stringify(MODE_RANK)};`,
+		Ranker.toString(),
+		sort_weights.toString(),
+		get_filters.toString(),
+		get_mode.toString(),
+		decode_bitset.toString(),
+		popcount.toString(),
+		popcount_array.toString(),
+		`(${rank_worker_main.toString()})();`
+	];
+	return items.join("\n\n");
+}
+
+
+/// main thread side of ranking worker
+class RankClient {
+	constructor(worker) {
+		this.worker = worker;
+		this.query_counter = 0;
+		this.pending = {};		/// dict: [query_id, resolve function]
+		this.worker.onmessage = (event) => this.on_message(event.data);
+	}
+
+	/// returns null if workers are not supported
+	static create(answer_list, weights_dict, bitsets_dict) {
+		if ( typeof Worker === 'undefined' || typeof Blob === 'undefined' || typeof URL === 'undefined' ) {
+			return null;
+		}
+		let worker = null;
+		try {
+			const blob = new Blob([get_rank_worker_source()], {type: "application/javascript"});
+			worker = new Worker(URL.createObjectURL(blob));
+		} catch (error) {
+			return null;
+		}
+		let client = new RankClient(worker);
+		client.init(answer_list, weights_dict, bitsets_dict);
+		return client;
+	}
+
+	/// send data to worker once, bitsets are transferred as ArrayBuffers
+	init(answer_list, weights_dict, bitsets_dict) {
+		const words_num = Math.ceil(answer_list.length / 32);
+		let buffers_dict = {};
+		let transfer_list = [];
+		for (const category in bitsets_dict) {
+			buffers_dict[category] = {};
+			for (const value in bitsets_dict[category]) {
+				const buffer = decode_bitset(bitsets_dict[category][value], words_num).buffer;
+				buffers_dict[category][value] = buffer;
+				transfer_list.push(buffer);
+			}
+		}
+		this.worker.postMessage({type: "init", answer_list: answer_list, weights_dict: weights_dict,
+								 bitsets_dict: buffers_dict}, transfer_list);
+	}
+
+	/// returns promise resolved with ranking result
+	/// or with null if query was replaced by newer one
+	rank(nav_data, limit) {
+		this.query_counter += 1;
+		const query_id = this.query_counter;
+		this.cancel_pending();
+		return new Promise((resolve) => {
+			this.pending[query_id] = resolve;
+			this.worker.postMessage({type: "rank", query_id: query_id, nav_data: nav_data, limit: limit});
+		});
+	}
+
+	cancel_pending() {
+		for (const query_id in this.pending) {
+			this.pending[query_id](null);
+			this.worker.postMessage({type: "cancel", query_id: Number(query_id)});
+		}
+		this.pending = {};
+	}
+
+	on_message(message) {
+		if ( message.type != "result" ) {
+			return;
+		}
+		const resolve = this.pending[message.query_id];
+		if ( typeof resolve === 'undefined' ) {
+			/// stale result
+			return;
+		}
+		delete this.pending[message.query_id];
+		resolve(message.result);
+	}
+}
+
+
+/// exporting required by unit tests
+if (typeof exports !== 'undefined') {
+	exports.MODE_PARAM = MODE_PARAM;
+	exports.MODE_FILTER = MODE_FILTER;
+	exports.MODE_RANK = MODE_RANK;
+	exports.Ranker = Ranker;
+	exports.RankClient = RankClient;
+	exports.sort_weights = sort_weights;
+	exports.get_filters = get_filters;
+	exports.get_mode = get_mode;
+	exports.decode_bitset = decode_bitset;
+	exports.popcount_array = popcount_array;
+	exports.get_rank_worker_source = get_rank_worker_source;
+}
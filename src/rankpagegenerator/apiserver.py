@@ -0,0 +1,340 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import logging
+
+import json
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import numpy
+
+from rankpagegenerator.generator.dataloader import DataLoader
+from rankpagegenerator.generator.dataframe import iter_dict_rows
+from rankpagegenerator.generator.modelreader import get_model_mtime
+from rankpagegenerator.generator.ranking import RankingEngine, parse_query, normalize_query, round_percent
+from rankpagegenerator.generator.prerender import MODE_PARAM
+from rankpagegenerator.generator.utils import to_js_string
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## name of URL parameter holding number of returned results
+LIMIT_PARAM = "_limit"
+
+
+## requested item (answer, category or value) does not exist in model
+class NotFoundError(LookupError):
+    pass
+
+
+class LRUCache:
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        ## returns None if item not found
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_size < 1:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def size(self):
+        with self._lock:
+            return len(self._items)
+
+
+##
+## Loaded model with ranking engine and cache of results.
+## State is immutable - reload creates new state.
+##
+class ModelState:
+    def __init__(self, model_path, cache_size=1024):
+        self.model_path = model_path
+        self.model_mtime = get_model_mtime(model_path)
+        self.data_loader = DataLoader(model_path)
+        self.engine = RankingEngine.create(self.data_loader)
+        self.cache = LRUCache(cache_size)
+        ## dict: [answer, index of row in model data]
+        self.rows_index = {}
+        for row_index, answer in enumerate(self.data_loader.get_answers_list()):
+            self.rows_index[to_js_string(answer)] = row_index
+        self.load_time = time.time()
+
+    def rank(self, query, limit=None):
+        query = canonical_query(query)
+        cache_key = json.dumps([query, limit])
+        result = self.cache.get(cache_key)
+        if result is not None:
+            return result
+        ranking = self.engine.rank(query, limit)
+        results = [[answer, round_percent(weight)] for answer, weight in ranking["weights_list"]]
+        result = {"query": query, "results": results, "total": ranking["total"]}
+        self.cache.put(cache_key, result)
+        return result
+
+    def get_values(self):
+        return self.data_loader.get_possible_values_dict()
+
+    def get_details(self, answer):
+        row_index = self.rows_index.get(answer)
+        if row_index is None:
+            raise NotFoundError(f"unknown answer: {answer}")
+        ## only requested row is converted
+        model_data = self.data_loader.model_data
+        return next(iter_dict_rows(model_data.iloc[row_index : row_index + 1]))
+
+    def get_category(self, category, value):
+        category_values = self.get_values().get(category)
+        if category_values is None or category == self.data_loader.get_answer_column_name():
+            raise NotFoundError(f"unknown category: {category}")
+        for category_value in category_values:
+            if to_js_string(category_value) == value:
+                return self.data_loader.get_matching_answers(category, category_value)
+        raise NotFoundError(f"unknown value: {value}")
+
+
+##
+## Collects latencies of requests.
+##
+class Metrics:
+    def __init__(self, samples_num=10000):
+        self.samples_num = samples_num
+        self.requests_num = 0
+        self.errors_num = 0
+        ## dict: [endpoint, latest latencies]
+        self._latency_dict = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, latency, error=False):
+        with self._lock:
+            self.requests_num += 1
+            if error:
+                self.errors_num += 1
+            samples = self._latency_dict.get(endpoint)
+            if samples is None:
+                samples = deque(maxlen=self.samples_num)
+                self._latency_dict[endpoint] = samples
+            samples.append(latency)
+
+    def get_latencies(self):
+        ## returns dict: [endpoint, latency percentiles in milliseconds]
+        with self._lock:
+            latency_dict = {endpoint: list(samples) for endpoint, samples in self._latency_dict.items()}
+        ret_dict = {}
+        for endpoint, samples in latency_dict.items():
+            percentiles = numpy.percentile(numpy.array(samples) * 1000.0, [50, 90, 99])
+            ret_dict[endpoint] = {
+                "count": len(samples),
+                "p50": float(percentiles[0]),
+                "p90": float(percentiles[1]),
+                "p99": float(percentiles[2]),
+                "max": float(max(samples)) * 1000.0,
+            }
+        return ret_dict
+
+
+##
+## HTTP server processing requests in fixed pool of threads.
+##
+class PooledHTTPServer(HTTPServer):
+    def __init__(self, server_address, handler_class, workers_num=8):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers_num, thread_name_prefix="api")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # pylint: disable=broad-except
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+##
+## JSON API giving access to ranking of model.
+##
+## Endpoints:
+##   /rank?<filters>      - ranking, filters as on main page, optionally with '_limit'
+##   /values              - possible values of categories
+##   /details?answer=<a>  - parameters of answer
+##   /category?name=<c>&value=<v> - answers having value in category
+##   /metrics             - requests statistics
+##
+## Model file is checked periodically and reloaded in background when changed.
+## Requests are served with previous model until new one is loaded.
+##
+class RankServer:
+    def __init__(self, model_path, host="127.0.0.1", port=8080, workers_num=8, cache_size=1024, reload_interval=2.0):
+        self.model_path = model_path
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self.reloads_num = 0
+        self.state = ModelState(model_path, cache_size)
+        self.metrics = Metrics()
+        self.start_time = time.time()
+
+        self._stop_event = threading.Event()
+        self._watcher = None
+        handler_class = create_handler_class(self)
+        self.http_server = PooledHTTPServer((host, port), handler_class, workers_num)
+
+    def get_address(self):
+        return self.http_server.server_address
+
+    def serve_forever(self):
+        self.start_watcher()
+        host, port = self.get_address()[:2]
+        _LOGGER.info("serving API on http://%s:%s", host, port)
+        try:
+            self.http_server.serve_forever()
+        finally:
+            self.stop_watcher()
+            self.http_server.server_close()
+
+    def shutdown(self):
+        self.http_server.shutdown()
+
+    def start_watcher(self):
+        if self.reload_interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch_model, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def reload(self):
+        ## load new model and replace state, keep previous state on failure
+        try:
+            new_state = ModelState(self.model_path, self.cache_size)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("unable to reload model %s", self.model_path)
+            return False
+        self.state = new_state
+        self.reloads_num += 1
+        _LOGGER.info("model reloaded: %s", self.model_path)
+        return True
+
+    def _watch_model(self):
+        while not self._stop_event.wait(self.reload_interval):
+            if get_model_mtime(self.model_path) != self.state.model_mtime:
+                self.reload()
+
+    def handle(self, path, query_string=""):
+        ## returns pair: HTTP status, response dict
+        try:
+            return self._handle_request(path, query_string)
+        except NotFoundError as exc:
+            return 404, {"error": str(exc)}
+        except (KeyError, ValueError) as exc:
+            return 400, {"error": str(exc).strip("'\"")}
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("unable to handle request %s?%s", path, query_string)
+            return 500, {"error": "internal server error"}
+
+    def _handle_request(self, path, query_string):
+        state = self.state
+        params_list = parse_qsl(query_string, keep_blank_values=True)
+        params = dict(params_list)
+        if path == "/rank":
+            limit = params.get(LIMIT_PARAM)
+            if limit is not None:
+                limit = int(limit)
+            ## filters can be repeated
+            filters_list = [item for item in params_list if item[0] != LIMIT_PARAM]
+            query = parse_query(urlencode(filters_list))
+            return 200, state.rank(query, limit)
+        if path == "/values":
+            return 200, state.get_values()
+        if path == "/details":
+            return 200, state.get_details(params.get("answer", ""))
+        if path == "/category":
+            return 200, {"answers": state.get_category(params.get("name", ""), params.get("value", ""))}
+        if path == "/metrics":
+            return 200, self.get_metrics()
+        return 404, {"error": f"unknown endpoint: {path}"}
+
+    def get_metrics(self):
+        state = self.state
+        return {
+            "uptime": time.time() - self.start_time,
+            "requests": self.metrics.requests_num,
+            "errors": self.metrics.errors_num,
+            "reloads": self.reloads_num,
+            "model_load_time": state.load_time,
+            "cache": {"size": state.cache.size(), "hits": state.cache.hits, "misses": state.cache.misses},
+            "latency_ms": self.metrics.get_latencies(),
+        }
+
+
+def create_handler_class(server: RankServer):
+    class RequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            start_time = time.perf_counter()
+            url = urlsplit(self.path)
+            status, response = server.handle(url.path, url.query)
+            self._send_json(status, response)
+            server.metrics.add(url.path, time.perf_counter() - start_time, error=status >= 400)
+
+        def _send_json(self, status, response):
+            content = json.dumps(response).encode("utf8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            _LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+    return RequestHandler
+
+
+def canonical_query(query) -> dict:
+    ## equal queries have equal representation (used as cache key)
+    query = normalize_query(query)
+    ret_dict = {}
+    for key in sorted(query.keys()):
+        value = query[key]
+        if key != MODE_PARAM:
+            value = sorted(value)
+        ret_dict[key] = value
+    return ret_dict
@@ -0,0 +1,150 @@
+//
+// Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+// All rights reserved.
+//
+// This source code is licensed under the BSD 3-Clause license found in the
+// LICENSE file in the root directory of this source tree.
+//
+
+
+/* jshint esversion: 6 */
+
+
+/// callbacks waiting for shards, dict: [shard index, callback]
+let DETAILS_SHARD_CALLBACKS = {};
+
+
+function start_details() {
+	const item_id = parse_details_id(window.location.search);
+	let target = document.getElementById("details");
+	render_navigation(item_id);
+	if ( item_id === null ) {
+		target.innerHTML = "";
+		return;
+	}
+	const shard_index = Math.floor(item_id / DETAILS_CONFIG.shard_size);
+	request_details_shard(shard_index, function(items_list) {
+		const item = items_list[item_id - shard_index * DETAILS_CONFIG.shard_size];
+		if ( DETAILS_CONFIG.page_title ) {
+			document.title = `${item.answer} - ${DETAILS_CONFIG.page_title}`;
+		}
+		target.innerHTML = render_details(item);
+	});
+}
+
+
+/// returns content of details of answer (the same as content of separate details pages)
+function render_details(item) {
+	let content = `<div class="characteristics bottomspace">\n${render_characteristics(item.rows)}\n</div>\n`;
+	content += render_similar(item.similar);
+	content += render_photos(item.photos);
+	return content;
+}
+
+
+/// 'rows_list' - list of pairs [parameter, list of values], links are objects: {href: link}
+function render_characteristics(rows_list) {
+	let content = `<table cellspacing="0">\n${DETAILS_CONFIG.table_header}`;
+	for (const [key, values_list] of rows_list) {
+		let value_content = values_list.map(function(value) {
+			if ( typeof value === 'object' ) {
+				return `<a href="${value.href}">${value.href}</a>`;
+			}
+			return value;
+		}).join(", ");
+		if ( value_content === "" ) {
+			value_content = DETAILS_CONFIG.empty_value;
+		}
+		content += `<tr> <td>${key}</td> <td>${value_content}</td> </tr>\n`;
+	}
+	content += "</table>";
+	return content;
+}
+
+
+/// 'similar_list' - list of triples [answer, similarity percent, URL of details]
+function render_similar(similar_list) {
+	if ( !similar_list ) {
+		return "";
+	}
+	let content = `<div class="similar bottomspace">\n<table cellspacing="0" class="similartable">\n`;
+	content += `<tr> <th>${DETAILS_CONFIG.similar_label}:</th> </tr>\n`;
+	for (const [answer, percent, url] of similar_list) {
+		let answer_content = answer;
+		if ( url ) {
+			answer_content = `<a href="${url}">${answer}</a>`;
+		}
+		content += `<tr> <td>${answer_content}</td> <td>${percent}%</td> </tr>\n`;
+	}
+	content += "</table>\n</div>\n";
+	return content;
+}
+
+
+/// 'photos_list' - list of pairs [photo path, license content or null]
+function render_photos(photos_list) {
+	if ( !photos_list ) {
+		return "";
+	}
+	let content = `<div class="photogallery bottomspace">\n<div class="photostitle">${DETAILS_CONFIG.photos_label}:</div>\n`;
+	for (const [img_path, license_content] of photos_list) {
+		let license_div = "";
+		if ( license_content !== null ) {
+			license_div = `<div class="license"><div>${DETAILS_CONFIG.license_label}:</div>${license_content}</div>`;
+		}
+		content += `<div class="imgtile">\n    <a href="${img_path}"><img src="${img_path}"></a>\n    ${license_div}\n</div>\n`;
+	}
+	content += "</div>";
+	return content;
+}
+
+
+/// returns index of item or null if invalid
+function parse_details_id(query_string) {
+	const urlParams = new URLSearchParams(query_string);
+	const item_id = Number(urlParams.get("id"));
+	if ( !Number.isInteger(item_id) || item_id < 0 || item_id >= DETAILS_CONFIG.items_num ) {
+		return null;
+	}
+	return item_id;
+}
+
+
+function render_navigation(item_id) {
+	let prev_link = DETAILS_CONFIG.prev_label;
+	if ( item_id !== null && item_id > 0 ) {
+		prev_link = `<a href="details.html?id=${item_id - 1}">${prev_link}</a>`;
+	}
+	let next_link = DETAILS_CONFIG.next_label;
+	if ( item_id !== null && item_id < DETAILS_CONFIG.items_num - 1 ) {
+		next_link = `<a href="details.html?id=${item_id + 1}">${next_link}</a>`;
+	}
+	document.getElementById("prevlink").innerHTML = prev_link;
+	document.getElementById("nextlink").innerHTML = next_link;
+}
+
+
+/// shards are loaded as scripts, so pages work also from 'file://'
+function request_details_shard(shard_index, callback) {
+	DETAILS_SHARD_CALLBACKS[shard_index] = callback;
+	let script = document.createElement("script");
+	script.src = DETAILS_CONFIG.shards_list[shard_index];
+	document.head.appendChild(script);
+}
+
+
+/// called by loaded shard script
+function load_details_shard(shard_index, items_list) {
+	const callback = DETAILS_SHARD_CALLBACKS[shard_index];
+	if ( typeof callback === 'undefined' ) {
+		return;
+	}
+	delete DETAILS_SHARD_CALLBACKS[shard_index];
+	callback(items_list);
+}
+
+
+/// exporting required by unit tests
+if (typeof exports !== 'undefined') {
+	exports.render_details = render_details;
+}
@@ -0,0 +1,169 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import json
+from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+
+from rankpagegenerator import logger
+from rankpagegenerator import progress
+from rankpagegenerator.generator.jsgen import generate_pages, BuildOptions
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## keys of manifest entry with default values (the same as options of 'generate' tool)
+ENTRY_DEFAULTS = {
+    "translation": None,
+    "outdir": None,
+    "archive": None,
+    "embedscripts": False,
+    "nophotos": False,
+    "precompress": False,
+    "hashassets": False,
+    "resultshards": 0,
+    "similaritems": 0,
+    "detailsshardsize": 0,
+    "datachunksize": 0,
+    "templatesdir": None,
+    "missingtranslations": None,
+}
+
+## keys of entry containing paths (relative to manifest directory)
+PATH_KEYS = ["model", "translation", "outdir", "archive", "templatesdir", "missingtranslations"]
+
+
+## manifest is JSON list of entries (or object with 'models' list), e.g.:
+##     [{"model": "horse/model.xls", "translation": "horse/pl.json", "outdir": "out/horse"}]
+## returns list of entries with all keys set
+def load_manifest(manifest_path) -> List[Dict]:
+    with open(manifest_path, "r", encoding="utf8") as fp:
+        manifest_data = json.load(fp)
+    if isinstance(manifest_data, dict):
+        manifest_data = manifest_data.get("models", [])
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    entries_list = []
+    for index, item in enumerate(manifest_data):
+        if not item.get("model"):
+            raise ValueError(f"missing 'model' in entry {index} of manifest {manifest_path}")
+        unknown_keys = set(item.keys()) - set(ENTRY_DEFAULTS.keys()) - {"model", "name"}
+        if unknown_keys:
+            raise ValueError(f"unknown keys {sorted(unknown_keys)} in entry {index} of manifest {manifest_path}")
+        entry = dict(ENTRY_DEFAULTS)
+        entry.update(item)
+        for key in PATH_KEYS:
+            entry[key] = resolve_path(entry[key], base_dir)
+        if not entry["outdir"] and not entry["archive"]:
+            raise ValueError(f"missing 'outdir' or 'archive' in entry {index} of manifest {manifest_path}")
+        if not entry.get("name"):
+            entry["name"] = item["model"]
+        entries_list.append(entry)
+    return entries_list
+
+
+def resolve_path(path, base_dir):
+    if path is None:
+        return None
+    if isinstance(path, list):
+        return [resolve_path(item, base_dir) for item in path]
+    return os.path.join(base_dir, path)
+
+
+## builds are executed in worker processes (modules are imported once for each worker)
+## failure of single build does not stop other builds
+## returns list of results in order of entries
+def generate_batch(entries_list, workers_num=None) -> List[Dict]:
+    records_queue, listener = logger.start_workers_listener()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers_num, initializer=init_worker, initargs=(records_queue, logging.root.level)
+        ) as executor:
+            futures_list = [executor.submit(build_entry, entry) for entry in entries_list]
+            results_list = []
+            for entry, future in zip(entries_list, futures_list):
+                try:
+                    results_list.append(future.result())
+                except Exception as exc:  # pylint: disable=broad-except
+                    ## worker process crashed
+                    _LOGGER.error("build of model %s failed: %s", entry["name"], exc)
+                    results_list.append(create_result(entry["name"], str(exc)))
+    finally:
+        if listener is not None:
+            listener.stop()
+    return results_list
+
+
+def init_worker(records_queue, log_level):
+    logger.configure_worker(records_queue, log_level)
+
+
+## executed in worker process
+def build_entry(entry) -> Dict:
+    ## each build has own progress reporter, so stages of builds are not mixed
+    reporter = progress.configure(tty=False)
+    _LOGGER.info("building model %s", entry["name"])
+    error = None
+    try:
+        options = BuildOptions(
+            embed=is_enabled(entry["embedscripts"]),
+            nophotos=is_enabled(entry["nophotos"]),
+            archive_path=entry["archive"],
+            precompress=is_enabled(entry["precompress"]),
+            hashassets=is_enabled(entry["hashassets"]),
+            shards_limit=int(entry["resultshards"]),
+            similar_num=int(entry["similaritems"]),
+            details_shard_size=int(entry["detailsshardsize"]),
+            data_chunk_size=int(entry["datachunksize"]),
+            templates_dir=entry["templatesdir"],
+            missing_translations_path=entry["missingtranslations"],
+        )
+        generate_pages(entry["model"], entry["translation"], entry["outdir"], options)
+    except Exception as exc:  # pylint: disable=broad-except
+        _LOGGER.exception("build of model %s failed", entry["name"])
+        error = str(exc)
+    summary_dict = reporter.get_summary()
+    return create_result(entry["name"], error, summary_dict["duration"], summary_dict["stages"])
+
+
+def create_result(name, error=None, duration=None, stages_list=None) -> Dict:
+    return {
+        "name": name,
+        "status": "failed" if error is not None else "ok",
+        "error": error,
+        "duration": duration,
+        "stages": stages_list if stages_list is not None else [],
+    }
+
+
+def is_enabled(value):
+    ## values of options can be given as booleans or strings (like in command line)
+    if isinstance(value, str):
+        return value.lower() not in ("false", "0", "")
+    return bool(value)
+
+
+## returns text table with time of each build and its slowest stage
+def format_results_table(results_list) -> str:
+    rows_list = [["model", "status", "time [s]", "slowest stage"]]
+    for result in results_list:
+        duration = result["duration"]
+        duration_text = f"{duration:.2f}" if duration is not None else "-"
+        slowest_text = "-"
+        if result["stages"]:
+            slowest = max(result["stages"], key=lambda stage: stage["duration"])
+            slowest_text = f"{slowest['name']} ({slowest['duration']:.2f}s)"
+        rows_list.append([result["name"], result["status"], duration_text, slowest_text])
+    widths = [max(len(row[col]) for row in rows_list) for col in range(0, 4)]
+    lines_list = []
+    for row in rows_list:
+        lines_list.append("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+    return "\n".join(lines_list)
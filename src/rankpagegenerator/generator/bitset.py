@@ -0,0 +1,48 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import logging
+import base64
+
+import numpy
+
+from rankpagegenerator.generator.dataloader import DataLoader
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## returns dict: [category, cat_value, encoded bitset]
+## bit 'n' of bitset is set if n-th answer (in order of possible answers) has given category value
+def calculate_values_bitsets(data_loader: DataLoader):
+    values_dict = data_loader.get_possible_values_dict()
+    answer_column_id = data_loader.get_answer_column_name()
+    answers_list = values_dict.get(answer_column_id, [])
+    answers_num = len(answers_list)
+
+    ret_dict = {}
+    for column_name, column_values in values_dict.items():
+        if column_name == answer_column_id:
+            continue
+        bits_dict = {value: numpy.zeros(answers_num, dtype=bool) for value in column_values}
+        for answer_index, answer_value in enumerate(answers_list):
+            answer_weights = data_loader.weights_dict.get(answer_value, {})
+            col_weights = answer_weights.get(column_name, {})
+            for value, weight in col_weights.items():
+                if weight == 1.0 and value in bits_dict:
+                    bits_dict[value][answer_index] = True
+        ret_dict[column_name] = {value: encode_bitset(bits) for value, bits in bits_dict.items()}
+    return ret_dict
+
+
+def encode_bitset(bits_array) -> str:
+    ## encode bool array as base64 string of little-endian Uint32 array
+    words_num = (len(bits_array) + 31) // 32
+    packed = numpy.packbits(bits_array, bitorder="little")
+    data = packed.tobytes().ljust(words_num * 4, b"\x00")
+    return base64.b64encode(data).decode("ascii")
@@ -8,7 +8,7 @@
 
 import logging
 
-import json
+import numpy
 import pandas
 from pandas.core.frame import DataFrame
 
@@ -16,44 +16,51 @@ from pandas.core.frame import DataFrame
 _LOGGER = logging.getLogger(__name__)
 
 
-def load_table_from_excel(data_path, marker, assume_default=False, sheet_index=0) -> DataFrame:
-    xl = pandas.ExcelFile(data_path)
-    try:
+def load_table_from_excel(data_path, marker, assume_default=False, sheet_index=0, engine=None) -> DataFrame:
+    content = read_sheet(data_path, sheet_index, engine)
+    if content is None:
+        return None
+    return extract_table(content, marker, assume_default)
+
+
+## returns content of sheet as strings (first row is header) or None if sheet not exists
+def read_sheet(data_path, sheet_index=0, engine=None) -> DataFrame:
+    with pandas.ExcelFile(data_path, engine=engine) as xl:
         sheets_num = len(xl.sheet_names)
         if sheet_index >= sheets_num:
             return None
-
         content: DataFrame = pandas.read_excel(io=xl, sheet_name=sheet_index)
-        content = content.astype(str)
+        return content.astype(str)
 
-        first_col = content.iloc[:, 0]
-        data_item = first_col.loc[first_col == marker]
-        if data_item.empty:
-            # marker not found
-            if assume_default is False:
-                return None
-            model_data = content
 
-        else:
-            # marker found
+## returns table placed below 'marker' in first column of sheet content
+## 'content' is not modified, so it can be shared by many calls
+def extract_table(content: DataFrame, marker, assume_default=False) -> DataFrame:
+    first_col = content.iloc[:, 0]
+    data_item = first_col.loc[first_col == marker]
+    if data_item.empty:
+        # marker not found
+        if assume_default is False:
+            return None
+        model_data = content
 
-            data_index = data_item.index.tolist()[0]
-            model_data = content.iloc[data_index + 1 :]
+    else:
+        # marker found
 
-            new_header = model_data.iloc[0]  # grab the first row for the header
-            model_data = model_data[1:]  # take the data less the header row
-            model_data.columns = new_header  # set the header row as the df header
+        data_index = data_item.index.tolist()[0]
+        model_data = content.iloc[data_index + 1 :]
 
-            model_data.reset_index(drop=True, inplace=True)
+        new_header = model_data.iloc[0]  # grab the first row for the header
+        model_data = model_data[1:]  # take the data less the header row
+        model_data.columns = new_header  # set the header row as the df header
 
-        # cut bottom
-        model_data = cut_row_nan(model_data)
-        model_data = cut_column_nan(model_data)
-        model = model_data.replace("nan", "")
-        return model
+        model_data = model_data.reset_index(drop=True)
 
-    finally:
-        xl.close()
+    # cut bottom
+    model_data = cut_row_nan(model_data)
+    model_data = cut_column_nan(model_data)
+    model = model_data.replace("nan", "")
+    return model
 
 
 def cut_row_nan(content: DataFrame) -> DataFrame:
@@ -76,8 +83,7 @@ def cut_column_nan(content: DataFrame) -> DataFrame:
     if "nan" not in column_names:
         return content
     nan_index = column_names.index("nan")
-    content.drop(content.columns[nan_index:], axis=1, inplace=True)
-    return content
+    return content.iloc[:, :nan_index]
 
 
 def to_dict_from_2col(content: DataFrame):
@@ -107,14 +113,35 @@ def to_dict_list(content: DataFrame):
     ## where each list item contains single dataframe row
     if content is None:
         return None
-    json_data_str = content.to_json(orient="records")
-    json_data = json.loads(json_data_str)
-    # ensure every value is list (makes life easier in java script)
-    for row_dict in json_data:
-        for key, val in row_dict.items():
-            if not isinstance(val, list):
-                row_dict[key] = [val]
-    return json_data
+    return list(iter_dict_rows(content))
+
+
+def iter_dict_rows(content: DataFrame):
+    ## yields rows of dataframe as dicts (key is column name), one row at a time
+    ## values are the same as in JSON representation of dataframe
+    column_names = [str(col_name) for col_name in content.columns]
+    for row_values in content.itertuples(index=False, name=None):
+        row_dict = {}
+        for col_name, val in zip(column_names, row_values):
+            # ensure every value is list (makes life easier in java script)
+            if isinstance(val, list):
+                row_dict[col_name] = [to_json_value(item) for item in val]
+            else:
+                row_dict[col_name] = [to_json_value(val)]
+        yield row_dict
+
+
+def to_json_value(value):
+    ## non-JSON values (e.g. int ranges) are stored as strings
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, numpy.integer):
+        return int(value)
+    if isinstance(value, numpy.floating):
+        return float(value)
+    if isinstance(value, list):
+        return [to_json_value(item) for item in value]
+    return str(value)
 
 
 def to_flat_list(data_list):
@@ -9,67 +9,115 @@
 import os
 import logging
 from typing import Dict
+import io
 import math
 import re
 import json
-import shutil
-import validators
+import copy
 from PIL import Image
 
 from pandas.core.frame import DataFrame
 
 from rankpagegenerator.generator.dataframe import (
-    load_table_from_excel,
     to_dict_from_2col,
-    to_dict_col_vals,
     to_flat_list,
-    to_dict_list,
+    iter_dict_rows,
+    to_json_value,
 )
+from rankpagegenerator.generator.writer import OutputWriter
+from rankpagegenerator.generator.modelreader import ModelReader, create_reader
+from rankpagegenerator.generator.photoindex import PhotoIndex
+from rankpagegenerator.generator.intrange import IntRange, calculate_range_weights
+from rankpagegenerator.generator.translation import TranslationResolver, is_url
+from rankpagegenerator import progress
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
+##
+## Model loaded from file.
+##
+## If 'chunk_size' is given, then data table is streamed: rows are read, converted
+## and weighted in chunks of given size and chunks are released (rows are read again
+## when iterated by 'iter_model_rows()'). In this mode 'model_data' is not set and
+## rows keep order of data table (are not sorted by answer).
+##
 class DataLoader:
-    def __init__(self, model_path, translation_path=None):
+    def __init__(self, model_path, translation_path=None, chunk_size=None):
         self.model_path = model_path
         self.translation_path = translation_path
+        self.chunk_size = chunk_size
+        ## reader selected by type of model file (Excel sheet, CSV or Parquet files)
+        self.reader: ModelReader = create_reader(model_path)
 
         self.config_dict = None
         self.data_type_dict = None
         self.order_dict = None
         self.model_data: DataFrame = None
+        self.columns_list = None
+        ## dict: [column name, sorted list of values of column]
+        self.values_dict = None
+        self.answers_list = None
+        self.rows_num = 0
+        ## dict: [answer, details row]
         self.details_dict = None
+        self.range_buckets_dict = None
+        ## dict: [column name, set of values being URLs]
+        self.links_dict: Dict[str, set] = None
 
         self.weights_dict = None
         self.translation_dict = None
+        self.translation: TranslationResolver = None
         self.photos_dict = None
+        ## photos directory scanned on first use
+        self.photo_index: PhotoIndex = None
 
         # load data
-        self.config_dict = self._load_config()
-        self.data_type_dict = self._load_data_types()
-        self.order_dict = self._load_order()
-        self.model_data = self._load_data()
-        self._sort_model_data()
-        self.details_dict = self._load_details()
+        with progress.stage("loading") as stage:
+            self.config_dict = self._load_config()
+            self.data_type_dict = self._load_data_types()
+            self.order_dict = self._load_order()
+            details_data = self._load_details()
+            if chunk_size is None:
+                self.model_data = self._load_data()
+                stage.add(len(self.model_data))
+            self.reader.close()
+
+        with progress.stage("conversion") as stage:
+            if chunk_size is None:
+                apply_data_types(self.model_data, self.data_type_dict)
+                self.columns_list = list(self.model_data.columns)
+                self._sort_model_data()
+                self._collect_values([self.model_data])
+            else:
+                self._collect_values(self._iter_data_chunks())
+            stage.add(self.rows_num)
+            self.details_dict = self._convert_details(details_data)
+            self.range_buckets_dict = self._load_range_buckets()
 
         self.weights_dict = self._load_weights()
-        self.translation_dict = self._load_transaltion()
+        ## answers are taken from weights, so values of answer column are not duplicated
+        self.answers_list = [to_json_value(answer_value) for answer_value in self.weights_dict]
+        self.values_dict[self.get_answer_column_name()] = sorted(self.weights_dict)
+        self.links_dict = self._find_links()
+        self.translation_dict = load_translation(self.translation_path)
+        self.translation = TranslationResolver(self.translation_dict)
 
     def _load_config(self) -> Dict[str, str]:
-        config_data: DataFrame = load_table_from_excel(self.model_path, "Config:", assume_default=False)
+        config_data: DataFrame = self.reader.get_table("Config:", assume_default=False)
         config_dict = to_dict_from_2col(config_data)
         if config_dict is None:
             config_dict = {}
         return config_dict
 
     def _load_data_types(self):
-        data_types: DataFrame = load_table_from_excel(self.model_path, "Data type:")
+        data_types: DataFrame = self.reader.get_table("Data type:")
         data_type_dict = to_dict_from_2col(data_types)
         return data_type_dict
 
     def _load_order(self):
-        order_data: DataFrame = load_table_from_excel(self.model_path, "Order:", assume_default=False)
+        order_data: DataFrame = self.reader.get_table("Order:", assume_default=False)
         if order_data is None:
             return {}
 
@@ -94,78 +142,207 @@ class DataLoader:
         return order_dict
 
     def _load_data(self) -> DataFrame:
-        model_data: DataFrame = load_table_from_excel(self.model_path, "Data:", assume_default=True)
-        apply_data_types(model_data, self.data_type_dict)
+        ## data types are applied in conversion stage
+        model_data: DataFrame = self.reader.get_table("Data:", assume_default=True)
         return model_data
 
+    def _iter_data_chunks(self):
+        ## yields converted chunks of data table
+        for chunk in self.reader.iter_table("Data:", assume_default=True, chunk_size=self.chunk_size):
+            apply_data_types(chunk, self.data_type_dict)
+            yield chunk
+
     def _sort_model_data(self):
         sort_column = self.get_answer_column_name()
         self.model_data = self.model_data.sort_values(sort_column)
 
-    def _load_details(self):
-        details_data: DataFrame = load_table_from_excel(self.model_path, "Details:", assume_default=False)
-        apply_data_types(details_data, self.data_type_dict)
-        details_data = to_dict_list(details_data)
+    def _collect_values(self, chunks_iter):
+        ## collects columns, number of rows and values of columns from converted chunks of data table
+        ## values of answer column are taken from weights
+        values_dict = {}
+        self.rows_num = 0
+        for chunk in chunks_iter:
+            if self.columns_list is None:
+                self.columns_list = list(chunk.columns)
+            answer_column_id = self.get_answer_column_name()
+            for col_name in self.columns_list:
+                values_set = values_dict.setdefault(col_name, set())
+                if col_name != answer_column_id:
+                    values_set.update(to_flat_list(chunk[col_name].tolist()))
+            self.rows_num += len(chunk)
+        self.values_dict = {col_name: sorted(values_set) for col_name, values_set in values_dict.items()}
+
+    def _load_details(self) -> DataFrame:
+        return self.reader.get_table("Details:", assume_default=False)
+
+    def _convert_details(self, details_data: DataFrame):
+        ## returns dict: [answer, details row]
+        ## answer is first value of first column of row
+        details_dict = {}
         if details_data is None:
-            details_data = {}
-        return details_data
+            return details_dict
+        apply_data_types(details_data, self.data_type_dict)
+        for row_dict in iter_dict_rows(details_data):
+            answer_value = next(iter(row_dict.values()))[0]
+            details_dict.setdefault(answer_value, row_dict)
+        return details_dict
+
+    def _find_links(self):
+        ## URL values are detected once for each distinct value of column
+        ## columns of numeric data types are skipped
+        ret_dict = {}
+        data_type_dict = self.data_type_dict
+        if data_type_dict is None:
+            data_type_dict = {}
+        for col_name, values_list in self.values_dict.items():
+            ret_dict[col_name] = find_link_values(values_list, data_type_dict.get(col_name))
+        details_values = {}
+        for item in self.details_dict.values():
+            for col_name, values_list in item.items():
+                details_values.setdefault(col_name, set()).update(values_list)
+        for col_name, values_set in details_values.items():
+            links_set = find_link_values(values_set, data_type_dict.get(col_name))
+            ret_dict.setdefault(col_name, set()).update(links_set)
+        return ret_dict
+
+    def _load_range_buckets(self):
+        ## returns dict: [category, bucket_label, bucket_range]
+        ## "int range" columns are presented as limited number of bucket filters
+        ret_dict = {}
+        if not self.data_type_dict:
+            return ret_dict
+        buckets_num = int(self.config_dict.get("range_buckets", 10))
+        for col_name, data_type in self.data_type_dict.items():
+            if data_type != "int range":
+                continue
+            if col_name not in self.values_dict:
+                continue
+            domain = self.order_dict.get(col_name)
+            if domain is None:
+                domain = IntRange.union(self.values_dict[col_name])
+            buckets_list = domain.split(buckets_num)
+            ret_dict[col_name] = {bucket.label(): bucket for bucket in buckets_list}
+        return ret_dict
 
     def _load_weights(self):
         ## returns multi dict: [answer, category, cat_value, weight_value]
-        order_dict = self.order_dict
-        model_data: DataFrame = self.model_data
         weights_dict = {}
+        ## dict: [(column name, row values), weights of column]
+        ## rows of the same values in column share single dict of weights
+        weights_cache = {}
+        stage = progress.stage("weights", total=self.rows_num)
+        if self.chunk_size is None:
+            self._calculate_weights(self.model_data, weights_dict, weights_cache, stage)
+        else:
+            for chunk in self._iter_data_chunks():
+                self._calculate_weights(chunk, weights_dict, weights_cache, stage)
+        stage.finish()
+        return weights_dict
 
+    def _calculate_weights(self, model_data: DataFrame, weights_dict, weights_cache, stage):
+        ## adds weights of rows of 'model_data' to 'weights_dict'
         answer_column_id = self.get_answer_column_name()
 
-        header_row = model_data.columns
-        column_names = header_row.to_list()
-        for _index, row_data in model_data.iterrows():
-            answer_value = row_data[answer_column_id]
+        column_names = self.columns_list
+        answer_index = column_names.index(answer_column_id)
+
+        for row_values_list in model_data.itertuples(index=False, name=None):
+            stage.add()
+            answer_value = row_values_list[answer_index]
             weights_dict[answer_value] = {}
-            row_length = len(row_data)
-            for row_index in range(0, row_length):
-                col_name = column_names[row_index]
+            for col_name, row_values in zip(column_names, row_values_list):
                 if col_name == answer_column_id:
                     continue
-                order_values = order_dict.get(col_name)
-                if order_values is None:
-                    # order not specified for given category - use binary rule
-                    values_list = model_data[col_name].tolist()
-                    values_list = to_flat_list(values_list)
-                    cat_values_set = set(values_list)
-                    cat_values_set = sorted(cat_values_set)
-
-                    row_values = row_data.iloc[row_index]
-                    col_weights_dict = calculate_weights_binary(row_values, cat_values_set)
-                    weights_dict[answer_value][col_name] = col_weights_dict
-                    continue
+                cache_key = (col_name, tuple(row_values) if isinstance(row_values, list) else row_values)
+                col_weights_dict = weights_cache.get(cache_key)
+                if col_weights_dict is None:
+                    col_weights_dict = self._calculate_column_weights(col_name, row_values)
+                    weights_cache[cache_key] = col_weights_dict
+                weights_dict[answer_value][col_name] = col_weights_dict
+
+    def _calculate_column_weights(self, col_name, row_values):
+        ## values of columns weighted by binary rule are taken from all rows of data table
+        order_values = self.order_dict.get(col_name)
+        buckets_dict = self.range_buckets_dict.get(col_name)
+        if buckets_dict is not None:
+            if order_values is not None and not row_values.issubset(order_values):
+                _LOGGER.error("unable to find row value in order list '%s' (%s)", col_name, order_values)
+                raise ValueError(f"value '{row_values}' out of order range '{order_values}'")
+            return calculate_range_weights(row_values, buckets_dict, order_values)
+        if order_values is None:
+            # order not specified for given category - use binary rule
+            return calculate_weights_binary(row_values, self.values_dict[col_name])
+
+        try:
+            return calculate_weights(row_values, order_values)
+        except ValueError:
+            _LOGGER.exception("unable to find row value in order list '%s' (%s)", col_name, order_values)
+            raise
+
+    def create_translated(self, translation_path) -> "DataLoader":
+        ## returns loader of the same model with other translation
+        ## model, weights and copied photos are shared with this loader
+        loader = copy.copy(self)
+        loader.translation_path = translation_path
+        loader.translation_dict = load_translation(translation_path)
+        loader.translation = TranslationResolver(loader.translation_dict)
+        return loader
 
-                try:
-                    row_values = row_data.iloc[row_index]
-                    col_weights_dict = calculate_weights(row_values, order_values)
-                    weights_dict[answer_value][col_name] = col_weights_dict
-                except ValueError:
-                    _LOGGER.exception("unable to find row value in order list '%s' (%s)", col_name, order_values)
-                    raise
+    def get_model_json(self):
+        return list(self.iter_model_rows())
 
-        return weights_dict
+    def iter_model_rows(self):
+        ## yields rows of model in format of 'get_model_json()', one row at a time
+        if self.chunk_size is None:
+            yield from iter_dict_rows(self.model_data)
+            return
+        for chunk in self._iter_data_chunks():
+            yield from iter_dict_rows(chunk)
 
-    def _load_transaltion(self) -> Dict[str, str]:
-        if not self.translation_path:
-            return None
-        with open(self.translation_path, "r", encoding="utf8") as fp:
-            return json.load(fp)
+    def get_answers_list(self):
+        ## returns answers in order of model rows
+        return self.answers_list
 
-    def get_model_json(self):
-        return to_dict_list(self.model_data)
+    def get_columns_list(self):
+        return self.columns_list
+
+    def get_details_row(self, answer_value):
+        ## returns details row of answer or None
+        return self.details_dict.get(answer_value)
 
     def get_possible_values_dict(self):
         ## returns dict with column names as key and all values from column as value
-        options_dict = to_dict_col_vals(self.model_data)
+        options_dict = dict(self.values_dict)
         options_dict.update(self.order_dict)
+        for col_name, buckets_dict in self.range_buckets_dict.items():
+            options_dict[col_name] = list(buckets_dict.keys())
         return options_dict
 
+    def get_matching_answers(self, column_name, value):
+        ## returns answers having given value in category
+        ## (for ranges: answers overlapping given bucket)
+        ret_list = []
+        for answer, answer_weights in self.weights_dict.items():
+            col_weights = answer_weights.get(column_name)
+            if col_weights is None:
+                continue
+            if col_weights.get(value) == 1.0:
+                ret_list.append(answer)
+        return ret_list
+
+    def get_matching_answers_dict(self, column_name):
+        ## returns dict: [value, answers having value in category]
+        ## the same as 'get_matching_answers()' for all values, but in single pass
+        ret_dict = {}
+        for answer, answer_weights in self.weights_dict.items():
+            col_weights = answer_weights.get(column_name)
+            if col_weights is None:
+                continue
+            for value, weight in col_weights.items():
+                if weight == 1.0:
+                    ret_dict.setdefault(value, []).append(answer)
+        return ret_dict
+
     def get_page_title(self):
         page_title = self.config_dict.get("page_title", "")
         return self.get_translation(page_title)
@@ -174,11 +351,16 @@ class DataLoader:
         answer_column_id = self.config_dict.get("answer_column")
         if answer_column_id is not None:
             return answer_column_id
-        columns = list(self.model_data.columns)
-        return columns[0]
+        return self.columns_list[0]
+
+    def is_link(self, column_name, value) -> bool:
+        links_set = self.links_dict.get(column_name)
+        if not links_set:
+            return False
+        return str(value) in links_set
 
     def get_translation(self, key: str, group: str = None) -> str:
-        return get_translation(self.translation_dict, key, group)
+        return self.translation.translate(key, group)
 
     def get_total_count(self) -> int:
         total_count = 1
@@ -191,8 +373,9 @@ class DataLoader:
         return total_count
 
     def print_info(self):
-        print(self.model_data)
-        model_values = to_dict_col_vals(self.model_data)
+        if self.model_data is not None:
+            print(self.model_data)
+        model_values = self.values_dict
         cols_list = list(model_values.keys())[1:]
         for char_name in cols_list:
             values_set = model_values[char_name]
@@ -203,45 +386,56 @@ class DataLoader:
         total_count = self.get_total_count()
         print("total_count:", total_count)
 
-    def copy_photos(self, output_path):
+    def copy_photos(self, writer: OutputWriter):
+        output_path = writer.output_path
         ret_dict = {}
         possible_values = self.get_possible_values_dict()
         answer_column_id = self.get_answer_column_name()
         answers_list = possible_values.get(answer_column_id)
+        ## dict: [answer, photos list]
+        answers_photos = {}
         for answer_value in answers_list:
             photos_data = self.find_photos(answer_value)
-            if photos_data is None:
-                continue
+            if photos_data is not None:
+                answers_photos[answer_value] = photos_data
+        stage = progress.stage("photos", total=sum(len(photos_data) for photos_data in answers_photos.values()))
+        for answer_value, photos_data in answers_photos.items():
             answer_value_dir = re.sub(r"\s+", "_", answer_value)
             img_dest_dir = os.path.join(output_path, "img", answer_value_dir)
-            os.makedirs(img_dest_dir, exist_ok=True)
+            writer.makedirs(img_dest_dir)
             photo_list = []
             for img_path in photos_data:
                 img_name = os.path.basename(img_path)
                 dest_name = re.sub(r"\s+", "_", img_name)
                 dest_img_path = os.path.join(img_dest_dir, dest_name)
-                copy_image(img_path, dest_img_path, resize=True)
+                copy_image(img_path, dest_img_path, writer, resize=True)
                 photo_list.append((img_path, dest_img_path))
+                stage.add()
             ret_dict[answer_value] = photo_list
+        stage.finish()
         self.photos_dict = ret_dict
 
     def find_photos(self, answer):
-        model_dir = os.path.dirname(self.model_path)
-        photos_dir = os.path.join(model_dir, "photos", answer)
-        if not os.path.isdir(photos_dir):
-            return None
-        ret_list = []
-        files_list = os.listdir(photos_dir)
-        for file_item in files_list:
-            if file_item.endswith(".lic"):
-                continue
-            ret_list.append(os.path.join(photos_dir, file_item))
-        return ret_list
+        return self.get_photo_index().get_photos(answer)
+
+    def get_photo_index(self) -> PhotoIndex:
+        if self.photo_index is None:
+            model_dir = self.reader.get_model_dir()
+            self.photo_index = PhotoIndex(os.path.join(model_dir, "photos"))
+        return self.photo_index
 
 
 # ===================================================
 
 
+## returns dict: [key, translated text] or None if translation is not given
+def load_translation(translation_path) -> Dict[str, str]:
+    if not translation_path:
+        return None
+    with open(translation_path, "r", encoding="utf8") as fp:
+        return json.load(fp)
+
+
 def get_translation(translation_dict: Dict[str, str], key: str, group: str = None) -> str:
     if translation_dict is None:
         return key
@@ -257,8 +451,15 @@ def get_translation(translation_dict: Dict[str, str], key: str, group: str = Non
     return key
 
 
-def is_url(value):
-    return validators.url(value)
+## returns set of values (as strings) being URLs
+def find_link_values(values_list, data_type=None):
+    if data_type in ("int", "int range"):
+        return set()
+    ret_set = set()
+    for value in set(str(item) for item in values_list):
+        if is_url(value):
+            ret_set.add(value)
+    return ret_set
 
 
 # ================================================================
@@ -297,28 +498,8 @@ def convert_value(value, data_type: str, sort_list=None):
     raise RuntimeError(f"unknown data type '{data_type}'")
 
 
-def convert_int_range(data: str):
-    ret_list = []
-    items = data.split(",")
-    for item in items:
-        if "-" not in item:
-            # single number
-            ret_list.append(int(item))
-            continue
-        int_range = item.split("-")
-        if len(int_range) != 2:
-            raise RuntimeError("invalid range")
-        min_val = int(int_range[0])
-        max_val = int(int_range[1]) + 1
-        values = range(min_val, max_val)
-        ret_list.extend(values)
-    ret_list = list(set(ret_list))
-    ret_len = len(ret_list)
-    if ret_len < 1:
-        raise RuntimeError("invalid range")
-    if ret_len == 1:
-        return ret_list[0]
-    return ret_list
+def convert_int_range(data: str) -> IntRange:
+    return IntRange.parse(data)
 
 
 def convert_str_list(data: str, sort_list=True):
@@ -383,12 +564,13 @@ def get_indexes(row_values, order_values):
     return index_list
 
 
-def copy_image(source_path, dest_path, resize=False):
+def copy_image(source_path, dest_path, writer: OutputWriter, resize=False):
     if not resize:
-        shutil.copyfile(source_path, dest_path, follow_symlinks=True)
+        writer.copy_file(source_path, dest_path)
         return
 
     with Image.open(source_path) as src_img:
+        img_format = src_img.format
         file_area = src_img.size[0] * src_img.size[1]
         factor = file_area / 1048576  # 1024 x 1024
         if factor > 1.0:
@@ -398,4 +580,6 @@ def copy_image(source_path, dest_path, resize=False):
             height = int(src_img.size[1] / root_factor)
             src_img = src_img.resize((width, height), Image.LANCZOS)  # pylint: disable=no-member
             _LOGGER.debug("image %s resized from %s to %s by factor %s", dest_path, old_size, src_img.size, root_factor)
-        src_img.save(dest_path, optimize=True, quality=50)
+        img_buffer = io.BytesIO()
+        src_img.save(img_buffer, format=img_format, optimize=True, quality=50)
+        writer.write_bytes(dest_path, img_buffer.getvalue())
@@ -0,0 +1,234 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import logging
+import bisect
+from typing import List, Tuple
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+##
+## Set of integers stored as sorted list of disjoint closed intervals.
+##
+## Wide ranges (e.g. "1-100000") are kept as their bounds instead of
+## being expanded to list of every integer.
+##
+class IntRange:
+    def __init__(self, intervals: List[Tuple[int, int]] = None):
+        self.intervals: Tuple[Tuple[int, int], ...] = merge_intervals(intervals or [])
+        ## starting rank of each interval (number of items before interval)
+        self._ranks: List[int] = []
+        counter = 0
+        for min_val, max_val in self.intervals:
+            self._ranks.append(counter)
+            counter += max_val - min_val + 1
+        self._count = counter
+
+    @staticmethod
+    def parse(data) -> "IntRange":
+        ## parse string in format "1-5,7,10-12"
+        if isinstance(data, IntRange):
+            return data
+        if isinstance(data, int):
+            return IntRange([(data, data)])
+        intervals = []
+        items = str(data).split(",")
+        for item in items:
+            item = item.strip()
+            if not item:
+                continue
+            if "-" not in item[1:]:
+                # single number
+                value = int(item)
+                intervals.append((value, value))
+                continue
+            ## allow negative first bound
+            split_index = item.index("-", 1)
+            min_val = int(item[:split_index])
+            max_val = int(item[split_index + 1 :])
+            if min_val > max_val:
+                raise RuntimeError("invalid range")
+            intervals.append((min_val, max_val))
+        if not intervals:
+            raise RuntimeError("invalid range")
+        return IntRange(intervals)
+
+    @staticmethod
+    def union(ranges_list) -> "IntRange":
+        intervals = []
+        for item in ranges_list:
+            intervals.extend(item.intervals)
+        return IntRange(intervals)
+
+    def count(self) -> int:
+        return self._count
+
+    def min(self) -> int:
+        return self.intervals[0][0]
+
+    def max(self) -> int:
+        return self.intervals[-1][1]
+
+    def is_single(self) -> bool:
+        return self._count == 1
+
+    def contains(self, value: int) -> bool:
+        pos = bisect.bisect_right(self.intervals, (value, float("inf"))) - 1
+        if pos < 0:
+            return False
+        return self.intervals[pos][1] >= value
+
+    def issubset(self, other: "IntRange") -> bool:
+        for min_val, max_val in self.intervals:
+            if other.count_between(min_val, max_val) != max_val - min_val + 1:
+                return False
+        return True
+
+    def overlaps(self, other: "IntRange") -> bool:
+        ## two-pointer walk over sorted intervals
+        index_a = 0
+        index_b = 0
+        while index_a < len(self.intervals) and index_b < len(other.intervals):
+            a_min, a_max = self.intervals[index_a]
+            b_min, b_max = other.intervals[index_b]
+            if a_max < b_min:
+                index_a += 1
+            elif b_max < a_min:
+                index_b += 1
+            else:
+                return True
+        return False
+
+    def rank(self, value: int) -> int:
+        ## returns number of items lower than given value
+        pos = bisect.bisect_right(self.intervals, (value, float("inf"))) - 1
+        if pos < 0:
+            return 0
+        min_val, max_val = self.intervals[pos]
+        if value > max_val:
+            return self._ranks[pos] + max_val - min_val + 1
+        return self._ranks[pos] + value - min_val
+
+    def value_at(self, rank: int) -> int:
+        ## inverse of 'rank()'
+        if rank < 0 or rank >= self._count:
+            raise IndexError(f"rank out of range: {rank}")
+        pos = bisect.bisect_right(self._ranks, rank) - 1
+        return self.intervals[pos][0] + rank - self._ranks[pos]
+
+    def count_between(self, min_val: int, max_val: int) -> int:
+        ## number of items in closed range [min_val, max_val]
+        if min_val > max_val:
+            return 0
+        return self.rank(max_val + 1) - self.rank(min_val)
+
+    def intersect(self, min_val: int, max_val: int) -> "IntRange":
+        intervals = []
+        for curr_min, curr_max in self.intervals:
+            low = max(curr_min, min_val)
+            high = min(curr_max, max_val)
+            if low <= high:
+                intervals.append((low, high))
+        return IntRange(intervals)
+
+    def distance(self, other: "IntRange", domain: "IntRange") -> int:
+        ## distance between closest items of ranges measured in number of 'domain' items
+        if self.overlaps(other):
+            return 0
+        best = None
+        for a_min, a_max in self.intervals:
+            for b_min, b_max in other.intervals:
+                if a_max < b_min:
+                    dist = domain.rank(b_min) - domain.rank(a_max)
+                else:
+                    dist = domain.rank(a_min) - domain.rank(b_max)
+                if best is None or dist < best:
+                    best = dist
+        return best
+
+    def split(self, buckets_num: int) -> List["IntRange"]:
+        ## split range into 'buckets_num' parts containing similar number of items
+        if self._count <= buckets_num:
+            return [IntRange([(val, val)]) for val in self.values()]
+        ret_list = []
+        for index in range(0, buckets_num):
+            low_rank = index * self._count // buckets_num
+            high_rank = (index + 1) * self._count // buckets_num - 1
+            bucket = self.intersect(self.value_at(low_rank), self.value_at(high_rank))
+            ret_list.append(bucket)
+        return ret_list
+
+    def values(self):
+        for min_val, max_val in self.intervals:
+            yield from range(min_val, max_val + 1)
+
+    def label(self) -> str:
+        ## bounds of range, e.g. "1-100"
+        min_val = self.min()
+        max_val = self.max()
+        if min_val == max_val:
+            return str(min_val)
+        return f"{min_val}-{max_val}"
+
+    def __str__(self):
+        items = []
+        for min_val, max_val in self.intervals:
+            if min_val == max_val:
+                items.append(str(min_val))
+            else:
+                items.append(f"{min_val}-{max_val}")
+        return ",".join(items)
+
+    def __repr__(self):
+        return f"IntRange('{self}')"
+
+    def __eq__(self, other):
+        if not isinstance(other, IntRange):
+            return False
+        return self.intervals == other.intervals
+
+    def __lt__(self, other):
+        return self.intervals < other.intervals
+
+    def __hash__(self):
+        return hash(self.intervals)
+
+
+def merge_intervals(intervals) -> Tuple[Tuple[int, int], ...]:
+    ## sort and join overlapping or adjacent intervals
+    ret_list: List[Tuple[int, int]] = []
+    for min_val, max_val in sorted(intervals):
+        if ret_list and min_val <= ret_list[-1][1] + 1:
+            prev_min, prev_max = ret_list[-1]
+            ret_list[-1] = (prev_min, max(prev_max, max_val))
+            continue
+        ret_list.append((min_val, max_val))
+    return tuple(ret_list)
+
+
+# =========================================
+
+
+def calculate_range_weights(row_value: IntRange, buckets_dict, domain: IntRange = None):
+    ## 'buckets_dict' maps filter label to range of bucket
+    ## if 'domain' is not given then binary rule is used
+    weight_dict = {}
+    for label, bucket in buckets_dict.items():
+        weight_dict[label] = calculate_range_single_weight(row_value, bucket, domain)
+    return weight_dict
+
+
+def calculate_range_single_weight(row_value: IntRange, bucket: IntRange, domain: IntRange = None):
+    if row_value.overlaps(bucket):
+        return 1.0
+    if domain is None:
+        return 0.0
+    distance = row_value.distance(bucket, domain)
+    return 1.0 - distance / domain.count()
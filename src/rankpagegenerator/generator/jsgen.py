@@ -8,12 +8,20 @@
 
 import os
 import logging
+import json
+from dataclasses import dataclass
 
-import shutil
-
-from rankpagegenerator.utils import write_data, read_data
-from rankpagegenerator.generator.utils import HTML_LICENSE, dict_to_html_table
+from rankpagegenerator.utils import read_data, calculate_hash
+from rankpagegenerator import progress
+from rankpagegenerator.generator.utils import dict_to_html_table, convert_href_value
 from rankpagegenerator.generator.dataloader import DataLoader
+from rankpagegenerator.generator.bitset import calculate_values_bitsets
+from rankpagegenerator.generator.prerender import NavigationRenderer, MODE_PARAM, MODE_FILTER
+from rankpagegenerator.generator.ranking import RankingEngine, round_percent
+from rankpagegenerator.generator.similarity import find_similar_answers
+from rankpagegenerator.generator.pagelayout import PageLayout
+from rankpagegenerator.generator.templates import PageTemplates
+from rankpagegenerator.generator.writer import OutputWriter, SubdirWriter, create_writer
 from rankpagegenerator.data import DATA_DIR
 
 
@@ -22,354 +30,938 @@ SCRIPT_DIR = os.path.dirname(__file__)
 _LOGGER = logging.getLogger(__name__)
 
 
-def generate_pages(model_path, translation_path, embed, nophotos, output_path):
-    data_loader = DataLoader(model_path, translation_path)
-    generate_javascript(data_loader, embed, nophotos, output_path)
+## scripts in order of loading
+SCRIPTS_LIST = ["rankworker.js", "navigate.js"]
+
+
+##
+## Options of build of pages.
+##
+@dataclass
+class BuildOptions:
+    ## scripts and data are embedded in main page
+    embed: bool = False
+    ## photos are not copied nor presented
+    nophotos: bool = False
+    ## output is written directly to archive file
+    archive_path: str = None
+    ## .gz (and .br) files are generated next to text files
+    precompress: bool = False
+    ## names of script and CSS files contain hash of content
+    hashassets: bool = False
+    ## number of precomputed best results of single filters (0 - no shards)
+    shards_limit: int = 0
+    ## number of most similar answers listed on details pages (0 - no list)
+    similar_num: int = 0
+    ## number of details stored in single shard presented by single page (0 - separate details pages)
+    details_shard_size: int = 0
+    ## number of rows of data table read and converted at once (0 - whole table)
+    data_chunk_size: int = 0
+    ## page templates found there replace default templates
+    templates_dir: str = None
+    ## translations not found are written there
+    missing_translations_path: str = None
+
+
+##
+## Data of pages not depending on translation.
+##
+@dataclass
+class SharedData:
+    ## dict: [category, value, bitset of answers]
+    bitsets_dict: dict
+    ## dict: [answer, list of pairs [similar answer, similarity]]
+    similar_dict: dict
+    ## dict: [category, value, shard file path relative to pages]
+    shards_dict: dict
+    ## path of weights script relative to pages (None - weights are embedded in main page)
+    weights_path: str = None
+
+
+def generate_pages(model_path, translation_path, output_path, options: BuildOptions = None):
+    ## if 'translation_path' is list of many files then pages of each language are generated
+    ## into subdirectory named after translation file
+    if options is None:
+        options = BuildOptions()
+    chunk_size = options.data_chunk_size if options.data_chunk_size > 0 else None
+    if isinstance(translation_path, (list, tuple)):
+        if len(translation_path) > 1:
+            data_loader = DataLoader(model_path, chunk_size=chunk_size)
+            generate_languages(data_loader, translation_path, output_path, options)
+            return
+        translation_path = translation_path[0] if translation_path else None
+    data_loader = DataLoader(model_path, translation_path, chunk_size)
+    generate_javascript(data_loader, output_path, options)
+    if options.missing_translations_path:
+        data_loader.translation.write_missing_stub(options.missing_translations_path)
 
 
 ## ============================================
 
 
-def generate_javascript(data_loader: DataLoader, embed, nophotos, output_path):
-    os.makedirs(output_path, exist_ok=True)
+## model is loaded, photos are processed and data not depending on translation is calculated once,
+## then pages of languages are rendered one by one
+## photos, result shards and weights are stored in output directory and shared by pages of all languages
+def generate_languages(data_loader: DataLoader, translations_list, output_path, options: BuildOptions):
+    ## dict: [language, translation file]
+    languages_dict = {}
+    for translation_path in translations_list:
+        language = get_language_name(translation_path)
+        if language in languages_dict:
+            raise ValueError(f"duplicated language '{language}' of translation {translation_path}")
+        languages_dict[language] = translation_path
+
+    with create_writer(output_path, options.archive_path, options.precompress) as writer:
+        if not options.nophotos:
+            data_loader.copy_photos(writer)
+
+        ## dict of hashed shared data files: [data file path, output file path]
+        hashed_dict = {} if options.hashassets else None
+        ## pages are placed in language subdirectory
+        shared_data = prepare_shared_data(data_loader, writer, options, hashed_dict, root_path="../")
+        if hashed_dict:
+            write_assets_manifest(writer, hashed_dict)
+
+        for language, translation_path in languages_dict.items():
+            _LOGGER.info("generating pages of language '%s'", language)
+            lang_loader = data_loader.create_translated(translation_path)
+            generate_javascript_content(
+                lang_loader,
+                SubdirWriter(writer, language),
+                options,
+                photos_copied=not options.nophotos,
+                shared_data=shared_data,
+            )
+            if options.missing_translations_path:
+                missing_path = get_language_path(options.missing_translations_path, language)
+                lang_loader.translation.write_missing_stub(missing_path)
+
+
+## returns language name from translation file name, e.g. 'pl' for 'translations/pl.json'
+def get_language_name(translation_path):
+    return os.path.splitext(os.path.basename(translation_path))[0]
+
+
+## returns path with language suffix, e.g. 'missing_pl.json' for 'missing.json'
+def get_language_path(file_path, language):
+    name, ext = os.path.splitext(file_path)
+    return f"{name}_{language}{ext}"
+
+
+def generate_javascript(data_loader: DataLoader, output_path, options: BuildOptions = None):
+    if options is None:
+        options = BuildOptions()
+    with create_writer(output_path, options.archive_path, options.precompress) as writer:
+        generate_javascript_content(data_loader, writer, options)
 
-    navigation_script_path = os.path.join(DATA_DIR, "navigate.js")
-    css_styles_path = os.path.join(DATA_DIR, "styles.css")
+
+def generate_javascript_content(
+    data_loader: DataLoader,
+    writer: OutputWriter,
+    options: BuildOptions = None,
+    photos_copied=False,
+    shared_data: SharedData = None,
+):
+    ## if 'photos_copied' is set then photos already copied by 'data_loader' are presented
+    ## if 'shared_data' is not given then it is calculated and written next to pages
+    if options is None:
+        options = BuildOptions()
+    output_path = writer.output_path
+    templates = PageTemplates(data_loader, options.templates_dir)
+
+    scripts_list = []
+    if not options.embed:
+        scripts_list.extend(SCRIPTS_LIST)
+        if options.details_shard_size > 0:
+            scripts_list.append("details.js")
+    assets_dict = write_assets(writer, scripts_list, options.hashassets)
+    ## dict of hashed data files: [data file path, output file path]
+    hashed_dict = assets_dict if options.hashassets else None
+    if shared_data is None:
+        shared_data = prepare_shared_data(data_loader, writer, options, hashed_dict)
 
     answer_column_id = data_loader.get_answer_column_name()
 
     _LOGGER.info("answer column id: %s", answer_column_id)
 
-    page_title = data_loader.get_page_title()
-    if page_title:
-        page_title = f"""<title>{page_title}</title>"""
-
     dest_photos_dict = {}
-    if not nophotos:
-        data_loader.copy_photos(output_path)
-        for answer, photos_list in data_loader.photos_dict.items():
-            dest_list = []
-            for _img_src, img_dest in photos_list:
-                img_rel_path = os.path.relpath(img_dest, output_path)
-                dest_list.append(img_rel_path)
-            dest_photos_dict[answer] = dest_list
+    if not options.nophotos:
+        if not photos_copied:
+            data_loader.copy_photos(writer)
+        dest_photos_dict = get_dest_photos_dict(data_loader, output_path)
 
     trans_dict = data_loader.translation_dict
     if trans_dict is None:
         trans_dict = {}
 
-    details_page_dict = generate_details_pages(data_loader, nophotos, output_path)
+    if options.details_shard_size > 0:
+        details_page_dict = generate_details_shards(
+            data_loader,
+            templates,
+            options.nophotos,
+            assets_dict,
+            writer,
+            shared_data.similar_dict,
+            options.details_shard_size,
+            hashed_dict,
+        )
+    else:
+        details_page_dict = generate_details_pages(
+            data_loader, templates, options.nophotos, assets_dict, writer, shared_data.similar_dict
+        )
+
+    category_page_dict = generate_category_pages(
+        data_loader, templates, details_page_dict, dest_photos_dict, assets_dict, writer
+    )
 
-    category_page_dict = generate_category_pages(data_loader, details_page_dict, dest_photos_dict, output_path)
+    weights_content = data_loader.weights_dict
+    if shared_data.weights_path:
+        weights_content = None
 
     script_data_content = f"""\
 const ANSWER_COLUMN = "{answer_column_id}";
 const VALUES_DICT = {data_loader.get_possible_values_dict()};
 const CATEGORY_PAGE = {category_page_dict};
 const DETAILS_PAGE = {details_page_dict};
-const WEIGHTS_DICT = {data_loader.weights_dict};
+const WEIGHTS_DICT = {to_js_value(weights_content)};
+const WEIGHTS_PATH = {to_js_value(shared_data.weights_path)};
+const BITSETS_DICT = {shared_data.bitsets_dict};
 const TRANSLATION_DICT = {trans_dict};
-const PHOTOS_DICT = {dest_photos_dict};"""
+const PHOTOS_DICT = {dest_photos_dict};
+const SHARDS_DICT = {shared_data.shards_dict};"""
+
+    ## initial state (no filters) is rendered at build time
+    renderer = NavigationRenderer(
+        data_loader.get_possible_values_dict(),
+        category_page_dict,
+        details_page_dict,
+        answer_column_id,
+        data_loader.translation,
+        dest_photos_dict,
+    )
+    initial_content = renderer.generate_content()
+
+    page_script_content = generate_index_scripts(script_data_content, assets_dict, options.embed)
+
+    content = templates.render(
+        "index.html",
+        title=templates.get_title(),
+        styles_path=assets_dict["styles.css"],
+        scripts=page_script_content,
+        content=initial_content,
+    )
+
+    out_index_path = os.path.join(output_path, "index.html")
+    _LOGGER.info("writing index page to %s", out_index_path)
+    writer.write_data(out_index_path, content)
+
+    if options.hashassets:
+        write_assets_manifest(writer, assets_dict)
+
+    data_loader.translation.report_missing()
+
+
+## calculates data not depending on translation and writes result shards and weights script
+## 'root_path' - path of output directory of 'writer' relative to pages
+def prepare_shared_data(
+    data_loader: DataLoader, writer: OutputWriter, options: BuildOptions, hashed_dict=None, root_path=""
+) -> SharedData:
+    shards_dict = {}
+    weights_path = None
+    if options.shards_limit > 0:
+        shards_dict = generate_result_shards(data_loader, options.shards_limit, writer, hashed_dict)
+        for values_dict in shards_dict.values():
+            for value, shard_path in values_dict.items():
+                values_dict[value] = root_path + shard_path
+        ## weights are needed only for combinations of filters not covered by shards,
+        ## so they are not embedded in main page, but loaded on demand
+        weights_path = root_path + write_weights_script(data_loader, writer, hashed_dict)
+    return SharedData(
+        bitsets_dict=calculate_values_bitsets(data_loader),
+        similar_dict=calculate_similar_dict(data_loader, options.similar_num),
+        shards_dict=shards_dict,
+        weights_path=weights_path,
+    )
+
+
+## returns dict: [answer, list of photo paths relative to output directory]
+def get_dest_photos_dict(data_loader: DataLoader, output_path):
+    dest_photos_dict = {}
+    for answer, photos_list in data_loader.photos_dict.items():
+        dest_list = []
+        for _img_src, img_dest in photos_list:
+            img_rel_path = os.path.relpath(img_dest, output_path)
+            dest_list.append(img_rel_path)
+        dest_photos_dict[answer] = dest_list
+    return dest_photos_dict
+
 
-    page_script_content = ""
+## returns script tags of main page
+def generate_index_scripts(script_data_content, assets_dict, embed):
     if embed:
         _LOGGER.info("embedding content")
-        navigation_script_content = read_data(navigation_script_path)
-        page_script_content = f"""
+        navigation_script_content = ""
+        for script_name in SCRIPTS_LIST:
+            script_path = os.path.join(DATA_DIR, script_name)
+            navigation_script_content += read_data(script_path) + "\n\n"
+        return f"""
 <script>
 {script_data_content}
 
 
-{navigation_script_content}
-</script>
+{navigation_script_content}</script>
 """
-    else:
-        out_navigation_path = os.path.join(output_path, "navigate.js")
-        shutil.copyfile(navigation_script_path, out_navigation_path, follow_symlinks=True)
-        page_script_content = f"""\
+    return f"""\
 <script>
 {script_data_content}
 </script>
 
-<script src="navigate.js"></script>"""
+<script src="{assets_dict["rankworker.js"]}"></script>
+<script src="{assets_dict["navigate.js"]}"></script>"""
 
-    shutil.copy(css_styles_path, output_path, follow_symlinks=True)
 
-    content = ""
-    content += f"""<html>
-{HTML_LICENSE}
-<head>
-{page_title}
-<link rel="stylesheet" type="text/css" href="styles.css">
-
-{page_script_content}
+## ============================================
 
-</head>
-<body class="mainpage" onload="start_navigate()">
 
-<div class="bottomspace">
-    <a href='?'>{data_loader.get_translation("Reset filters")}</a>
-</div>
+## returns dict: [asset name, output file name]
+def write_assets(writer: OutputWriter, scripts_list, hashassets):
+    assets_list = ["styles.css"]
+    assets_list.extend(scripts_list)
 
-<div id="container"></div>
+    assets_dict = {}
+    for asset_name in assets_list:
+        asset_path = os.path.join(DATA_DIR, asset_name)
+        if not hashassets:
+            writer.copy_file(asset_path, asset_name)
+            assets_dict[asset_name] = asset_name
+            continue
+        asset_content = read_data(asset_path)
+        out_name = get_hashed_name(asset_name, asset_content)
+        writer.write_data(out_name, asset_content)
+        assets_dict[asset_name] = out_name
+    return assets_dict
+
+
+## writes file of data loaded by scripts of pages
+## if 'hashed_dict' is given then name of file contains hash of content and file is added to the dict
+## returns path of written file relative to output directory
+def write_data_asset(writer: OutputWriter, data_path, content, hashed_dict=None):
+    if hashed_dict is None:
+        writer.write_data(data_path, content)
+        return data_path
+    out_path = get_hashed_name(data_path, content)
+    writer.write_data(out_path, content)
+    hashed_dict[data_path] = out_path
+    return out_path
+
+
+## returns file name containing hash of content, e.g. 'navigate.0123456789ab.js'
+def get_hashed_name(file_name, content):
+    content_hash = calculate_hash(content)[:12]
+    name, ext = os.path.splitext(file_name)
+    return f"{name}.{content_hash}{ext}"
+
+
+## 'assets_dict' - dict of scripts, styles and hashed data files
+def write_assets_manifest(writer: OutputWriter, assets_dict):
+    ## hashed assets never change, so can be cached forever
+    headers_dict = {}
+    for out_name in assets_dict.values():
+        headers_dict[out_name] = {"Cache-Control": "public, max-age=31536000, immutable"}
+    headers_dict["*.html"] = {"Cache-Control": "no-cache"}
+    manifest_dict = {"assets": assets_dict, "headers": headers_dict}
+    manifest_content = json.dumps(manifest_dict, indent=4)
+    writer.write_data("assets-manifest.json", manifest_content)
+
+
+## precompute best results for every single selected value
+## returns dict: [category, value, shard file relative path]
+def generate_result_shards(data_loader: DataLoader, shards_limit, writer: OutputWriter, hashed_dict=None):
+    engine = RankingEngine.create(data_loader)
+    queries_list = []
+    ## list of triples: [category, value, shard file relative path]
+    paths_list = []
+    ret_dict = {}
+    for category_index, category in enumerate(engine.categories):
+        ret_dict[category] = {}
+        for value_index, value in enumerate(engine.values_dict[category]):
+            queries_list.append({category: [value]})
+            paths_list.append((category, value, f"shards/{category_index}/{value_index}.json"))
+
+    with progress.stage("result shards", total=len(queries_list)) as stage:
+        rank_results = engine.rank_batch(queries_list, shards_limit)
+        ## number of answers matching in filter mode
+        filter_queries = [{**query, MODE_PARAM: MODE_FILTER} for query in queries_list]
+        filter_results = engine.rank_batch(filter_queries, 0)
+
+        _LOGGER.info("writing %s result shards", len(paths_list))
+        for (category, value, shard_path), rank_result, filter_result in zip(paths_list, rank_results, filter_results):
+            shard_dict = {
+                "weights_list": rank_result["weights_list"],
+                "total": rank_result["total"],
+                "matching": filter_result["total"],
+            }
+            ret_dict[category][value] = write_data_asset(writer, shard_path, json.dumps(shard_dict), hashed_dict)
+            stage.add()
+    return ret_dict
 
-</body>
-</html>
-"""
 
-    out_index_path = os.path.join(output_path, "index.html")
-    _LOGGER.info("writing index page to %s", out_index_path)
-    write_data(out_index_path, content)
+## script instead of JSON file allows loading weights from 'file://' pages
+## returns path of script relative to output directory
+def write_weights_script(data_loader: DataLoader, writer: OutputWriter, hashed_dict=None):
+    weights_content = f"load_weights({data_loader.weights_dict});\n"
+    return write_data_asset(writer, "weights.js", weights_content, hashed_dict)
 
 
-## ============================================
+def to_js_value(value):
+    if value is None:
+        return "null"
+    if isinstance(value, str):
+        return json.dumps(value)
+    return str(value)
 
 
-# model_json - list of dicts (key is column name)
-def generate_details_pages(data_loader: DataLoader, nophotos, output_path):
-    model_json = data_loader.get_model_json()
+## rows of model are rendered one at a time
+def generate_details_pages(
+    data_loader: DataLoader, templates: PageTemplates, nophotos, assets_dict, writer: OutputWriter, similar_dict=None
+):
+    ## 'similar_dict' - dict: [answer, list of pairs [similar answer, similarity]]
+    output_path = writer.output_path
+    answers_list = data_loader.get_answers_list()
     answer_column_id = data_loader.get_answer_column_name()
 
+    if similar_dict is None:
+        similar_dict = {}
+    ## dict: [answer, details page name]
+    answer_pages_dict = {}
+    for answer_index, answer_value in enumerate(answers_list):
+        answer_pages_dict[answer_value] = f"match_{answer_index}.html"
+
     ## generate answer pages
     ret_dict = {}
-    pages_dir = data_loader.config_dict.get("subpage_dir", "pages")
-    out_pages_path = os.path.join(output_path, pages_dir)
-    os.makedirs(out_pages_path, exist_ok=True)
+    layout = PageLayout.create(data_loader.config_dict)
+    ## create all directories at once
+    for page_dir in layout.get_dirs(answer_pages_dict.values()):
+        writer.makedirs(os.path.join(output_path, page_dir))
+    rows_num = len(answers_list)
+    pages_log = progress.stage("details pages", total=rows_num)
     answer_counter = 0
-    rows_num = len(model_json)
-    for row_dict in model_json:
+    for row_dict in data_loader.iter_model_rows():
         answer_value = row_dict[answer_column_id][0]
+        page_name = f"match_{answer_counter}.html"
 
-        prev_link = data_loader.get_translation("Prev")
+        prev_link = templates.labels["prev_label"]
         if answer_counter > 0:
-            prev_href = f"match_{answer_counter - 1}.html"
+            prev_href = layout.get_link(page_name, f"match_{answer_counter - 1}.html")
             prev_link = f"""<a href="{prev_href}">{prev_link}</a>"""
-        next_link = data_loader.get_translation("Next")
+        next_link = templates.labels["next_label"]
         if answer_counter < rows_num - 1:
-            next_href = f"match_{answer_counter + 1}.html"
+            next_href = layout.get_link(page_name, f"match_{answer_counter + 1}.html")
             next_link = f"""<a href="{next_href}">{next_link}</a>"""
 
+        similar_list = similar_dict.get(answer_value, [])
+        similar_links = {}
+        for similar_answer, _ in similar_list:
+            similar_links[similar_answer] = layout.get_link(page_name, answer_pages_dict[similar_answer])
+        similar_content = generate_similar_content(templates, similar_list, similar_links)
+        out_pages_path = layout.get_out_dir(output_path, page_name)
         page_content = generate_details_single_page(
-            data_loader, row_dict, nophotos, prev_link, next_link, out_pages_path
+            data_loader,
+            templates,
+            row_dict,
+            nophotos,
+            out_pages_path,
+            similar_content,
+            root_path=layout.get_root_path(page_name),
+            styles_path=assets_dict["styles.css"],
+            prev_link=prev_link,
+            next_link=next_link,
         )
 
-        page_name = f"match_{answer_counter}.html"
         out_page_path = os.path.join(out_pages_path, page_name)
-
-        _LOGGER.info("writing page to %s", out_page_path)
-        write_data(out_page_path, page_content)
+        writer.write_data(out_page_path, page_content)
+        pages_log.add()
         answer_counter += 1
 
-        rel_path = os.path.join(pages_dir, page_name)
-        ret_dict[answer_value] = rel_path
+        ret_dict[answer_value] = layout.get_page_path(page_name)
 
+    pages_log.finish()
     return ret_dict
 
 
-def generate_details_single_page(data_loader: DataLoader, row_dict, nophotos, prev_link, next_link, out_pages_path):
-    translation_dict = data_loader.translation_dict
-    page_title = data_loader.get_page_title()
+## 'page_fields' - fields of page template: 'root_path' (relative path from page directory
+## to output directory), 'styles_path', 'prev_link' and 'next_link'
+def generate_details_single_page(
+    data_loader: DataLoader,
+    templates: PageTemplates,
+    row_dict,
+    nophotos,
+    out_pages_path,
+    similar_content="",
+    **page_fields,
+):
     answer_column_id = data_loader.get_answer_column_name()
+    answer_value = row_dict[answer_column_id][0]
 
+    details_content = generate_details_content(
+        data_loader, templates, row_dict, nophotos, out_pages_path, similar_content
+    )
+    return templates.render(
+        "details_page.html",
+        title=templates.get_title(answer_value),
+        content=details_content,
+        **page_fields,
+    )
+
+
+## characteristics, similar answers and photos of answer
+## paths of photos are relative to 'out_dir_path'
+def generate_details_content(
+    data_loader: DataLoader, templates: PageTemplates, row_dict, nophotos, out_dir_path, similar_content=""
+):
+    answer_column_id = data_loader.get_answer_column_name()
     answer_value = row_dict[answer_column_id][0]
 
-    data_dict = row_dict.copy()
-    for item in data_loader.details_dict:
-        item_detail = list(item.values())  # list of lists
-        if item_detail[0][0] == answer_value:
-            details_dict = item
-            details_dict.pop(next(iter(details_dict)))  # remove first key
-            data_dict.update(details_dict)
-            break
+    data_dict = {}
+    for key, val_list in get_details_rows(data_loader, row_dict):
+        data_dict[key] = [to_html_value(item) for item in val_list]
+
+    characteristics_content = dict_to_html_table(
+        data_dict,
+        header_content=templates.table_header,
+        empty_content=templates.empty_value,
+        convert_links=False,
+    )
+
+    photos_content = ""
+    if not nophotos:
+        photos_content = generate_details_photos_content(data_loader, templates, answer_value, out_dir_path)
+
+    return f"""<div class="characteristics bottomspace">
+{characteristics_content}
+</div>
+{similar_content}{photos_content}"""
+
 
+## returns list of pairs [translated parameter, list of values] of answer and its details
+## values being links are returned as dicts: {"href": link}
+def get_details_rows(data_loader: DataLoader, row_dict):
+    answer_column_id = data_loader.get_answer_column_name()
+    answer_value = row_dict[answer_column_id][0]
+
+    data_dict = row_dict.copy()
+    details_row = data_loader.get_details_row(answer_value)
+    if details_row is not None:
+        ## details are shared by builds (e.g. of many languages) - first key is skipped, not removed
+        details_items = iter(details_row.items())
+        next(details_items)
+        data_dict.update(details_items)
+
+    ## links are known from loading, so values are not validated here
     trans_data_dict = {}
     for key, val in data_dict.items():
-        val_list = sorted(val)
-        if key != answer_column_id:
-            val_list = [data_loader.get_translation(str(item), "category") for item in val_list]
+        val_list = []
+        for item in sorted(val):
+            item = str(item)
+            if data_loader.is_link(key, item):
+                item = {"href": item}
+            elif key != answer_column_id:
+                item = data_loader.get_translation(item, "category")
+            val_list.append(item)
         key = data_loader.get_translation(key, "category")
         trans_data_dict[key] = val_list
-    data_dict = trans_data_dict
+    return list(trans_data_dict.items())
+
+
+def to_html_value(value):
+    if isinstance(value, dict):
+        return convert_href_value(value["href"], True)
+    return value
+
+
+## details of answers are stored in script files ("shards") loaded by single template page
+## returns dict: [answer, URL of details]
+def generate_details_shards(
+    data_loader: DataLoader,
+    templates: PageTemplates,
+    nophotos,
+    assets_dict,
+    writer: OutputWriter,
+    similar_dict=None,
+    shard_size=1000,
+    hashed_dict=None,
+):
+    output_path = writer.output_path
+    answers_list = data_loader.get_answers_list()
+    answer_column_id = data_loader.get_answer_column_name()
 
-    characteristics_content = dict_to_html_table(data_dict, translation_dict)
+    if similar_dict is None:
+        similar_dict = {}
+    ret_dict = {}
+    for answer_index, answer_value in enumerate(answers_list):
+        ret_dict[answer_value] = f"details.html?id={answer_index}"
+
+    shards_dir = "details"
+    ## paths of shards relative to output directory
+    shards_list = []
+    shards_log = progress.stage("details shards", total=len(answers_list))
+    items_list = []
+    has_similar = False
+    has_photos = False
+    for row_dict in data_loader.iter_model_rows():
+        answer_value = row_dict[answer_column_id][0]
+        item_dict = get_details_item(
+            data_loader, row_dict, similar_dict.get(answer_value, []), ret_dict, nophotos, output_path
+        )
+        has_similar = has_similar or "similar" in item_dict
+        has_photos = has_photos or "photos" in item_dict
+        items_list.append(item_dict)
+        if len(items_list) < shard_size:
+            continue
+        shards_list.append(write_details_shard(items_list, shards_dir, len(shards_list), writer, hashed_dict))
+        shards_log.add(len(items_list))
+        items_list = []
+    if items_list:
+        shards_list.append(write_details_shard(items_list, shards_dir, len(shards_list), writer, hashed_dict))
+        shards_log.add(len(items_list))
+    shards_log.finish()
+    _LOGGER.info("written %s details shards", len(shards_list))
+
+    config_dict = {
+        "items_num": len(answers_list),
+        "shard_size": shard_size,
+        "shards_list": shards_list,
+        "page_title": templates.page_title,
+        "prev_label": templates.labels["prev_label"],
+        "next_label": templates.labels["next_label"],
+        "table_header": templates.table_header,
+        "empty_value": templates.empty_value,
+    }
+    ## labels are translated only if used
+    if has_similar:
+        config_dict["similar_label"] = templates.labels["similar_label"]
+    if has_photos:
+        config_dict["photos_label"] = templates.labels["photos_label"]
+        config_dict["license_label"] = templates.labels["license_label"]
+    details_script = assets_dict.get("details.js")
+    if details_script:
+        details_script = f"""<script src="{details_script}"></script>"""
+    else:
+        ## embedded script
+        details_script = f"""<script>\n{read_data(os.path.join(DATA_DIR, "details.js"))}</script>"""
+    content = templates.render(
+        "details_shards.html",
+        title=templates.get_title(),
+        styles_path=assets_dict["styles.css"],
+        details_config=json.dumps(config_dict),
+        scripts=details_script,
+    )
+    writer.write_data(os.path.join(output_path, "details.html"), content)
+    return ret_dict
 
-    curr_page_title = page_title
-    if curr_page_title:
-        curr_page_title = f"""<title>{answer_value} - {curr_page_title}</title>"""
 
-    photos_content = ""
+## returns path of shard relative to output directory
+## returns data of answer stored in details shard, rendered by 'render_details()' of details.js
+## into the same content as 'generate_details_content()'
+def get_details_item(data_loader: DataLoader, row_dict, similar_list, answer_pages_dict, nophotos, out_dir_path):
+    answer_column_id = data_loader.get_answer_column_name()
+    answer_value = row_dict[answer_column_id][0]
+    item_dict = {"answer": answer_value, "rows": get_details_rows(data_loader, row_dict)}
+    if similar_list:
+        item_dict["similar"] = [
+            [answer, round_percent(similarity * 100.0), answer_pages_dict.get(answer)]
+            for answer, similarity in similar_list
+        ]
     if not nophotos:
-        photos_content = generate_details_photos_content(data_loader, answer_value, out_pages_path)
-
-    content = f"""<html>
-{HTML_LICENSE}
-<head>
-{curr_page_title}
-<link rel="stylesheet" type="text/css" href="../styles.css">
-</head>
-<body>
-<div>
-<a href="../index.html">{data_loader.get_translation("Back to Filters")}</a>
-</div>
-<div class="bottomspace">
-<span>{prev_link}</span> <span>{next_link}</span>
-</div>
-<div class="characteristics bottomspace">
-{characteristics_content}
-</div>
-{photos_content}
-</body>
-</html>
-"""
-    return content
+        photos_list = get_details_photos(data_loader, answer_value, out_dir_path)
+        if photos_list:
+            item_dict["photos"] = photos_list
+    return item_dict
+
+
+def write_details_shard(items_list, shards_dir, shard_index, writer: OutputWriter, hashed_dict=None):
+    ## script instead of JSON file allows loading shards from 'file://' pages
+    shard_content = f"load_details_shard({shard_index}, {json.dumps(items_list)});\n"
+    shard_path = f"{shards_dir}/shard_{shard_index}.js"
+    return write_data_asset(writer, shard_path, shard_content, hashed_dict)
+
+
+## returns dict: [answer, list of pairs [similar answer, similarity]]
+def calculate_similar_dict(data_loader: DataLoader, similar_num):
+    if similar_num < 1:
+        return {}
+    _LOGGER.info("calculating similar answers")
+    with progress.stage("similarity", total=len(data_loader.weights_dict)) as stage:
+        similar_dict = find_similar_answers(RankingEngine.create(data_loader), similar_num)
+        stage.add(len(similar_dict))
+    return similar_dict
 
 
-def generate_details_photos_content(data_loader: DataLoader, answer_value, out_pages_path):
+## 'similar_list' - list of pairs [answer, similarity]
+def generate_similar_content(templates: PageTemplates, similar_list, answer_pages_dict):
+    if not similar_list:
+        return ""
+    content_list = []
+    content_list.append("""<div class="similar bottomspace">\n""")
+    content_list.append("""<table cellspacing="0" class="similartable">\n""")
+    content_list.append(f"""<tr> <th>{templates.labels["similar_label"]}:</th> </tr>\n""")
+    for answer, similarity in similar_list:
+        answer_content = answer
+        page_name = answer_pages_dict.get(answer)
+        if page_name:
+            answer_content = f"""<a href="{page_name}">{answer}</a>"""
+        content_list.append(f"""<tr> <td>{answer_content}</td> <td>{round_percent(similarity * 100.0)}%</td> </tr>\n""")
+    content_list.append("</table>\n")
+    content_list.append("</div>\n")
+    return "".join(content_list)
+
+
+def generate_details_photos_content(data_loader: DataLoader, templates: PageTemplates, answer_value, out_pages_path):
+    photos_list = get_details_photos(data_loader, answer_value, out_pages_path)
+    if not photos_list:
+        return ""
+    content_list = []
+    content_list.append("""<div class="photogallery bottomspace">\n""")
+    content_list.append(f"""<div class="photostitle">{templates.labels["photos_label"]}:</div>\n""")
+    for img_rel_path, license_content in photos_list:
+        if license_content is not None:
+            license_content = (
+                f"""<div class="license"><div>{templates.labels["license_label"]}:</div>{license_content}</div>"""
+            )
+        else:
+            license_content = ""
+        content_list.append("""<div class="imgtile">\n""")
+        content_list.append(f"""    <a href="{img_rel_path}"><img src="{img_rel_path}"></a>\n""")
+        content_list.append(f"""    {license_content}\n""")
+        content_list.append("""</div>\n""")
+    content_list.append("</div>")
+    return "".join(content_list)
+
+
+## returns list of pairs [photo path relative to 'out_pages_path', license content or None]
+def get_details_photos(data_loader: DataLoader, answer_value, out_pages_path):
     photos_data = data_loader.photos_dict
     if photos_data is None:
-        return ""
+        return []
     img_list = photos_data.get(answer_value)
     if img_list is None:
-        return ""
-    content = ""
-    content += """<div class="photogallery bottomspace">\n"""
-    content += f"""<div class="photostitle">{data_loader.get_translation("Photos")}:</div>\n"""
+        return []
+    photos_list = []
     for img_src, img_dest in img_list:
         img_rel_path = os.path.relpath(img_dest, out_pages_path)
-        license_path = img_src + ".lic"
-        license_content = ""
-        if os.path.isfile(license_path):
-            license_content = read_data(license_path)
-            license_content = (
-                f"""<div class="license"><div>{data_loader.get_translation("License")}:</div>{license_content}</div>"""
-            )
-        else:
+        license_content = data_loader.get_photo_index().get_license(img_src)
+        if license_content is None:
             _LOGGER.warning("unable to find license file for image %s", img_src)
-        content += """<div class="imgtile">\n"""
-        content += f"""    <a href="{img_rel_path}"><img src="{img_rel_path}"></a>\n"""
-        content += f"""    {license_content}\n"""
-        content += """</div>\n"""
-    content += "</div>"
-    return content
+        photos_list.append([img_rel_path, license_content])
+    return photos_list
 
 
 # ==================================================================
 
 
-def generate_category_pages(data_loader: DataLoader, details_page_dict, dest_photos_dict, output_path):
+def generate_category_pages(
+    data_loader: DataLoader,
+    templates: PageTemplates,
+    details_page_dict,
+    dest_photos_dict,
+    assets_dict,
+    writer: OutputWriter,
+):
     ret_dict = {}
 
     answer_col_name = data_loader.get_answer_column_name()
-    columns_list = list(data_loader.model_data.columns)
-    pages_dir = data_loader.config_dict.get("subpage_dir", "pages")
-    out_pages_path = os.path.join(output_path, pages_dir)
-    os.makedirs(out_pages_path, exist_ok=True)
-
-    answer_counter = 0
-    # iteate through column names - for each generate separate page
-    for column_name in columns_list:
-        if column_name == answer_col_name:
-            continue
+    columns_list = [column_name for column_name in data_loader.get_columns_list() if column_name != answer_col_name]
+    layout = PageLayout.create(data_loader.config_dict)
+    values_dict = data_loader.get_possible_values_dict()
+    ## all pages of categories have the same depth, so cells of answers are rendered once
+    root_path = layout.get_root_path("category_0.html")
+    answer_cells_dict = get_category_answer_cells(data_loader, details_page_dict, dest_photos_dict, root_path)
+
+    pages_log = progress.stage("category pages")
+    # iteate through column names - for each generate separate pages
+    for column_index, column_name in enumerate(columns_list):
+        page_name = f"category_{column_index}.html"
+        pages_num = generate_category_column_pages(
+            data_loader,
+            templates,
+            answer_cells_dict,
+            column_name,
+            values_dict.get(column_name),
+            page_name,
+            assets_dict,
+            writer,
+        )
+        pages_log.add(pages_num)
+        ret_dict[column_name] = layout.get_page_path(page_name)
+    pages_log.finish()
+    return ret_dict
 
-        page_name = f"category_{answer_counter}.html"
-        out_answer_path = os.path.join(out_pages_path, page_name)
-        generate_category_single_page(data_loader, details_page_dict, dest_photos_dict, column_name, out_answer_path)
 
-        answer_counter += 1
-        rel_path = os.path.join(pages_dir, page_name)
-        ret_dict[column_name] = rel_path
+## returns dict: [answer, (link to details page, gallery of photos)]
+def get_category_answer_cells(data_loader: DataLoader, details_page_dict, dest_photos_dict, root_path):
+    ret_dict = {}
+    for answer_value in data_loader.weights_dict:
+        answer_item = details_page_dict.get(answer_value)
+        if answer_item is None:
+            answer_item = answer_value
+        else:
+            answer_item = f"""<a href="{root_path}{answer_item}">{answer_value}</a>"""
+        gallery = generate_category_gallery(dest_photos_dict.get(answer_value), root_path)
+        ret_dict[answer_value] = (answer_item, gallery)
     return ret_dict
 
 
-def generate_category_single_page(
-    data_loader: DataLoader, details_page_dict, dest_photos_dict, column_name, out_answer_path
+## generate pages of single category
+## returns number of written pages
+## rows (pairs of value and matching answer) are split into pages of 'category_page_rows' rows,
+## first page contains index of values if there is more than one page
+def generate_category_column_pages(
+    data_loader: DataLoader,
+    templates: PageTemplates,
+    answer_cells_dict,
+    column_name,
+    col_values_list,
+    page_name,
+    assets_dict,
+    writer: OutputWriter,
 ):
-    page_title = data_loader.get_page_title()
-    answer_col_name = data_loader.get_answer_column_name()
-    values_dict = data_loader.get_possible_values_dict()
-
+    output_path = writer.output_path
+    layout = PageLayout.create(data_loader.config_dict)
+    page_rows = max(1, int(data_loader.config_dict.get("category_page_rows", 500)))
     column_translation = data_loader.get_translation(column_name, "category")
-
-    curr_page_title = page_title
-    if curr_page_title:
-        curr_page_title = f"""<title>{column_translation} - {curr_page_title}</title>"""
-
-    # generate categories table
-    categories_content = """<table cellspacing="0" class="categoriestable">\n"""
-    categories_content += f"""<tr> <th>{column_translation}:</th> </tr>\n"""
-    col_values_list = values_dict.get(column_name)
+    rows_list, values_list = get_category_rows(data_loader, column_name, col_values_list, page_rows)
+
+    base_name = page_name[: -len(".html")]
+    pages_list = [page_name]
+    for page_index in range(1, max(1, (len(rows_list) + page_rows - 1) // page_rows)):
+        pages_list.append(f"{base_name}_{page_index}.html")
+    ## create all directories at once
+    for page_dir in layout.get_dirs(pages_list):
+        writer.makedirs(os.path.join(output_path, page_dir))
+
+    multi_page = len(pages_list) > 1
+    for page_index, curr_page_name in enumerate(pages_list):
+        page_rows_list = rows_list[page_index * page_rows : (page_index + 1) * page_rows]
+        content_list = []
+        pagination_content = ""
+        if multi_page:
+            pagination_content = generate_category_pagination(templates, layout, pages_list, page_index)
+            content_list.append(pagination_content)
+            if page_index == 0:
+                content_list.append(generate_category_index(layout, column_translation, values_list, pages_list))
+        content_list.append(generate_category_table(column_translation, page_rows_list, answer_cells_dict, multi_page))
+        if multi_page:
+            content_list.append("\n")
+            content_list.append(pagination_content)
+
+        page_content = templates.render(
+            "category_page.html",
+            title=templates.get_title(column_translation),
+            ## all pages of category have the same depth
+            root_path=layout.get_root_path(page_name),
+            styles_path=assets_dict["styles.css"],
+            content="".join(content_list),
+        )
+        out_page_path = os.path.join(layout.get_out_dir(output_path, curr_page_name), curr_page_name)
+        writer.write_data(out_page_path, page_content)
+    return len(pages_list)
+
+
+## returns tuple: list of rows and list of values
+## row: [value index, value name, answer index, answer or None, number of value rows]
+## value: [value name, number of answers, page index]
+def get_category_rows(data_loader: DataLoader, column_name, col_values_list, page_rows):
+    matching_dict = data_loader.get_matching_answers_dict(column_name)
+    rows_list = []
+    values_list = []
     for col_val_index, col_value in enumerate(col_values_list):
-        # get answers matching column value
-        found_items = []
-        model_dict_list = data_loader.get_model_json()
-        for data_row in model_dict_list:
-            data_values = data_row.get(column_name)
-            if data_values is None:
-                continue
-            if col_value in data_values:
-                answer_values = data_row.get(answer_col_name)
-                found_items.extend(answer_values)
-
+        found_items = matching_dict.get(col_value, [])
         col_name = data_loader.get_translation(str(col_value), "category")
-
-        for answer_index, answer_value in enumerate(found_items):
-            answer_item = details_page_dict.get(answer_value)
-            if answer_item is None:
-                answer_item = answer_value
-            else:
-                answer_item = f"""<a href="../{answer_item}">{answer_value}</a>"""
-
-            gallery = ""
-            answer_images = dest_photos_dict.get(answer_value)
-            if answer_images:
-                gallery += """<div class='minigallery'>"""
-                for image in answer_images:
-                    img_path = f"../{image}"
-                    gallery += f"""<a href="{img_path}"><img src="{img_path}"></a>"""
-                gallery += """</div>"""
-
-            if answer_index == 0:
-                answer_num = len(found_items)
-                first_column = f"""<td rowspan='{answer_num}'>{col_name}</td>"""
-            else:
-                first_column = ""
-
-            row_class = ""
-            if (col_val_index + answer_index) % 2 == 0:
-                row_class = "roweven"
-            else:
-                row_class = "rowodd"
-            categories_content += (
-                f"""<tr class="{row_class}"> {first_column} <td>{answer_item}</td> <td>{gallery}</td> </tr>\n"""
-            )
-
+        values_list.append((col_name, len(found_items), len(rows_list) // page_rows))
         if len(found_items) < 1:
             # no results for given value
-            first_column = f"""<td rowspan='1'>{col_name}</td>"""
-            row_class = ""
-            if (col_val_index) % 2 == 0:
-                row_class = "roweven"
-            else:
-                row_class = "rowodd"
-            categories_content += f"""<tr class="{row_class}"> {first_column} <td></td> <td></td> </tr>\n"""
-    categories_content += """</table>\n"""
-
-    content = ""
-    content += f"""<html>
-<head>
-{curr_page_title}
-<link rel="stylesheet" type="text/css" href="../styles.css">
-</head>
-<body>
-<div class="bottomspace">
-<a href="../index.html">{data_loader.get_translation("Back to Filters")}</a>
-</div>
-<div class="categories bottomspace">
-{categories_content}
-</div>
-</body>
-</html>
-"""
+            rows_list.append((col_val_index, col_name, 0, None, 1))
+            continue
+        for answer_index, answer_value in enumerate(found_items):
+            rows_list.append((col_val_index, col_name, answer_index, answer_value, len(found_items)))
+    return rows_list, values_list
+
+
+## table of rows of single page of category
+def generate_category_table(column_translation, page_rows_list, answer_cells_dict, multi_page):
+    content_list = ["""<div class="categories bottomspace">\n"""]
+    content_list.append("""<table cellspacing="0" class="categoriestable">\n""")
+    content_list.append(f"""<tr> <th>{column_translation}:</th> </tr>\n""")
+    for row_index, row_data in enumerate(page_rows_list):
+        col_val_index, col_name, answer_index, answer_value, value_rows = row_data
+        answer_item, gallery = "", ""
+        if answer_value is not None:
+            answer_item, gallery = answer_cells_dict[answer_value]
+
+        if answer_index == 0 or row_index == 0:
+            ## value cell spans its rows on current page
+            answer_num = min(value_rows - answer_index, len(page_rows_list) - row_index)
+            value_id = ""
+            if multi_page and answer_index == 0:
+                value_id = f' id="value_{col_val_index}"'
+            first_column = f"""<td rowspan='{answer_num}'{value_id}>{col_name}</td>"""
+        else:
+            first_column = ""
+
+        row_class = ""
+        if (col_val_index + answer_index) % 2 == 0:
+            row_class = "roweven"
+        else:
+            row_class = "rowodd"
+        content_list.append(
+            f"""<tr class="{row_class}"> {first_column} <td>{answer_item}</td> <td>{gallery}</td> </tr>\n"""
+        )
+    content_list.append("""</table>\n""")
+    content_list.append("""\n</div>""")
+    return "".join(content_list)
 
-    _LOGGER.info("writing page to %s", out_answer_path)
-    write_data(out_answer_path, content)
+
+def generate_category_gallery(answer_images, root_path):
+    if not answer_images:
+        return ""
+    gallery_list = ["""<div class='minigallery'>"""]
+    for image in answer_images:
+        img_path = f"{root_path}{image}"
+        gallery_list.append(f"""<a href="{img_path}"><img src="{img_path}" loading="lazy"></a>""")
+    gallery_list.append("""</div>""")
+    return "".join(gallery_list)
+
+
+## 'values_list' - list of tuples: [value name, number of answers, page index]
+def generate_category_index(layout: PageLayout, column_translation, values_list, pages_list):
+    content_list = ["""<div class="categoriesindex bottomspace">\n"""]
+    content_list.append("""<table cellspacing="0" class="categoriesindextable">\n""")
+    content_list.append(f"""<tr> <th>{column_translation}:</th> </tr>\n""")
+    for col_val_index, (col_name, answer_num, page_index) in enumerate(values_list):
+        page_link = ""
+        if page_index > 0:
+            page_link = layout.get_link(pages_list[0], pages_list[page_index])
+        value_link = f"""<a href="{page_link}#value_{col_val_index}">{col_name}</a>"""
+        content_list.append(f"""<tr> <td>{value_link}</td> <td>{answer_num}</td> </tr>\n""")
+    content_list.append("""</table>\n""")
+    content_list.append("""</div>\n""")
+    return "".join(content_list)
+
+
+def generate_category_pagination(templates: PageTemplates, layout: PageLayout, pages_list, page_index):
+    curr_page_name = pages_list[page_index]
+    links_list = []
+    prev_link = templates.labels["prev_label"]
+    if page_index > 0:
+        prev_link = f"""<a href="{layout.get_link(curr_page_name, pages_list[page_index - 1])}">{prev_link}</a>"""
+    links_list.append(prev_link)
+    for link_index, link_page_name in enumerate(pages_list):
+        if link_index == page_index:
+            links_list.append(f"""<span class="activeoption">{link_index + 1}</span>""")
+            continue
+        links_list.append(f"""<a href="{layout.get_link(curr_page_name, link_page_name)}">{link_index + 1}</a>""")
+    next_link = templates.labels["next_label"]
+    if page_index < len(pages_list) - 1:
+        next_link = f"""<a href="{layout.get_link(curr_page_name, pages_list[page_index + 1])}">{next_link}</a>"""
+    links_list.append(next_link)
+    return f"""<div class="pagination bottomspace">{" ".join(links_list)}</div>\n"""
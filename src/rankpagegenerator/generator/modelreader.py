@@ -0,0 +1,251 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import abc
+import importlib.util
+from typing import Dict
+
+import pandas
+from pandas.core.frame import DataFrame
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    ## Parquet files are optional
+    pyarrow = None
+
+from rankpagegenerator.generator.dataframe import read_sheet, extract_table
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## extensions of files read by 'pandas.read_excel'
+EXCEL_EXTENSIONS = {".xls", ".xlsx", ".xlsm", ".ods"}
+
+## extensions of single table files, in order of preference
+TABLE_EXTENSIONS = [".parquet", ".csv"]
+
+## dict: [section marker, name of section file in model directory]
+SECTIONS_DICT = {
+    "Config:": "config",
+    "Data type:": "data_type",
+    "Order:": "order",
+    "Data:": "data",
+    "Details:": "details",
+}
+
+
+##
+## Source of model tables.
+##
+## Each table is identified by its marker (e.g. "Data:"). Tables are returned as
+## data frames of strings (empty cells as empty strings) or None if table not exists.
+## If 'assume_default' is set and table has no marker, then whole content is returned.
+##
+class ModelReader(abc.ABC):
+    def __init__(self, model_path):
+        self.model_path = model_path
+
+    ## directory containing model resources (e.g. photos)
+    def get_model_dir(self):
+        return os.path.dirname(self.model_path)
+
+    @abc.abstractmethod
+    def get_table(self, marker, assume_default=False) -> DataFrame:
+        pass
+
+    ## yields table in chunks of rows (chunks have own index starting from zero)
+    ## readers not supporting chunks yield whole table
+    def iter_table(self, marker, assume_default=False, chunk_size=None):  # pylint: disable=unused-argument
+        table = self.get_table(marker, assume_default)
+        if table is not None:
+            yield table
+
+    def close(self):
+        pass
+
+
+##
+## Reads tables from first sheet of Excel or OpenDocument file.
+## Sheet is parsed once, tables are cut from parsed content.
+##
+class ExcelReader(ModelReader):
+    def __init__(self, model_path, engine=None):
+        super().__init__(model_path)
+        if engine is None:
+            engine = get_excel_engine(model_path)
+        self.engine = engine
+        self._content: DataFrame = None
+
+    def get_table(self, marker, assume_default=False) -> DataFrame:
+        if self._content is None:
+            self._content = read_sheet(self.model_path, engine=self.engine)
+        if self._content is None:
+            return None
+        return extract_table(self._content, marker, assume_default)
+
+    def close(self):
+        self._content = None
+
+
+##
+## Reads tables from directory containing file for each section,
+## e.g. 'data.parquet', 'order.csv'.
+##
+class DirectoryReader(ModelReader):
+    def get_model_dir(self):
+        return self.model_path
+
+    def get_table(self, marker, assume_default=False) -> DataFrame:
+        section_name = SECTIONS_DICT.get(marker)
+        if section_name is None:
+            raise ValueError(f"unknown section '{marker}'")
+        table_path = find_table_file(self.model_path, section_name)
+        if table_path is None:
+            if assume_default:
+                raise FileNotFoundError(f"unable to find '{section_name}' table in {self.model_path}")
+            return None
+        return read_table_file(table_path)
+
+    def iter_table(self, marker, assume_default=False, chunk_size=None):
+        if chunk_size is None:
+            yield from super().iter_table(marker, assume_default)
+            return
+        section_name = SECTIONS_DICT.get(marker)
+        table_path = find_table_file(self.model_path, section_name) if section_name else None
+        if table_path is None:
+            yield from super().iter_table(marker, assume_default)
+            return
+        yield from iter_table_file(table_path, chunk_size)
+
+
+##
+## Reads data of model from single CSV or Parquet file (model without other sections).
+##
+class TableFileReader(ModelReader):
+    def get_table(self, marker, assume_default=False) -> DataFrame:
+        if not assume_default:
+            return None
+        return read_table_file(self.model_path)
+
+    def iter_table(self, marker, assume_default=False, chunk_size=None):
+        if not assume_default:
+            return
+        if chunk_size is None:
+            yield read_table_file(self.model_path)
+            return
+        yield from iter_table_file(self.model_path, chunk_size)
+
+
+## reader is selected by type of model path
+def create_reader(model_path) -> ModelReader:
+    if os.path.isdir(model_path):
+        return DirectoryReader(model_path)
+    extension = os.path.splitext(model_path)[1].lower()
+    if extension in TABLE_EXTENSIONS:
+        return TableFileReader(model_path)
+    if extension not in EXCEL_EXTENSIONS:
+        _LOGGER.warning("unknown model file extension '%s', reading as Excel file", extension)
+    return ExcelReader(model_path)
+
+
+## returns time of last modification of model (latest of section files in case of directory)
+def get_model_mtime(model_path):
+    try:
+        if not os.path.isdir(model_path):
+            return os.path.getmtime(model_path)
+        mtime_list = [os.path.getmtime(model_path)]
+        for entry in os.scandir(model_path):
+            if entry.is_file():
+                mtime_list.append(entry.stat().st_mtime)
+        return max(mtime_list)
+    except OSError:
+        return None
+
+
+# =========================================
+
+
+## returns name of fastest available engine or None (pandas default for file type)
+def get_excel_engine(model_path):
+    extension = os.path.splitext(model_path)[1].lower()
+    if extension not in EXCEL_EXTENSIONS:
+        return None
+    ## Rust based reader is order of magnitude faster than Python engines (supported since pandas 2.2)
+    if importlib.util.find_spec("python_calamine") is not None and is_pandas_version(2, 2):
+        return "calamine"
+    return None
+
+
+def is_pandas_version(major, minor):
+    version_list = pandas.__version__.split(".")
+    try:
+        return (int(version_list[0]), int(version_list[1])) >= (major, minor)
+    except (IndexError, ValueError):
+        return False
+
+
+def find_table_file(dir_path, table_name):
+    for extension in TABLE_EXTENSIONS:
+        table_path = os.path.join(dir_path, table_name + extension)
+        if os.path.isfile(table_path):
+            return table_path
+    return None
+
+
+def read_table_file(table_path) -> DataFrame:
+    extension = os.path.splitext(table_path)[1].lower()
+    if extension == ".parquet":
+        ## requires 'pyarrow' or 'fastparquet'
+        return to_str_table(pandas.read_parquet(table_path))
+    return pandas.read_csv(table_path, dtype=str, keep_default_na=False)
+
+
+def iter_table_file(table_path, chunk_size):
+    extension = os.path.splitext(table_path)[1].lower()
+    if extension == ".parquet":
+        if pyarrow is None:
+            yield read_table_file(table_path)
+            return
+        parquet_file = pyarrow.parquet.ParquetFile(table_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield to_str_table(batch.to_pandas())
+        return
+    with pandas.read_csv(table_path, dtype=str, keep_default_na=False, chunksize=chunk_size) as csv_reader:
+        for chunk in csv_reader:
+            yield chunk.reset_index(drop=True)
+
+
+def to_str_table(content: DataFrame) -> DataFrame:
+    content = content.astype(str)
+    return content.replace({"nan": "", "None": ""})
+
+
+## writes model tables as section files of model directory
+## 'tables_dict' - dict: [section marker, data frame]
+def write_model_dir(tables_dict: Dict[str, DataFrame], dir_path, extension=".csv"):
+    os.makedirs(dir_path, exist_ok=True)
+    for marker, table in tables_dict.items():
+        if table is None:
+            continue
+        table_path = os.path.join(dir_path, SECTIONS_DICT[marker] + extension)
+        if extension == ".parquet":
+            table.to_parquet(table_path, index=False)
+        else:
+            table.to_csv(table_path, index=False)
+
+
+## returns dict: [section marker, data frame]
+def read_model_tables(reader: ModelReader) -> Dict[str, DataFrame]:
+    ret_dict = {}
+    for marker in SECTIONS_DICT:
+        ret_dict[marker] = reader.get_table(marker, assume_default=marker == "Data:")
+    return ret_dict
@@ -0,0 +1,73 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import posixpath
+
+from rankpagegenerator.utils import calculate_hash
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+##
+## Placement of subpages (details and category pages) inside output directory.
+##
+## With 'shard_levels' greater than zero pages are distributed into nested
+## directories named after hash of page name, e.g. "pages/03/7f/match_12.html",
+## so no directory contains too many files.
+##
+## All paths returned are relative and use '/' separator, so they can be used as links.
+##
+class PageLayout:
+    def __init__(self, pages_dir="pages", shard_levels=0):
+        self.pages_dir = pages_dir
+        self.shard_levels = shard_levels
+
+    @staticmethod
+    def create(config_dict) -> "PageLayout":
+        pages_dir = config_dict.get("subpage_dir", "pages")
+        shard_levels = int(config_dict.get("subpage_shard_levels", 0))
+        return PageLayout(pages_dir, shard_levels)
+
+    def get_page_dir(self, page_name):
+        ## directory of page relative to output directory
+        if self.shard_levels < 1:
+            return self.pages_dir
+        name_hash = calculate_hash(page_name)
+        shard_dirs = [name_hash[level * 2 : level * 2 + 2] for level in range(0, self.shard_levels)]
+        return posixpath.join(self.pages_dir, *shard_dirs)
+
+    def get_page_path(self, page_name):
+        ## path of page relative to output directory
+        return posixpath.join(self.get_page_dir(page_name), page_name)
+
+    def get_root_path(self, page_name):
+        ## path from directory of page to output directory, e.g. "../../"
+        depth = len(self.get_page_dir(page_name).split("/"))
+        return "../" * depth
+
+    def get_link(self, from_page_name, to_page_name):
+        ## relative link between two subpages
+        if self.shard_levels < 1:
+            ## all pages in the same directory
+            return to_page_name
+        from_dir = self.get_page_dir(from_page_name)
+        return posixpath.relpath(self.get_page_path(to_page_name), from_dir)
+
+    def get_dirs(self, pages_list):
+        ## returns sorted list of directories required by pages (each directory once)
+        dirs_set = set()
+        for page_name in pages_list:
+            dirs_set.add(self.get_page_dir(page_name))
+        return sorted(dirs_set)
+
+    def get_out_dir(self, output_path, page_name):
+        ## absolute directory of page
+        return os.path.join(output_path, *self.get_page_dir(page_name).split("/"))
@@ -17,7 +17,7 @@ import pandas
 from pandas.core.frame import DataFrame
 
 from rankpagegenerator.generator.dataframe import load_table_from_excel, to_dict_list
-from rankpagegenerator.utils import write_data
+from rankpagegenerator.generator.writer import OutputWriter
 
 
 SCRIPT_DIR = os.path.dirname(__file__)
@@ -36,22 +36,28 @@ def parse_license_file(license_path, output_path):
         item_photos.append(license_item)
         photos_dict[item] = item_photos
 
-    for item, values in photos_dict.items():
-        out_dir = os.path.join(output_path, item)
-        os.makedirs(out_dir, exist_ok=True)
-        for photo_index, photo_data in enumerate(values):
-            photo_url = photo_data["direct_url"][0]
-            file_name = f"""{photo_index}.img"""
-            license_dict = {}
-            license_dict["url"] = photo_url
-            license_dict["filename"] = file_name
-            license_dict["attribution"] = photo_data["attribution"][0]
-            out_img_path = os.path.join(out_dir, file_name)
-            _LOGGER.debug("downloading file %s to %s", photo_url, out_img_path)
-            download_image(photo_url, out_img_path, retry=True)
-            out_lic_path = os.path.join(out_dir, f"""{file_name}.lic""")
-            out_content = json.dumps(license_dict, indent=4)
-            write_data(out_lic_path, out_content)
+    ## photos directory can contain other files, so it is not replaced
+    with OutputWriter(output_path, atomic=False) as writer:
+        for item, values in photos_dict.items():
+            write_item_photos(item, values, writer)
+
+
+def write_item_photos(item, values, writer: OutputWriter):
+    out_dir = os.path.join(writer.output_path, item)
+    writer.makedirs(out_dir)
+    for photo_index, photo_data in enumerate(values):
+        photo_url = photo_data["direct_url"][0]
+        file_name = f"""{photo_index}.img"""
+        license_dict = {}
+        license_dict["url"] = photo_url
+        license_dict["filename"] = file_name
+        license_dict["attribution"] = photo_data["attribution"][0]
+        out_img_path = os.path.join(out_dir, file_name)
+        _LOGGER.debug("downloading file %s to %s", photo_url, out_img_path)
+        download_image(photo_url, out_img_path, writer, retry=True)
+        out_lic_path = os.path.join(out_dir, f"""{file_name}.lic""")
+        out_content = json.dumps(license_dict, indent=4)
+        writer.write_data(out_lic_path, out_content)
 
 
 ## ============================================
@@ -79,7 +85,7 @@ class LicenseLoader:
         return data_list
 
 
-def download_image(url, output_path, retry=False) -> bool:
+def download_image(url, output_path, writer: OutputWriter, retry=False) -> bool:
     while True:
         response = requests.get(url, timeout=30)
         if response.status_code != 200:
@@ -89,6 +95,5 @@ def download_image(url, output_path, retry=False) -> bool:
             time.sleep(1.0)
             continue
         img_data = response.content
-        with open(output_path, "wb") as handler:
-            handler.write(img_data)
+        writer.write_bytes(output_path, img_data)
         return True
@@ -0,0 +1,154 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import hashlib
+import threading
+import json
+from typing import Dict, List
+
+from rankpagegenerator.utils import get_app_datadir, read_data, prune_cache_dir, touch_cache_file
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## extension of file containing license of image (e.g. 'photo.jpg.lic')
+LICENSE_EXTENSION = ".lic"
+
+CACHE_VERSION = 1
+
+
+##
+## Index of photos of answers (images placed in 'photos/<answer>' subdirectories).
+##
+## Directory is scanned once. For each image its size, modification time and content
+## of license file is stored. Licenses are read only if changed since previous run
+## (index is cached in application data directory, indexes not used recently are removed).
+##
+class PhotoIndex:
+    def __init__(self, photos_dir, use_cache=True):
+        self.photos_dir = photos_dir
+        ## dict: [subdirectory name, list of photo dicts sorted by name]
+        ## photo dict: {"name", "path", "size", "mtime", "license": {"size", "mtime", "content"} or None}
+        self.photos_dict: Dict[str, List[Dict]] = {}
+        ## dict: [image path, photo dict]
+        self._paths_dict: Dict[str, Dict] = {}
+
+        cache_path = get_cache_path(photos_dir) if use_cache else None
+        cached_dict = load_cache(cache_path)
+        self.photos_dict = scan_photos(photos_dir, cached_dict)
+        for photos_list in self.photos_dict.values():
+            for photo in photos_list:
+                self._paths_dict[photo["path"]] = photo
+        if self.photos_dict != cached_dict:
+            save_cache(cache_path, self.photos_dict)
+
+    ## returns list of image paths or None if there is no photos directory of answer
+    def get_photos(self, answer) -> List[str]:
+        photos_list = self.photos_dict.get(answer)
+        if photos_list is None:
+            return None
+        return [photo["path"] for photo in photos_list]
+
+    ## returns content of license file of image or None if not found
+    def get_license(self, img_path):
+        photo = self._paths_dict.get(img_path)
+        if photo is None or photo["license"] is None:
+            return None
+        return photo["license"]["content"]
+
+
+## scans photos directory ('os.scandir' of directory and each subdirectory)
+## content of license files is taken from 'cached_dict' if size and modification time did not change
+def scan_photos(photos_dir, cached_dict=None) -> Dict[str, List[Dict]]:
+    if cached_dict is None:
+        cached_dict = {}
+    ret_dict = {}
+    try:
+        with os.scandir(photos_dir) as dir_iter:
+            subdirs_list = [entry for entry in dir_iter if entry.is_dir()]
+    except FileNotFoundError:
+        return ret_dict
+    for subdir in subdirs_list:
+        ## dict: [license path, license dict] of previous run
+        cached_licenses = {}
+        for photo in cached_dict.get(subdir.name, []):
+            if photo["license"] is not None:
+                cached_licenses[photo["path"] + LICENSE_EXTENSION] = photo["license"]
+
+        images_dict = {}
+        licenses_dict = {}
+        with os.scandir(subdir.path) as dir_iter:
+            for entry in dir_iter:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                file_dict = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+                if entry.name.endswith(LICENSE_EXTENSION):
+                    licenses_dict[entry.path] = file_dict
+                else:
+                    images_dict[entry.name] = file_dict
+
+        photos_list = []
+        for img_name in sorted(images_dict.keys()):
+            img_path = os.path.join(subdir.path, img_name)
+            license_path = img_path + LICENSE_EXTENSION
+            license_dict = licenses_dict.get(license_path)
+            if license_dict is not None:
+                cached_license = cached_licenses.get(license_path)
+                if cached_license is not None and cached_license["size"] == license_dict["size"]:
+                    if cached_license["mtime"] == license_dict["mtime"]:
+                        license_dict = cached_license
+                if "content" not in license_dict:
+                    license_dict["content"] = read_data(license_path)
+            photo = {"name": img_name, "path": img_path, "license": license_dict}
+            photo.update(images_dict[img_name])
+            photos_list.append(photo)
+        ret_dict[subdir.name] = photos_list
+    return ret_dict
+
+
+# =========================================
+
+
+def get_cache_path(photos_dir):
+    hash_alg = hashlib.md5()  # nosec
+    hash_alg.update(os.path.abspath(photos_dir).encode("utf8"))
+    cache_dir = os.path.join(get_app_datadir(), "photoindex")
+    return os.path.join(cache_dir, hash_alg.hexdigest() + ".json")
+
+
+def load_cache(cache_path):
+    if cache_path is None or not os.path.isfile(cache_path):
+        return None
+    try:
+        with open(cache_path, "r", encoding="utf8") as fp:
+            cache_data = json.load(fp)
+        if cache_data.get("version") != CACHE_VERSION:
+            return None
+        touch_cache_file(cache_path)
+        _LOGGER.info("loaded photo index from cache: %s", cache_path)
+        return cache_data["photos"]
+    except (OSError, ValueError, KeyError):
+        _LOGGER.warning("unable to load photo index cache: %s", cache_path)
+        return None
+
+
+def save_cache(cache_path, photos_dict):
+    if cache_path is None:
+        return
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    ## cache can be saved concurrently by many builds
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf8") as fp:
+        json.dump({"version": CACHE_VERSION, "photos": photos_dict}, fp)
+    os.replace(tmp_path, cache_path)
+    ## index of each photos directory is cached separately, indexes not used recently are removed
+    prune_cache_dir(os.path.dirname(cache_path))
@@ -0,0 +1,141 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import logging
+from urllib.parse import urlencode
+
+from rankpagegenerator.generator.utils import to_js_string
+from rankpagegenerator.generator.translation import TranslationResolver
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## name of URL parameter holding matching mode (same as in rankworker.js)
+MODE_PARAM = "_mode"
+MODE_FILTER = "filter"
+MODE_RANK = "rank"
+
+
+##
+## Renders initial state of main page (no filters selected).
+##
+## Markup and order of items is the same as produced by 'Navigator' class
+## of navigate.js, so content can be embedded in page at build time and
+## script has to render content only after filter is applied.
+## Links are relative to current page ("?key=value").
+## Labels are translated by resolver of build, so missing translations are reported.
+##
+class NavigationRenderer:
+    def __init__(self, values_dict, category_pages, detail_pages, answer_column, translation, photos_dict):
+        self.values_dict = values_dict
+        self.category_pages = category_pages
+        self.detail_pages = detail_pages
+        self.answer_column = answer_column
+        if translation is None:
+            translation = TranslationResolver()
+        self.translation: TranslationResolver = translation
+        self.photos_dict = photos_dict
+
+    def generate_content(self):
+        return self.generate_filter_table() + self.generate_results_table(self.find_simple_answer())
+
+    def generate_filter_table(self):
+        content_list = ["""<table cellspacing="0" class="filterstable">"""]
+        content_list.append(f"""<tr> <th>{self.get_translation("Parameters")}:</th> </tr>""")
+        separator = self.get_separator()
+        for option_key, option_values in self.values_dict.items():
+            if option_key == self.answer_column:
+                continue
+
+            category_content = self.get_translation(option_key, "category")
+            if option_key in self.category_pages:
+                link_href = self.category_pages[option_key]
+                category_content = f"""<a href="{link_href}">{category_content}</a>"""
+
+            link_list = []
+            for option_val in option_values:
+                val_label = self.get_translation(option_val, "category")
+                if val_label == "":
+                    val_label = f"""[{self.get_translation("empty")}]"""
+                request_url = make_request_params({option_key: [option_val]})
+                link_list.append(f"""<a href='{request_url}' class="navlink">{val_label}</a> """)
+
+            links_string = f" {separator} ".join(link_list)
+            content_list.append(f"""<tr> <td>{category_content}</td> <td>{links_string}</td> </tr>""")
+        if self.get_categories():
+            content_list.append(self.generate_mode_row())
+        content_list.append("</table>")
+        return "".join(content_list)
+
+    def generate_mode_row(self):
+        link_list = []
+        for mode, mode_label in [(MODE_RANK, "Rank"), (MODE_FILTER, "Filter")]:
+            request_url = make_request_params({MODE_PARAM: mode})
+            link_style = "navlink"
+            if mode == MODE_RANK:
+                link_style += " activeoption"
+            mode_label = self.get_translation(mode_label)
+            link_list.append(f"""<a href='{request_url}' class="{link_style}">{mode_label}</a> """)
+        links_string = f" {self.get_separator()} ".join(link_list)
+        return f"""<tr> <td>{self.get_translation("Matching")}</td> <td>{links_string}</td> </tr>"""
+
+    def get_categories(self):
+        return [key for key in self.values_dict if key != self.answer_column]
+
+    def generate_results_table(self, rows_content):
+        return (
+            """<table cellspacing="0" class="resultstable">"""
+            f"""<tr> <th>{self.get_translation("Results")}:</th> </tr>"""
+            f"""{rows_content}</table>"""
+        )
+
+    def find_simple_answer(self):
+        answer_list = self.values_dict.get(self.answer_column, [])
+        content_list = []
+        for item_data in answer_list:
+            item_content = to_js_string(item_data)
+            if item_data in self.detail_pages:
+                link_href = self.detail_pages[item_data]
+                item_content = f"""<a href="{link_href}">{item_content}</a>"""
+            photo_gallery = self.generate_mini_gallery(item_data)
+            if photo_gallery != "":
+                photo_gallery = f"""<td>{photo_gallery}</td> """
+            content_list.append(f"""<tr> <td>{item_content}</td> <td></td> {photo_gallery}</tr>""")
+        return "".join(content_list)
+
+    def generate_mini_gallery(self, answer_value):
+        photos_list = self.photos_dict.get(answer_value)
+        if photos_list is None:
+            return ""
+        content_list = ["<div class='minigallery'>"]
+        for item_data in photos_list:
+            content_list.append(f"""<a href="{item_data}"><img src="{item_data}"></a>""")
+        content_list.append("</div>")
+        return "".join(content_list)
+
+    def get_separator(self):
+        separator = self.get_translation("filterseparator")
+        if separator == "filterseparator":
+            separator = "|"
+        return separator
+
+    ## values are translated in form presented by navigate.js (e.g. '2' for 2.0)
+    def get_translation(self, key, group=None):
+        return self.translation.translate(to_js_string(key), group)
+
+
+def make_request_params(data_dict):
+    params = []
+    for key, value in data_dict.items():
+        if isinstance(value, list):
+            for item in value:
+                params.append((key, to_js_string(item)))
+        else:
+            params.append((key, to_js_string(value)))
+    return "?" + urlencode(params)
@@ -0,0 +1,211 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import logging
+import math
+import json
+from urllib.parse import parse_qsl
+from typing import Dict, List
+
+import numpy
+
+from rankpagegenerator.generator.dataloader import DataLoader
+from rankpagegenerator.generator.utils import to_js_string
+from rankpagegenerator.generator.prerender import MODE_PARAM, MODE_FILTER
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+##
+## Calculates ranking of answers in the same way as 'Ranker' class of rankworker.js.
+##
+## Weights of each category are stored as matrix (answers x values), so batch
+## of queries is evaluated with matrix operations instead of loops over answers.
+##
+## Query has the same form as navigation data of main page:
+## dict: [category, value or list of values], optionally with matching mode
+## under '_mode' key ("rank" or "filter").
+##
+class RankingEngine:
+    def __init__(self, answer_list, weights_dict, values_dict):
+        ## 'values_dict' contains possible values of categories (without answer column)
+        self.answer_list = list(answer_list)
+        self.categories = list(values_dict.keys())
+        self.values_dict = values_dict
+        ## dict: [category, value string, row index of weights matrix]
+        self.values_index: Dict[str, Dict[str, int]] = {}
+
+        answers_num = len(self.answer_list)
+        rows_num = 0
+        for category, values in values_dict.items():
+            self.values_index[category] = {}
+            for value in values:
+                self.values_index[category][to_js_string(value)] = rows_num
+                rows_num += 1
+        ## row for each (category, value) pair, last row is padding (zero weights)
+        self.padding_row = rows_num
+        self.weights_matrix = numpy.zeros((rows_num + 1, answers_num), dtype=numpy.float64)
+        for answer_index, answer in enumerate(self.answer_list):
+            answer_weights = weights_dict.get(answer, {})
+            for category, index_dict in self.values_index.items():
+                for value, weight in answer_weights.get(category, {}).items():
+                    row_index = index_dict.get(to_js_string(value))
+                    if row_index is not None:
+                        self.weights_matrix[row_index, answer_index] = weight
+        self.matching_matrix = self.weights_matrix == 1.0
+
+        ## answers with equal weight are ordered by name
+        ## case-insensitive order approximates 'localeCompare()' used in browser
+        names_order = sorted(
+            range(0, answers_num), key=lambda index: (to_js_string(self.answer_list[index]).casefold(), index)
+        )
+        self.names_order = numpy.array(names_order, dtype=numpy.int64)
+        self.answers_array = numpy.empty(answers_num, dtype=object)
+        self.answers_array[:] = self.answer_list
+
+    @staticmethod
+    def create(data_loader: DataLoader) -> "RankingEngine":
+        values_dict = dict(data_loader.get_possible_values_dict())
+        answer_column_id = data_loader.get_answer_column_name()
+        answer_list = values_dict.pop(answer_column_id, [])
+        return RankingEngine(answer_list, data_loader.weights_dict, values_dict)
+
+    def rank(self, nav_data, limit=None):
+        ## returns dict: {"weights_list": list of pairs [answer, weight percentage], "total": number of found answers}
+        return self.rank_batch([nav_data], limit)[0]
+
+    def rank_batch(self, queries_list, limit=None, chunk_size=None) -> List[dict]:
+        ret_list = []
+        if chunk_size is None:
+            ## keep size of intermediate matrices limited
+            chunk_size = max(1, 2**20 // max(1, len(self.answer_list)))
+        for chunk_start in range(0, len(queries_list), chunk_size):
+            chunk = queries_list[chunk_start : chunk_start + chunk_size]
+            weights, totals = self.calculate_weights_matrix(chunk)
+            order = self.sort_matrix(weights)
+            if limit is not None:
+                order = order[:, :limit]
+            answers = self.answers_array[order].tolist()
+            weights = numpy.take_along_axis(weights, order, axis=1).tolist()
+            for row_answers, row_weights, total in zip(answers, weights, totals.tolist()):
+                found_num = min(len(row_answers), total)
+                weights_list = list(map(list, zip(row_answers[:found_num], row_weights[:found_num])))
+                ret_list.append({"weights_list": weights_list, "total": total})
+        return ret_list
+
+    def calculate_weights_matrix(self, queries_list):
+        ## returns pair: matrix of weight percentages (queries x answers), array of number of found answers
+        ## answers not matching query in filter mode have weight -inf
+        queries_list = [normalize_query(query) for query in queries_list]
+        queries_num = len(queries_list)
+        answers_num = len(self.answer_list)
+
+        ## weights are summed in order of filters in query (the same way as in browser)
+        filters_list = [[(key, values) for key, values in query.items() if key != MODE_PARAM] for query in queries_list]
+        filters_num = numpy.array([len(filters) for filters in filters_list], dtype=numpy.int64)
+        positions_num = max(filters_num, default=0)
+        values_num = max((len(values) for filters in filters_list for _, values in filters), default=0)
+        ## dict: [query, filter position, selected value, row of weights matrix]
+        rows_index = numpy.full((queries_num, positions_num, max(1, values_num)), self.padding_row, dtype=numpy.int64)
+        for query_index, filters in enumerate(filters_list):
+            for filter_index, (category, values) in enumerate(filters):
+                index_dict = self.values_index.get(category)
+                if index_dict is None:
+                    raise ValueError(f"unknown category: {category}")
+                for value_index, value in enumerate(values):
+                    rows_index[query_index, filter_index, value_index] = index_dict.get(value, self.padding_row)
+
+        weights_sum = numpy.zeros((queries_num, answers_num), dtype=numpy.float64)
+        matching = numpy.ones((queries_num, answers_num), dtype=bool)
+        for filter_index in range(0, positions_num):
+            ## weight of category is the best weight of selected values
+            filter_rows = rows_index[:, filter_index]
+            category_weights = numpy.maximum(self.weights_matrix[filter_rows[:, 0]], 0.0)
+            category_matching = self.matching_matrix[filter_rows[:, 0]]
+            for value_index in range(1, values_num):
+                numpy.maximum(category_weights, self.weights_matrix[filter_rows[:, value_index]], out=category_weights)
+                category_matching |= self.matching_matrix[filter_rows[:, value_index]]
+            weights_sum += category_weights
+            has_filter = filters_num > filter_index
+            matching &= category_matching | ~has_filter[:, numpy.newaxis]
+
+        weights = numpy.zeros((queries_num, answers_num), dtype=numpy.float64)
+        numpy.divide(weights_sum, filters_num[:, numpy.newaxis], out=weights, where=filters_num[:, numpy.newaxis] > 0)
+        weights *= 100.0
+
+        filter_mode = numpy.array([query.get(MODE_PARAM) == MODE_FILTER for query in queries_list], dtype=bool)
+        excluded = ~matching & filter_mode[:, numpy.newaxis]
+        weights[excluded] = -numpy.inf
+        totals = answers_num - excluded.sum(axis=1)
+        return weights, totals
+
+    def sort_matrix(self, weights):
+        ## returns indexes of answers ordered by descending weight and then by name
+        ## stable sort of answers already ordered by name
+        order = numpy.argsort(-weights[:, self.names_order], axis=1, kind="stable")
+        return self.names_order[order]
+
+
+def normalize_query(query) -> dict:
+    ## ensure every filter is list of value strings
+    ret_dict = {}
+    for key, value in query.items():
+        if key == MODE_PARAM:
+            ret_dict[key] = value
+            continue
+        if not isinstance(value, list):
+            value = [value]
+        ret_dict[key] = [to_js_string(item) for item in value]
+    return ret_dict
+
+
+# =========================================
+
+
+def rank_queries(data_loader: DataLoader, queries_list, limit=None) -> List[dict]:
+    ## returns list of dicts: {"query": query, "results": list of pairs [answer, percentage], "total": found answers}
+    ## percentages are rounded in the same way as on main page
+    engine = RankingEngine.create(data_loader)
+    ret_list = []
+    for query, result in zip(queries_list, engine.rank_batch(queries_list, limit)):
+        results = [[answer, round_percent(weight)] for answer, weight in result["weights_list"]]
+        ret_list.append({"query": query, "results": results, "total": result["total"]})
+    return ret_list
+
+
+def parse_query(query_text: str) -> dict:
+    ## query can be JSON object or URL query string, e.g. "size=S&size=L&_mode=filter"
+    query_text = query_text.strip()
+    if query_text.startswith("{"):
+        return json.loads(query_text)
+    ret_dict: Dict[str, object] = {}
+    for key, value in parse_qsl(query_text.lstrip("?"), keep_blank_values=True):
+        if key == MODE_PARAM:
+            ret_dict[key] = value
+            continue
+        values_list = ret_dict.setdefault(key, [])
+        if value not in values_list:
+            values_list.append(value)
+    return ret_dict
+
+
+def read_queries(queries_path) -> List[dict]:
+    ## read file with one query per line (JSON Lines)
+    ret_list = []
+    with open(queries_path, "r", encoding="utf8") as queries_file:
+        for line in queries_file:
+            if not line.strip():
+                continue
+            ret_list.append(parse_query(line))
+    return ret_list
+
+
+def round_percent(weight) -> int:
+    ## the same as 'Math.round()'
+    return int(math.floor(weight + 0.5))
@@ -0,0 +1,118 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import hashlib
+import threading
+
+import numpy
+
+from rankpagegenerator.utils import get_app_datadir, prune_cache_dir, touch_cache_file
+from rankpagegenerator.generator.ranking import RankingEngine
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## returns dict: [answer, list of pairs [similar answer, similarity]]
+## similarity is cosine of weights vectors of answers (value from 0.0 to 1.0)
+def find_similar_answers(engine: RankingEngine, similar_num, use_cache=True):
+    answers_num = len(engine.answer_list)
+    similar_num = min(similar_num, answers_num - 1)
+    if similar_num < 1:
+        return {answer: [] for answer in engine.answer_list}
+
+    ## weights of all (category, value) pairs for each answer (without padding row)
+    features = engine.weights_matrix[:-1].T
+    cache_path = None
+    if use_cache:
+        cache_path = get_cache_path(features, engine.answer_list, similar_num)
+    similar_indexes, similar_values = load_cache(cache_path)
+    if similar_indexes is None:
+        similar_indexes, similar_values = calculate_similar(features, similar_num)
+        save_cache(cache_path, similar_indexes, similar_values)
+
+    ret_dict = {}
+    for answer_index, answer in enumerate(engine.answer_list):
+        similar_list = []
+        for index, value in zip(similar_indexes[answer_index].tolist(), similar_values[answer_index].tolist()):
+            similar_list.append([engine.answer_list[index], value])
+        ret_dict[answer] = similar_list
+    return ret_dict
+
+
+## returns pair: matrix of indexes of most similar rows, matrix of similarity values
+## rows are compared in blocks, so whole (rows x rows) matrix is never stored
+def calculate_similar(features, similar_num, block_size=None):
+    rows_num = features.shape[0]
+    ## single precision is enough for ordering and halves memory traffic
+    features = numpy.asarray(features, dtype=numpy.float32)
+    norms = numpy.linalg.norm(features, axis=1, keepdims=True)
+    normalized = numpy.divide(features, norms, out=numpy.zeros_like(features), where=norms > 0)
+    if block_size is None:
+        block_size = max(1, 2**22 // max(1, rows_num))
+
+    ret_indexes = numpy.zeros((rows_num, similar_num), dtype=numpy.int64)
+    ret_values = numpy.zeros((rows_num, similar_num), dtype=numpy.float64)
+    for block_start in range(0, rows_num, block_size):
+        block_end = min(rows_num, block_start + block_size)
+        block_similarity = normalized[block_start:block_end] @ normalized.T
+        ## rounding makes order of equal items independent of block size
+        numpy.round(block_similarity, 5, out=block_similarity)
+        block_rows = numpy.arange(block_end - block_start)
+        ## exclude self
+        block_similarity[block_rows, block_rows + block_start] = -numpy.inf
+        ## value of n-th best item, items with equal value are ordered by index
+        kth_values = numpy.partition(block_similarity, -similar_num, axis=1)[:, -similar_num]
+        for row_index in block_rows:
+            row_similarity = block_similarity[row_index]
+            candidates = numpy.flatnonzero(row_similarity >= kth_values[row_index])
+            order = numpy.lexsort((candidates, -row_similarity[candidates]))[:similar_num]
+            best = candidates[order]
+            ret_indexes[block_start + row_index] = best
+            ret_values[block_start + row_index] = row_similarity[best]
+    return ret_indexes, ret_values
+
+
+# =========================================
+
+
+def get_cache_path(features, answer_list, similar_num):
+    hash_alg = hashlib.md5()  # nosec
+    hash_alg.update(numpy.ascontiguousarray(features).tobytes())
+    hash_alg.update(repr(features.shape).encode("utf8"))
+    hash_alg.update(repr(answer_list).encode("utf8"))
+    hash_alg.update(str(similar_num).encode("utf8"))
+    cache_dir = os.path.join(get_app_datadir(), "similarity")
+    return os.path.join(cache_dir, hash_alg.hexdigest() + ".npz")
+
+
+def load_cache(cache_path):
+    if cache_path is None or not os.path.isfile(cache_path):
+        return None, None
+    try:
+        with numpy.load(cache_path) as data:
+            touch_cache_file(cache_path)
+            _LOGGER.info("loaded similar items from cache: %s", cache_path)
+            return data["indexes"], data["values"]
+    except (OSError, ValueError, KeyError):
+        _LOGGER.warning("unable to load similarity cache: %s", cache_path)
+        return None, None
+
+
+def save_cache(cache_path, indexes, values):
+    if cache_path is None:
+        return
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    ## cache can be saved concurrently by many builds
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+    numpy.savez(tmp_path, indexes=indexes, values=values)
+    os.replace(tmp_path, cache_path)
+    ## cache is keyed by content of model, so each change of model leaves file of previous content
+    prune_cache_dir(os.path.dirname(cache_path))
@@ -9,10 +9,10 @@
 import os
 import logging
 
-from rankpagegenerator.utils import write_data
 from rankpagegenerator.generator.dataframe import to_dict_col_vals
 from rankpagegenerator.generator.dataloader import DataLoader
 from rankpagegenerator.generator.utils import HTML_LICENSE
+from rankpagegenerator.generator.writer import OutputWriter
 
 
 SCRIPT_DIR = os.path.dirname(__file__)
@@ -44,6 +44,7 @@ class StaticGenerator:
         self.out_root_dir = None
         self.out_rank_dir = None
         self.out_index_path = None
+        self.writer: OutputWriter = None
 
         self.label_back_to_main = "powrót"
         self.label_characteristic = "cecha"
@@ -52,17 +53,19 @@ class StaticGenerator:
     def generate(self, data_loader: DataLoader, output_path):
         self.page_counter = 0
 
-        self.out_root_dir = output_path
-        os.makedirs(self.out_root_dir, exist_ok=True)
+        with OutputWriter(output_path) as writer:
+            self.writer = writer
+            self.out_root_dir = writer.output_path
 
-        self.out_index_path = os.path.join(self.out_root_dir, "index.html")
-        gen_index_page(self.out_index_path)
+            self.out_index_path = os.path.join(self.out_root_dir, "index.html")
+            gen_index_page(self.out_index_path, writer)
 
-        self.out_rank_dir = os.path.join(self.out_root_dir, "rank")
-        os.makedirs(self.out_rank_dir, exist_ok=True)
+            self.out_rank_dir = os.path.join(self.out_root_dir, "rank")
+            writer.makedirs(self.out_rank_dir)
 
-        self.total_count = data_loader.get_total_count()
-        self._generate_submodel(data_loader, [])
+            self.total_count = data_loader.get_total_count()
+            self._generate_submodel(data_loader, [])
+        self.writer = None
 
     def _generate_submodel(self, data_loader: DataLoader, curr_state):
         model = data_loader.model_data
@@ -131,11 +134,11 @@ class StaticGenerator:
         progress = self.page_counter / self.total_count * 100
         # progress = int(self.page_counter / self.total_count * 10000) / 100
         _LOGGER.debug("%f%% %s writing page: %s", progress, curr_state, page_path)
-        write_data(page_path, content)
+        self.writer.write_data(page_path, content)
         return page_path
 
 
-def gen_index_page(output_path):
+def gen_index_page(output_path, writer: OutputWriter):
     content = """ \
 <html>
 <head></hrad>
@@ -146,4 +149,4 @@ def gen_index_page(output_path):
 </body>
 </html>
 """
-    write_data(output_path, content)
+    writer.write_data(output_path, content)
@@ -0,0 +1,149 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import re
+from functools import cached_property
+from typing import Dict, List
+
+from rankpagegenerator.utils import read_data
+from rankpagegenerator.generator.utils import HTML_LICENSE
+from rankpagegenerator.generator.dataloader import DataLoader
+from rankpagegenerator.data import DATA_DIR
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+TEMPLATES_DIR = os.path.join(DATA_DIR, "templates")
+
+## template field, e.g. "{{ back_label }}"
+FIELD_REGEX = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+## dict: [field name, label to translate]
+LABELS_DICT = {
+    "back_label": "Back to Filters",
+    "reset_label": "Reset filters",
+    "prev_label": "Prev",
+    "next_label": "Next",
+    "photos_label": "Photos",
+    "license_label": "License",
+    "similar_label": "Similar items",
+    "parameter_label": "Parameter",
+    "value_label": "Value",
+    "empty_label": "empty",
+}
+
+
+##
+## Template parsed once into list of static fragments and fields.
+##
+class Template:
+    def __init__(self, content: str, name=None):
+        self.name = name
+        parts = FIELD_REGEX.split(content)
+        ## fields are placed between fragments
+        self.fragments: List[str] = parts[0::2]
+        self.fields: List[str] = parts[1::2]
+
+    def render(self, values: Dict[str, str], defaults: Dict[str, str] = None) -> str:
+        return "".join(self.render_parts(values, defaults))
+
+    def render_parts(self, values: Dict[str, str], defaults: Dict[str, str] = None) -> List[str]:
+        ## value of field is taken from 'values' or from 'defaults'
+        if defaults is None:
+            defaults = {}
+        parts_list = [self.fragments[0]]
+        for field, fragment in zip(self.fields, self.fragments[1:]):
+            value = values.get(field)
+            if value is None:
+                value = defaults.get(field)
+                if value is None:
+                    raise KeyError(f"missing value of field '{field}' in template '{self.name}'")
+            parts_list.append(value)
+            parts_list.append(fragment)
+        return parts_list
+
+
+##
+## Labels of templates translated on first use, so labels not used
+## by build are not translated nor reported as missing translations.
+##
+class TranslatedLabels(dict):
+    def __init__(self, data_loader: DataLoader):
+        super().__init__()
+        self.data_loader = data_loader
+
+    def __missing__(self, field):
+        label = LABELS_DICT.get(field)
+        if label is None:
+            raise KeyError(field)
+        value = self.data_loader.get_translation(label)
+        self[field] = value
+        return value
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+
+##
+## Page templates of single build.
+##
+## Templates are loaded from 'templates_dir' (if given) and from package data
+## for files not found there. Each template is parsed once. Translated labels
+## and other constant fragments are prepared once (on first use) and used as
+## default values of templates fields.
+##
+class PageTemplates:
+    def __init__(self, data_loader: DataLoader, templates_dir=None):
+        self.templates_dir = templates_dir
+        self._templates_dict: Dict[str, Template] = {}
+
+        self.labels: Dict[str, str] = TranslatedLabels(data_loader)
+        self.labels["license"] = HTML_LICENSE
+        self.page_title = data_loader.get_page_title()
+
+    @cached_property
+    def table_header(self):
+        return f"""<tr> <th>{self.labels["parameter_label"]}:</th> <th>{self.labels["value_label"]}:</th> </tr>\n"""
+
+    @cached_property
+    def empty_value(self):
+        return f"""<span class="empty">[{self.labels["empty_label"]}]</span>"""
+
+    def get_title(self, prefix=None):
+        ## returns 'title' element or empty string if page title is not set
+        if not self.page_title:
+            return self.page_title
+        if prefix is None:
+            return f"""<title>{self.page_title}</title>"""
+        return f"""<title>{prefix} - {self.page_title}</title>"""
+
+    def get_template(self, template_name) -> Template:
+        template = self._templates_dict.get(template_name)
+        if template is None:
+            template_path = self.find_template(template_name)
+            template = Template(read_data(template_path), template_name)
+            self._templates_dict[template_name] = template
+        return template
+
+    def find_template(self, template_name):
+        if self.templates_dir:
+            template_path = os.path.join(self.templates_dir, template_name)
+            if os.path.isfile(template_path):
+                _LOGGER.info("using user template: %s", template_path)
+                return template_path
+        return os.path.join(TEMPLATES_DIR, template_name)
+
+    def render(self, template_name, **values) -> str:
+        template = self.get_template(template_name)
+        return template.render(values, self.labels)
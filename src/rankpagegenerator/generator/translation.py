@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import json
+import threading
+from typing import Dict
+
+import validators
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+##
+## Translation lookups of single build.
+##
+## Works the same way as 'dataloader.get_translation()', but groups of translation
+## file are resolved once into flat dicts, URL detection is cached for each distinct
+## string and missing translations are collected instead of being logged on every lookup.
+##
+class TranslationResolver:
+    def __init__(self, translation_dict: Dict[str, str] = None):
+        self.translation_dict = translation_dict
+        ## dict: [group, flat dict of translations], None group contains global labels
+        self._groups_dict: Dict[str, Dict[str, str]] = {}
+        if translation_dict is not None:
+            self._groups_dict[None] = translation_dict
+            for group, group_dict in translation_dict.items():
+                if isinstance(group_dict, dict):
+                    self._groups_dict[group] = group_dict
+        ## dict: [string, is URL]
+        self._url_cache: Dict[str, bool] = {}
+        ## dict: [group, dict: [key, number of lookups]]
+        self.missing_dict: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def translate(self, key: str, group: str = None) -> str:
+        if self.translation_dict is None or not key:
+            return key
+        if self.is_url(key):
+            return key
+        group_dict = self._groups_dict.get(group)
+        if group_dict is None:
+            return key
+        value = group_dict.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            group_missing = self.missing_dict.setdefault(group, {})
+            group_missing[key] = group_missing.get(key, 0) + 1
+        return key
+
+    def is_url(self, value) -> bool:
+        found = self._url_cache.get(value)
+        if found is None:
+            found = is_url(value)
+            self._url_cache[value] = found
+        return found
+
+    def get_missing_count(self):
+        return sum(len(group_missing) for group_missing in self.missing_dict.values())
+
+    def report_missing(self):
+        ## log single summary of missing translations
+        missing_count = self.get_missing_count()
+        if missing_count < 1:
+            return
+        keys_list = []
+        for group, group_missing in self.missing_dict.items():
+            for key in group_missing:
+                keys_list.append(key if group is None else f"{group}/{key}")
+        _LOGGER.warning(
+            "translation not found for %s keys: %s%s",
+            missing_count,
+            ", ".join(f"'{key}'" for key in keys_list[:10]),
+            ", ..." if missing_count > 10 else "",
+        )
+        _LOGGER.debug("all missing translations: %s", keys_list)
+
+    def get_missing_stub(self):
+        ## returns dict in format of translation file with missing keys (translated to itself)
+        ret_dict = {}
+        for group, group_missing in self.missing_dict.items():
+            target_dict = ret_dict
+            if group is not None:
+                target_dict = ret_dict.setdefault(group, {})
+            for key in group_missing:
+                target_dict[key] = key
+        return ret_dict
+
+    def write_missing_stub(self, output_path):
+        stub_dict = self.get_missing_stub()
+        out_dir = os.path.dirname(output_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(output_path, "w", encoding="utf8") as fp:
+            json.dump(stub_dict, fp, indent=4, ensure_ascii=False)
+        _LOGGER.info("missing translations written to %s", output_path)
+
+
+def is_url(value) -> bool:
+    ## every URL accepted by validator contains scheme separator,
+    ## so most of values are rejected without running validator
+    if not isinstance(value, str) or "://" not in value:
+        return False
+    return bool(validators.url(value))
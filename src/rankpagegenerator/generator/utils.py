@@ -24,32 +24,57 @@ Project is distributed under the BSD 3-Clause license.
 -->"""
 
 
-def dict_to_html_table(data_dict, translation_dict=None, header=True, table_class=None):
+## 'header_content' and 'empty_content' are prepared fragments replacing translated labels
+## if 'convert_links' is not set then values are expected to be already converted to HTML
+def dict_to_html_table(
+    data_dict,
+    translation_dict=None,
+    header=True,
+    table_class=None,
+    header_content=None,
+    empty_content=None,
+    convert_links=True,
+):
     if data_dict is None:
         return None
     table_css = ""
     if table_class:
         table_css = """ class='detailstable'"""
-    content = ""
-    content += f"""<table cellspacing="0"{table_css}>\n"""
-    if header:
-        content += f"""<tr> <th>{get_translation(translation_dict, "Parameter")}:</th>\
+    if header and header_content is None:
+        header_content = f"""<tr> <th>{get_translation(translation_dict, "Parameter")}:</th>\
  <th>{get_translation(translation_dict, "Value")}:</th> </tr>\n"""
+    content_list = [f"""<table cellspacing="0"{table_css}>\n"""]
+    if header:
+        content_list.append(header_content)
     for key, val in data_dict.items():
         val_str = ""
         if isinstance(val, list):
-            val_str = [convert_href_value(item) for item in val]
+            val_str = [convert_href_value(item) if convert_links else str(item) for item in val]
             val_str = ", ".join(val_str)
         else:
-            val_str = convert_href_value(val)
+            val_str = convert_href_value(val) if convert_links else str(val)
         if not val_str:
-            val_str = f"""<span class="empty">[{get_translation(translation_dict, "empty")}]</span>"""
-        content += f"""<tr> <td>{key}</td> <td>{val_str}</td> </tr>\n"""
-    content += """</table>"""
-    return content
+            if empty_content is None:
+                empty_content = f"""<span class="empty">[{get_translation(translation_dict, "empty")}]</span>"""
+            val_str = empty_content
+        content_list.append(f"""<tr> <td>{key}</td> <td>{val_str}</td> </tr>\n""")
+    content_list.append("""</table>""")
+    return "".join(content_list)
 
 
-def convert_href_value(val):
-    if is_url(val):
+## 'link' - precomputed result of URL detection (detected if not given)
+def convert_href_value(val, link=None):
+    if link is None:
+        link = is_url(val)
+    if link:
         return f"""<a href="{val}">{val}</a>"""
     return str(val)
+
+
+def to_js_string(value) -> str:
+    ## convert value to string in the same way as JavaScript does
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,433 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+
+import io
+import gzip
+import shutil
+import time
+import threading
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from rankpagegenerator import progress
+
+try:
+    import brotli
+except ImportError:
+    ## brotli compression is optional
+    brotli = None
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## files that are precompressed
+TEXT_EXTENSIONS = {".html", ".js", ".css", ".json", ".svg", ".txt"}
+
+## file marking directory created by atomic commit (directory can be replaced by next build)
+BUILD_MARKER = ".rankpagegenerator"
+
+
+##
+## Writes output files in background threads.
+##
+## In atomic mode files are written to staging directory placed next to
+## output directory. Staging directory replaces output directory on 'commit()',
+## so interrupted build never leaves half-written output. Whole output directory
+## is replaced, so atomic mode is used only if output directory does not exist,
+## is empty or was created by previous build (contains 'BUILD_MARKER' file).
+## Otherwise files are written in place and other files of directory are kept.
+##
+## If 'precompress' is set, then for each text file compressed siblings
+## (.gz and .br if brotli is available) are written. Compression is done
+## in worker processes. Siblings of files unchanged since previous build
+## are reused.
+##
+class OutputWriter:
+    def __init__(self, output_path, atomic=True, workers_num=4, max_pending=256, precompress=False):
+        self.output_path = os.path.abspath(output_path)
+        self.atomic = atomic and self._can_replace_output()
+        self.precompress = precompress
+        self.target_path = self._get_target_path()
+
+        self.files_num = 0
+        self.bytes_num = 0
+        self.compressed_num = 0
+        self.reused_num = 0
+
+        self._dirs_set = set()
+        self._lock = threading.Lock()
+        self._pending_sem = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=workers_num, thread_name_prefix="writer")
+        self._compress_executor = None
+        self._compress_futures = []
+        self._compress_lock = threading.Lock()
+        if precompress:
+            self._compress_executor = ProcessPoolExecutor()
+        self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def get_rel_path(self, file_path):
+        ## convert path inside output directory to path relative to output directory
+        file_path = os.path.abspath(os.path.join(self.output_path, file_path))
+        rel_path = os.path.relpath(file_path, self.output_path)
+        if rel_path.startswith(os.pardir):
+            raise ValueError(f"path '{file_path}' outside of output directory '{self.output_path}'")
+        return rel_path
+
+    def get_path(self, file_path):
+        ## convert path inside output directory to path of written file
+        rel_path = self.get_rel_path(file_path)
+        return os.path.normpath(os.path.join(self.target_path, rel_path))
+
+    def makedirs(self, dir_path):
+        target_dir = self.get_path(dir_path)
+        with self._lock:
+            if target_dir in self._dirs_set:
+                return
+            os.makedirs(target_dir, exist_ok=True)
+            self._dirs_set.add(target_dir)
+
+    def write_data(self, file_path, content: str):
+        self.write_bytes(file_path, content.encode("utf8"))
+
+    def write_bytes(self, file_path, data: bytes):
+        self._submit(self._write_file, file_path, data)
+        if self._is_compressible(file_path):
+            self._compress(file_path, data)
+
+    def copy_file(self, source_path, file_path):
+        if self._is_compressible(file_path):
+            with open(source_path, "rb") as fp:
+                self.write_bytes(file_path, fp.read())
+            return
+        self._submit(self._copy_file, file_path, source_path)
+
+    def flush(self):
+        ## wait for all pending writes, propagate errors
+        with self._compress_lock:
+            if self._compress_futures:
+                with progress.stage("compression", total=len(self._compress_futures)) as stage:
+                    self._write_compressed(wait=True, stage=stage)
+        with self._lock:
+            futures = self._futures
+            self._futures = []
+        if not futures:
+            return
+        with progress.stage("writing", total=len(futures)) as stage:
+            for item in futures:
+                item.result()
+                stage.add()
+
+    def commit(self):
+        self.flush()
+        self._shutdown()
+        self._close()
+        _LOGGER.info("written %s files, %s bytes to %s", self.files_num, self.bytes_num, self.get_output_name())
+        if self.precompress:
+            _LOGGER.info("compressed %s files, reused %s compressed files", self.compressed_num, self.reused_num)
+
+    def abort(self):
+        self._shutdown(cancel=True)
+        self._discard()
+        _LOGGER.warning("output aborted, %s unchanged", self.get_output_name())
+
+    def get_output_name(self):
+        return self.output_path
+
+    def _can_replace_output(self):
+        if is_build_output(self.output_path):
+            return True
+        _LOGGER.warning(
+            "output directory %s contains files not created by generator, writing in place (not atomic)",
+            self.output_path,
+        )
+        return False
+
+    def _get_target_path(self):
+        if self.atomic:
+            return self.output_path + ".staging"
+        return self.output_path
+
+    def _open(self):
+        if self.atomic and os.path.exists(self.target_path):
+            ## leftover of interrupted build
+            shutil.rmtree(self.target_path)
+        self.makedirs(self.output_path)
+
+    def _close(self):
+        if self.atomic:
+            with open(os.path.join(self.target_path, BUILD_MARKER), "w", encoding="utf8") as fp:
+                fp.write("output of rank-page-generator, directory is replaced on each build\n")
+            swap_directory(self.target_path, self.output_path)
+
+    def _discard(self):
+        if self.atomic and os.path.exists(self.target_path):
+            shutil.rmtree(self.target_path)
+
+    def _write_file(self, target_path, data: bytes):
+        with open(target_path, "wb") as fp:
+            fp.write(data)
+        return len(data)
+
+    def _copy_file(self, target_path, source_path):
+        shutil.copyfile(source_path, target_path, follow_symlinks=True)
+        return os.path.getsize(target_path)
+
+    def _shutdown(self, cancel=False):
+        self._executor.shutdown(wait=True, cancel_futures=cancel)
+        if self._compress_executor is not None:
+            self._compress_executor.shutdown(wait=True, cancel_futures=cancel)
+
+    def _is_compressible(self, file_path):
+        if not self.precompress:
+            return False
+        extension = os.path.splitext(file_path)[1].lower()
+        return extension in TEXT_EXTENSIONS
+
+    def _compress(self, file_path, data: bytes):
+        ## files can be written from many threads (e.g. pages of many languages)
+        with self._compress_lock:
+            if self._reuse_compressed(file_path, data):
+                return
+            future = self._compress_executor.submit(compress_data, data)
+            self._compress_futures.append((file_path, future))
+            ## write already compressed data
+            self._write_compressed(wait=False)
+
+    def _write_compressed(self, wait, stage=None):
+        pending_list = []
+        for file_path, future in self._compress_futures:
+            if not wait and not future.done():
+                pending_list.append((file_path, future))
+                continue
+            for extension, compressed_data in future.result():
+                self._submit(self._write_file, file_path + extension, compressed_data)
+                self.compressed_num += 1
+            if stage is not None:
+                stage.add()
+        self._compress_futures = pending_list
+
+    def _reuse_compressed(self, file_path, data: bytes):
+        ## copy compressed siblings from previous output if file did not change
+        if not self.atomic:
+            return False
+        prev_path = os.path.join(self.output_path, self.get_rel_path(file_path))
+        extensions = get_compressed_extensions()
+        prev_siblings = [prev_path + ext for ext in extensions]
+        for sibling in prev_siblings:
+            if not os.path.isfile(sibling):
+                return False
+        if not os.path.isfile(prev_path) or os.path.getsize(prev_path) != len(data):
+            return False
+        with open(prev_path, "rb") as fp:
+            if fp.read() != data:
+                return False
+        for ext, sibling in zip(extensions, prev_siblings):
+            self._submit(self._copy_file, file_path + ext, sibling)
+            self.reused_num += 1
+        return True
+
+    def _submit(self, write_func, file_path, data):
+        target_path = self.get_path(file_path)
+        self.makedirs(os.path.dirname(file_path))
+        self._pending_sem.acquire()  # pylint: disable=consider-using-with
+        try:
+            future = self._executor.submit(self._write, write_func, target_path, data)
+        except BaseException:
+            self._pending_sem.release()
+            raise
+        with self._lock:
+            self._futures.append(future)
+
+    def _write(self, write_func, target_path, data):
+        try:
+            size = write_func(target_path, data)
+            with self._lock:
+                self.files_num += 1
+                self.bytes_num += size
+        finally:
+            self._pending_sem.release()
+
+
+##
+## Writes output files directly into ZIP or TAR.GZ archive.
+##
+## Archive is written to temporary file and renamed on 'commit()'.
+## Images are stored in ZIP without recompression, other files are deflated.
+##
+class ArchiveWriter(OutputWriter):
+    STORED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".img", ".gz", ".br", ".zip"}
+
+    def __init__(self, archive_path, output_path=None, precompress=False):
+        self.archive_path = os.path.abspath(archive_path)
+        self.archive_type = get_archive_type(archive_path)
+        if self.archive_type is None:
+            raise ValueError(f"unsupported archive type: {archive_path}")
+        self._archive = None
+        if output_path is None:
+            ## virtual output directory used to calculate paths inside archive
+            output_path = os.path.splitext(self.archive_path)[0]
+        ## archive libraries are not thread-safe - write in single background thread
+        super().__init__(output_path, atomic=True, workers_num=1, precompress=precompress)
+
+    def get_path(self, file_path):
+        ## path inside archive
+        rel_path = self.get_rel_path(file_path)
+        return rel_path.replace(os.sep, "/")
+
+    def makedirs(self, dir_path):
+        # directories are not stored in archive
+        self.get_rel_path(dir_path)
+
+    def get_output_name(self):
+        return self.archive_path
+
+    def _can_replace_output(self):
+        ## output directory is not used
+        return True
+
+    def _get_target_path(self):
+        return self.archive_path + ".staging"
+
+    def _open(self):
+        if self.archive_type == "zip":
+            self._archive = zipfile.ZipFile(self.target_path, "w")  # pylint: disable=consider-using-with
+        else:
+            self._archive = tarfile.open(self.target_path, "w:gz")  # pylint: disable=consider-using-with
+
+    def _close(self):
+        self._archive.close()
+        os.replace(self.target_path, self.archive_path)
+
+    def _discard(self):
+        self._archive.close()
+        if os.path.exists(self.target_path):
+            os.remove(self.target_path)
+
+    def _reuse_compressed(self, file_path, data: bytes):
+        # no previous content
+        return False
+
+    def _write_file(self, target_path, data: bytes):
+        if self.archive_type == "zip":
+            compress_type = self._get_compression(target_path)
+            self._archive.writestr(target_path, data, compress_type=compress_type)
+        else:
+            tar_info = tarfile.TarInfo(name=target_path)
+            tar_info.size = len(data)
+            tar_info.mtime = int(time.time())
+            self._archive.addfile(tar_info, io.BytesIO(data))
+        return len(data)
+
+    def _copy_file(self, target_path, source_path):
+        if self.archive_type == "zip":
+            compress_type = self._get_compression(target_path)
+            self._archive.write(source_path, arcname=target_path, compress_type=compress_type)
+        else:
+            self._archive.add(source_path, arcname=target_path)
+        return os.path.getsize(source_path)
+
+    def _get_compression(self, target_path):
+        extension = os.path.splitext(target_path)[1].lower()
+        if extension in self.STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+
+def get_archive_type(archive_path):
+    archive_path = archive_path.lower()
+    if archive_path.endswith(".zip"):
+        return "zip"
+    if archive_path.endswith(".tar.gz") or archive_path.endswith(".tgz"):
+        return "tar.gz"
+    return None
+
+
+##
+## Writes files into subdirectory of output of other writer (e.g. pages of single language).
+## Paths relative to subdirectory are converted and passed to parent writer.
+##
+class SubdirWriter:
+    def __init__(self, parent: OutputWriter, subdir):
+        self.parent = parent
+        self.output_path = os.path.join(parent.output_path, subdir)
+
+    def get_rel_path(self, file_path):
+        return self.parent.get_rel_path(self._get_parent_path(file_path))
+
+    def makedirs(self, dir_path):
+        self.parent.makedirs(self._get_parent_path(dir_path))
+
+    def write_data(self, file_path, content: str):
+        self.parent.write_data(self._get_parent_path(file_path), content)
+
+    def write_bytes(self, file_path, data: bytes):
+        self.parent.write_bytes(self._get_parent_path(file_path), data)
+
+    def copy_file(self, source_path, file_path):
+        self.parent.copy_file(source_path, self._get_parent_path(file_path))
+
+    def _get_parent_path(self, file_path):
+        return os.path.join(self.output_path, file_path)
+
+
+def create_writer(output_path, archive_path=None, precompress=False) -> OutputWriter:
+    if archive_path:
+        return ArchiveWriter(archive_path, output_path, precompress=precompress)
+    return OutputWriter(output_path, precompress=precompress)
+
+
+def get_compressed_extensions():
+    if brotli is None:
+        return [".gz"]
+    return [".gz", ".br"]
+
+
+def compress_data(data: bytes):
+    ## returns list of pairs: (file extension, compressed data)
+    ## executed in worker process
+    ret_list = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        ret_list.append((".br", brotli.compress(data, quality=11)))
+    return ret_list
+
+
+## returns True if directory can be replaced by output of build
+def is_build_output(dir_path):
+    if not os.path.isdir(dir_path):
+        return not os.path.exists(dir_path)
+    if os.path.isfile(os.path.join(dir_path, BUILD_MARKER)):
+        return True
+    return not os.listdir(dir_path)
+
+
+def swap_directory(source_dir, dest_dir):
+    ## replace 'dest_dir' with 'source_dir'
+    if not os.path.exists(dest_dir):
+        os.rename(source_dir, dest_dir)
+        return
+    backup_dir = dest_dir + ".old"
+    if os.path.exists(backup_dir):
+        shutil.rmtree(backup_dir)
+    os.rename(dest_dir, backup_dir)
+    os.rename(source_dir, dest_dir)
+    shutil.rmtree(backup_dir)
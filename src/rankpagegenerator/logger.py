@@ -8,12 +8,18 @@
 
 import os
 import sys
+import time
+import atexit
+import queue
+import multiprocessing
 import logging
 from logging import handlers
 
 
 script_dir = os.path.dirname(__file__)
 log_file = None
+## background thread writing records to handlers
+log_listener: handlers.QueueListener = None
 
 
 def get_logging_output_file(log_dir=None):
@@ -30,28 +36,45 @@ def get_logging_output_file(log_dir=None):
     return logFile
 
 
-def configure(logFile=None, logDir=None, logLevel=None):
+## records are formatted and written by background thread, so logging does not block caller
+## if 'quiet' is set then only warnings and errors are printed to console (log file is not affected)
+def configure(logFile=None, logDir=None, logLevel=None, logStream=None, quiet=False):
     # pylint: disable=W0603
-    global log_file
+    global log_file, log_listener
     log_file = logFile
     if log_file is None:
         log_file = get_logging_output_file(logDir)
 
     if logLevel is None:
         logLevel = logging.DEBUG
+    if logStream is None:
+        logStream = sys.stdout
 
     ## rotation of log files, 1048576 equals to 1MB
     fileHandler = handlers.RotatingFileHandler(filename=log_file, mode="a+", maxBytes=1048576, backupCount=999)
     ## fileHandler    = logging.FileHandler( filename=log_file, mode="a+" )
-    consoleHandler = logging.StreamHandler(stream=sys.stdout)
+    consoleHandler = logging.StreamHandler(stream=logStream)
 
     formatter = create_formatter()
 
     fileHandler.setFormatter(formatter)
     consoleHandler.setFormatter(formatter)
-
-    logging.root.addHandler(consoleHandler)
-    logging.root.addHandler(fileHandler)
+    if quiet:
+        consoleHandler.setLevel(logging.WARNING)
+
+    ## handler of previous call would feed stopped listener
+    stop()
+    for handler in list(logging.root.handlers):
+        if isinstance(handler, handlers.QueueHandler):
+            logging.root.removeHandler(handler)
+    records_queue: queue.SimpleQueue = queue.SimpleQueue()
+    log_listener = handlers.QueueListener(records_queue, consoleHandler, fileHandler, respect_handler_level=True)
+    log_listener.start()
+    ## registered once regardless of number of calls
+    atexit.unregister(stop)
+    atexit.register(stop)
+
+    logging.root.addHandler(handlers.QueueHandler(records_queue))
     logging.root.setLevel(logLevel)
 
     logging.getLogger("matplotlib").setLevel(logging.WARNING)
@@ -68,6 +91,41 @@ def configure(logFile=None, logDir=None, logLevel=None):
 ##                        )
 
 
+def stop():
+    ## flush pending records and stop background writer
+    # pylint: disable=W0603
+    global log_listener
+    if log_listener is None:
+        return
+    log_listener.stop()
+    for handler in log_listener.handlers:
+        handler.close()
+    log_listener = None
+
+
+## records of worker processes are passed to handlers of main process through returned queue
+## returns pair: queue and listener (None if logging is not configured)
+def start_workers_listener():
+    if log_listener is None:
+        return None, None
+    records_queue = multiprocessing.Queue()
+    listener = handlers.QueueListener(records_queue, *log_listener.handlers, respect_handler_level=True)
+    listener.start()
+    return records_queue, listener
+
+
+## executed in worker process
+def configure_worker(records_queue, logLevel=None):
+    if logLevel is None:
+        logLevel = logging.DEBUG
+    ## handlers inherited from main process (if forked) are not served in worker
+    for handler in list(logging.root.handlers):
+        logging.root.removeHandler(handler)
+    if records_queue is not None:
+        logging.root.addHandler(handlers.QueueHandler(records_queue))
+    logging.root.setLevel(logLevel)
+
+
 def configure_console(logLevel=None):
     if logLevel is None:
         logLevel = logging.DEBUG
@@ -101,6 +159,53 @@ def create_formatter(loggerFormat=None):
     ## return logging.Formatter( loggerFormat, dateFormat )
 
 
+##
+## Summary of repeated operations (e.g. written pages).
+## Instead of message per item, number of items and throughput is logged
+## not more often than every 'interval' seconds.
+##
+class ThroughputLogger:
+    def __init__(self, logger: logging.Logger, items_name, interval=5.0):
+        self.logger = logger
+        self.items_name = items_name
+        self.interval = interval
+        self.count = 0
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self._next_time = self.start_time + interval
+
+    def add(self, items_num=1):
+        self.count += items_num
+        curr_time = time.perf_counter()
+        if curr_time < self._next_time:
+            return
+        self._next_time = curr_time + self.interval
+        self.report(curr_time)
+
+    def finish(self):
+        self.end_time = time.perf_counter()
+        self.report(self.end_time, final=True)
+
+    def get_duration(self, curr_time=None):
+        if curr_time is None:
+            curr_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return curr_time - self.start_time
+
+    def get_throughput(self, curr_time=None):
+        duration = self.get_duration(curr_time)
+        return self.count / duration if duration > 0 else 0.0
+
+    def report(self, curr_time, final=False):
+        ## record points to caller of 'add()' or 'finish()'
+        self.logger.info("%s", self.get_message(curr_time, final), stacklevel=3)
+
+    def get_message(self, curr_time, final=False):
+        throughput = self.get_throughput(curr_time)
+        if final:
+            return f"{self.count} {self.items_name} written in total ({throughput:.1f}/s)"
+        return f"{self.count} {self.items_name} written ({throughput:.1f}/s)"
+
+
 class EmptyLineFormatter(logging.Formatter):
     """Special formatter storing empty lines without formatting."""
 
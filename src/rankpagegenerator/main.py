@@ -20,11 +20,16 @@ except ImportError:
 import sys
 import argparse
 import logging
+import json
 
 from rankpagegenerator import logger
+from rankpagegenerator import progress
 from rankpagegenerator.generator.dataloader import DataLoader
-from rankpagegenerator.generator.jsgen import generate_pages
+from rankpagegenerator.generator.jsgen import generate_pages, BuildOptions
+from rankpagegenerator.generator.batchgen import load_manifest, generate_batch, format_results_table
 from rankpagegenerator.generator.photogen import parse_license_file
+from rankpagegenerator.generator.ranking import rank_queries, parse_query, read_queries
+from rankpagegenerator.apiserver import RankServer
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -38,11 +43,46 @@ def process_generate(args):
     _LOGGER.debug("logging to file: %s", logger.log_file)
     model_path = args.data
     translation_path = args.translation
-    embed = str(args.embedscripts).lower() != "false"
-    nophotos = str(args.nophotos).lower() != "false"
+    summary_path = args.summaryfile
     output_path = args.outdir
+    options = BuildOptions(
+        embed=str(args.embedscripts).lower() != "false",
+        nophotos=str(args.nophotos).lower() != "false",
+        archive_path=args.archive,
+        precompress=str(args.precompress).lower() != "false",
+        hashassets=str(args.hashassets).lower() != "false",
+        shards_limit=args.resultshards,
+        similar_num=args.similaritems,
+        details_shard_size=args.detailsshardsize,
+        data_chunk_size=args.datachunksize,
+        templates_dir=args.templatesdir,
+        missing_translations_path=args.missingtranslations,
+    )
+    if not output_path and not options.archive_path:
+        _LOGGER.error("one of --outdir or --archive is required")
+        return 1
+
+    generate_pages(model_path, translation_path, output_path, options)
+    if summary_path:
+        progress.get_reporter().write_summary(summary_path)
+    return 0
 
-    generate_pages(model_path, translation_path, embed, nophotos, output_path)
+
+def process_generate_batch(args):
+    _LOGGER.info("starting batch generator")
+    _LOGGER.debug("logging to file: %s", logger.log_file)
+    entries_list = load_manifest(args.manifest)
+    _LOGGER.info("building %s models", len(entries_list))
+    results_list = generate_batch(entries_list, args.workers)
+    print(format_results_table(results_list))
+    if args.summaryfile:
+        with open(args.summaryfile, "w", encoding="utf8") as out_file:
+            json.dump(results_list, out_file, indent=4)
+        _LOGGER.info("summary written to %s", args.summaryfile)
+    failed_num = sum(1 for result in results_list if result["status"] != "ok")
+    if failed_num > 0:
+        _LOGGER.error("%s of %s builds failed", failed_num, len(results_list))
+        return 1
     return 0
 
 
@@ -55,6 +95,54 @@ def process_info(args):
     return 0
 
 
+def process_rank(args):
+    _LOGGER.debug("logging to file: %s", logger.log_file)
+    model_path = args.data
+    limit = args.limit
+    if limit is not None and limit < 1:
+        limit = None
+
+    queries_list = []
+    for query_text in args.query or []:
+        queries_list.append(parse_query(query_text))
+    if args.queriesfile:
+        queries_list.extend(read_queries(args.queriesfile))
+    if not queries_list:
+        _LOGGER.error("one of --query or --queriesfile is required")
+        return 1
+
+    data_loader = DataLoader(model_path)
+    _LOGGER.info("ranking %s queries", len(queries_list))
+    results_list = rank_queries(data_loader, queries_list, limit)
+
+    if args.outfile:
+        with open(args.outfile, "w", encoding="utf8") as out_file:
+            for item in results_list:
+                out_file.write(json.dumps(item) + "\n")
+        _LOGGER.info("results written to %s", args.outfile)
+    else:
+        for item in results_list:
+            print(json.dumps(item))
+    return 0
+
+
+def process_serve_api(args):
+    _LOGGER.debug("logging to file: %s", logger.log_file)
+    server = RankServer(
+        args.data,
+        host=args.host,
+        port=args.port,
+        workers_num=args.workers,
+        cache_size=args.cachesize,
+        reload_interval=args.reloadinterval,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        _LOGGER.info("server stopped")
+    return 0
+
+
 def process_photos(args):
     _LOGGER.debug("logging to file: %s", logger.log_file)
     license_path = args.licensefile
@@ -74,6 +162,7 @@ def main():
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
+    parser.add_argument("--quiet", action="store_true", help="Print only warnings and errors to console")
     # have to be implemented as parameter instead of command (because access to 'subparsers' object)
     parser.add_argument("--listtools", action="store_true", help="List tools")
     parser.set_defaults(func=None)
@@ -88,11 +177,117 @@ def main():
     )
     subparser.description = description
     subparser.set_defaults(func=process_generate)
-    subparser.add_argument("-d", "--data", action="store", required=False, help="Path to data file with model")
-    subparser.add_argument("-t", "--translation", action="store", required=False, help="Path to translation file")
+    subparser.add_argument(
+        "-d",
+        "--data",
+        action="store",
+        required=False,
+        help="Path to model (Excel or ODS file, CSV or Parquet file, directory of section files)",
+    )
+    subparser.add_argument(
+        "-t",
+        "--translation",
+        action="store",
+        nargs="+",
+        required=False,
+        help="Path to translation file. In case of many files pages of each language are generated"
+        " into output subdirectory named after translation file (e.g. 'pl' for 'pl.json')",
+    )
     subparser.add_argument("--embedscripts", action="store", default=False, help="Embed scripts into one file")
     subparser.add_argument("--nophotos", action="store", default=False, help="Do not generate image galleries")
-    subparser.add_argument("--outdir", action="store", required=True, help="Path to output directory")
+    subparser.add_argument(
+        "--precompress",
+        action="store",
+        default=False,
+        help="Generate compressed .gz (and .br if 'brotli' is installed) files next to text files",
+    )
+    subparser.add_argument(
+        "--hashassets",
+        action="store",
+        default=False,
+        help="Add content hash to names of script, CSS and data files and generate cache headers manifest",
+    )
+    subparser.add_argument(
+        "--resultshards",
+        action="store",
+        type=int,
+        default=0,
+        help="Number of best results precomputed for each single filter value (0 disables precomputation)",
+    )
+    subparser.add_argument(
+        "--similaritems",
+        action="store",
+        type=int,
+        default=0,
+        help="Number of most similar answers presented on details page (0 disables the list)",
+    )
+    subparser.add_argument(
+        "--detailsshardsize",
+        action="store",
+        type=int,
+        default=0,
+        help="Store details of answers in shards of given size presented by single 'details.html' page"
+        " instead of separate page for each answer (0 generates separate pages)",
+    )
+    subparser.add_argument(
+        "--datachunksize",
+        action="store",
+        type=int,
+        default=0,
+        help="Read data table of CSV and Parquet models in chunks of given number of rows, chunks are not kept"
+        " in memory and rows keep order of data table (0 reads whole table and sorts rows by answer)",
+    )
+    subparser.add_argument(
+        "--templatesdir",
+        action="store",
+        required=False,
+        help="Path to directory with custom page templates (templates not found there are taken from defaults)",
+    )
+    subparser.add_argument(
+        "--missingtranslations",
+        action="store",
+        required=False,
+        help="Path to output JSON file with translations not found (in format of translation file),"
+        " in case of many translations language suffix is added to file name",
+    )
+    subparser.add_argument(
+        "--summaryfile",
+        action="store",
+        required=False,
+        help="Path to output JSON file with duration and throughput of each stage of generation",
+    )
+    subparser.add_argument("--outdir", action="store", required=False, help="Path to output directory")
+    subparser.add_argument(
+        "--archive",
+        action="store",
+        required=False,
+        help="Path to output archive (.zip or .tar.gz), content is written directly into archive",
+    )
+
+    ## =================================================
+
+    description = "generate rank static pages of many models listed in manifest file"
+    subparser = subparsers.add_parser(
+        "generate-batch", help=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    subparser.description = description
+    subparser.set_defaults(func=process_generate_batch)
+    subparser.add_argument(
+        "--manifest",
+        action="store",
+        required=True,
+        help="Path to JSON file with list of models to build, each entry contains 'model' and 'outdir' (or 'archive')"
+        " and optionally 'translation' and other options of 'generate' tool (paths relative to manifest file)",
+    )
+    subparser.add_argument(
+        "--workers", action="store", type=int, default=None, help="Number of worker processes (CPU count if not set)"
+    )
+    subparser.add_argument(
+        "--summaryfile",
+        action="store",
+        required=False,
+        help="Path to output JSON file with status, duration and stages of each build",
+    )
 
     ## =================================================
 
@@ -100,7 +295,72 @@ def main():
     subparser = subparsers.add_parser("info", help=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     subparser.description = description
     subparser.set_defaults(func=process_info)
-    subparser.add_argument("-d", "--data", action="store", required=False, help="Path to data file with model")
+    subparser.add_argument(
+        "-d",
+        "--data",
+        action="store",
+        required=False,
+        help="Path to model (Excel or ODS file, CSV or Parquet file, directory of section files)",
+    )
+
+    ## =================================================
+
+    description = "rank answers for given filters (the same way as on main page)"
+    subparser = subparsers.add_parser("rank", help=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    subparser.description = description
+    subparser.set_defaults(func=process_rank)
+    subparser.add_argument(
+        "-d",
+        "--data",
+        action="store",
+        required=False,
+        help="Path to model (Excel or ODS file, CSV or Parquet file, directory of section files)",
+    )
+    subparser.add_argument(
+        "-q",
+        "--query",
+        action="append",
+        required=False,
+        help="Filters as JSON object or URL query string (e.g. 'size=S&size=L&_mode=filter'), can be repeated",
+    )
+    subparser.add_argument(
+        "--queriesfile", action="store", required=False, help="Path to JSON Lines file with one query per line"
+    )
+    subparser.add_argument(
+        "--limit", action="store", type=int, default=0, help="Number of best results returned (0 returns all)"
+    )
+    subparser.add_argument(
+        "--outfile", action="store", required=False, help="Path to output JSON Lines file (standard output if not set)"
+    )
+
+    ## =================================================
+
+    description = "serve ranking of model as JSON API over HTTP"
+    subparser = subparsers.add_parser(
+        "serve-api", help=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    subparser.description = description
+    subparser.set_defaults(func=process_serve_api)
+    subparser.add_argument(
+        "-d",
+        "--data",
+        action="store",
+        required=True,
+        help="Path to model (Excel or ODS file, CSV or Parquet file, directory of section files)",
+    )
+    subparser.add_argument("--host", action="store", default="127.0.0.1", help="Address to listen on")
+    subparser.add_argument("--port", action="store", type=int, default=8080, help="Port to listen on")
+    subparser.add_argument("--workers", action="store", type=int, default=8, help="Number of request threads")
+    subparser.add_argument(
+        "--cachesize", action="store", type=int, default=1024, help="Number of cached ranking results"
+    )
+    subparser.add_argument(
+        "--reloadinterval",
+        action="store",
+        type=float,
+        default=2.0,
+        help="Interval in seconds of checking model file for changes (0 disables reloading)",
+    )
 
     ## =================================================
 
@@ -122,10 +382,14 @@ def main():
         print(", ".join(tools_list))
         return 0
 
+    ## results of 'rank' tool can be printed to standard output
+    log_stream = sys.stderr if args.tool == "rank" else sys.stdout
     if args.logall is True:
-        logger.configure(logLevel=logging.DEBUG)
+        logger.configure(logLevel=logging.DEBUG, logStream=log_stream, quiet=args.quiet)
     else:
-        logger.configure(logLevel=logging.INFO)
+        logger.configure(logLevel=logging.INFO, logStream=log_stream, quiet=args.quiet)
+    ## status line is presented only on terminal, otherwise progress is logged periodically
+    progress.configure(stream=sys.stderr, tty=False if args.quiet else None)
 
     if "func" not in args or args.func is None:
         ## no command given -- print help message
@@ -0,0 +1,170 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import sys
+import logging
+import json
+import time
+import threading
+from typing import List
+
+from rankpagegenerator.logger import ThroughputLogger
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## minimal interval in seconds between refreshes of status line
+DISPLAY_INTERVAL = 0.2
+
+
+##
+## Progress of single stage of build (e.g. loading, weights, details pages).
+##
+## On terminal progress is presented as status line refreshed in place,
+## otherwise (e.g. CI) it is logged every 'interval' seconds.
+##
+class ProgressStage(ThroughputLogger):
+    def __init__(self, reporter: "ProgressReporter", name, total=None):
+        super().__init__(_LOGGER, name, reporter.interval)
+        self.reporter = reporter
+        self.total = total
+        if reporter.tty:
+            ## status line is refreshed often and presented since first item
+            self.interval = DISPLAY_INTERVAL
+            self._next_time = self.start_time
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.end_time is None:
+            self.end_time = time.perf_counter()
+            self.report(self.end_time, final=True, stacklevel=3)
+
+    def report(self, curr_time, final=False, stacklevel=3):
+        ## on terminal progress is presented on status line, final message is logged
+        ## record points to caller of 'add()', 'finish()' or to 'with' statement
+        if self.reporter.tty and not final:
+            self.reporter.display(self.get_message(curr_time))
+            return
+        if final:
+            self.reporter.clear_display()
+        self.logger.info("%s", self.get_message(curr_time, final), stacklevel=stacklevel)
+
+    def get_eta(self, curr_time=None):
+        ## returns estimated remaining time in seconds or None if unknown
+        if not self.total or self.count < 1:
+            return None
+        throughput = self.get_throughput(curr_time)
+        if throughput <= 0:
+            return None
+        return max(0, self.total - self.count) / throughput
+
+    def get_message(self, curr_time, final=False):
+        throughput = self.get_throughput(curr_time)
+        if final:
+            return f"{self.items_name}: {self.count} items in {self.get_duration(curr_time):.2f}s ({throughput:.1f}/s)"
+        message = f"{self.items_name}: {self.count}"
+        if self.total:
+            message += f"/{self.total} ({self.count * 100 // self.total}%)"
+        message += f" {throughput:.1f}/s"
+        eta = self.get_eta(curr_time)
+        if eta is not None:
+            message += f" ETA {format_duration(eta)}"
+        return message
+
+    def to_dict(self):
+        return {
+            "name": self.items_name,
+            "items": self.count,
+            "total": self.total,
+            "duration": self.get_duration(),
+            "items_per_second": self.get_throughput(),
+        }
+
+
+##
+## Collects stages of build and presents their progress.
+##
+class ProgressReporter:
+    def __init__(self, stream=None, tty=None, interval=10.0):
+        if stream is None:
+            stream = sys.stderr
+        if tty is None:
+            tty = hasattr(stream, "isatty") and stream.isatty()
+        self.stream = stream
+        self.tty = tty
+        self.interval = interval
+        self.start_time = time.perf_counter()
+        self.stages: List[ProgressStage] = []
+        self._displayed = False
+        self._lock = threading.Lock()
+
+    def stage(self, name, total=None) -> ProgressStage:
+        new_stage = ProgressStage(self, name, total)
+        with self._lock:
+            self.stages.append(new_stage)
+        return new_stage
+
+    def display(self, message):
+        with self._lock:
+            self.stream.write("\r" + message + "\x1b[K")
+            self.stream.flush()
+            self._displayed = True
+
+    def clear_display(self):
+        with self._lock:
+            if not self._displayed:
+                return
+            self.stream.write("\r\x1b[K")
+            self.stream.flush()
+            self._displayed = False
+
+    def get_summary(self):
+        with self._lock:
+            stages_list = [item.to_dict() for item in self.stages]
+        return {"duration": time.perf_counter() - self.start_time, "stages": stages_list}
+
+    def write_summary(self, output_path):
+        out_dir = os.path.dirname(output_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(output_path, "w", encoding="utf8") as fp:
+            json.dump(self.get_summary(), fp, indent=4)
+        _LOGGER.info("progress summary written to %s", output_path)
+
+
+def format_duration(seconds):
+    seconds = int(seconds + 0.5)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+# =========================================
+
+
+## reporter used by all stages (logs progress by default)
+_REPORTER = ProgressReporter(tty=False, interval=5.0)
+
+
+def configure(stream=None, tty=None, interval=10.0) -> ProgressReporter:
+    # pylint: disable=W0603
+    global _REPORTER
+    _REPORTER = ProgressReporter(stream, tty, interval)
+    return _REPORTER
+
+
+def get_reporter() -> ProgressReporter:
+    return _REPORTER
+
+
+def stage(name, total=None) -> ProgressStage:
+    return _REPORTER.stage(name, total)
@@ -8,6 +8,7 @@
 
 import os
 import logging
+import time
 import datetime
 from typing import Iterable
 import hashlib
@@ -147,6 +148,35 @@ def calculate_hash(data_string):
     return hash_value
 
 
+## removes files of cache directory not used for 'max_age' seconds and oldest files above 'max_files'
+## time of last use is time of modification of file (cache files are touched when loaded)
+## temporary files of cache being saved are skipped
+def prune_cache_dir(cache_dir, max_files=32, max_age=30 * 24 * 3600):
+    try:
+        with os.scandir(cache_dir) as dir_iter:
+            files_list = [(entry.stat().st_mtime, entry.path) for entry in dir_iter if ".tmp" not in entry.name]
+    except FileNotFoundError:
+        return
+    files_list.sort(reverse=True)
+    min_time = time.time() - max_age
+    for file_index, (mtime, file_path) in enumerate(files_list):
+        if file_index < max_files and mtime >= min_time:
+            continue
+        try:
+            os.remove(file_path)
+        except OSError:
+            ## file removed by concurrent build
+            pass
+
+
+## marks cache file as recently used
+def touch_cache_file(file_path):
+    try:
+        os.utime(file_path)
+    except OSError:
+        pass
+
+
 ## =====================================================
 
 
@@ -9,7 +9,12 @@
 /* jshint esversion: 6 */
 
 
+/// navigate.js uses globals defined in rankworker.js
+const rank = require('rankworker.js');
+Object.assign(globalThis, rank);
+
 const mod = require('navigate.js');
+const details = require('details.js');
 
 
 function assert_equal(data1, data2) {
@@ -31,7 +36,127 @@ function test_empty() {
 }
 
 
+function create_navigator() {
+	const values_dict = {"name": ["a", "b", "c"], "size": ["S", "M", "L"]};
+	const weights_dict = {
+		"a": {"size": {"S": 1.0, "M": 0.5, "L": 0.0}},
+		"b": {"size": {"S": 0.5, "M": 1.0, "L": 0.5}},
+		"c": {"size": {"S": 0.0, "M": 0.5, "L": 1.0}}
+	};
+	/// bits: a=1, b=2, c=4
+	const bitsets_dict = {"size": {"S": "AQAAAA==", "M": "AgAAAA==", "L": "BAAAAA=="}};
+	return new mod.Navigator(values_dict, weights_dict, {}, {}, "name", undefined, bitsets_dict);
+}
+
+
+function test_parse_params() {
+	const nav_data = mod.parse_nav_params("?size=S&size=L&_mode=filter");
+	assert_equal(JSON.stringify(nav_data), `{"size":["S","L"],"_mode":"filter"}`);
+}
+
+
+function test_bitset() {
+	const bits = rank.decode_bitset("BQAAAAEAAAA=", 2);
+	assert_equal(bits[0], 5);
+	assert_equal(bits[1], 1);
+	assert_equal(rank.popcount_array(bits), 3);
+}
+
+
+/// bitsets encoded by 'encode_bitset()' of generator/bitset.py (checked by test_bitset.py)
+function test_bitset_fixture() {
+	const cases_list = require(__dirname + '/bitsets.json');
+	for (const item of cases_list) {
+		const words_num = Math.ceil(item.size / 32);
+		const bits = rank.decode_bitset(item.encoded, words_num);
+		assert_equal(bits.length, words_num);
+		for (let i = 0; i < item.size; ++i) {
+			const bit_set = ((bits[i >>> 5] >>> (i & 31)) & 1) === 1;
+			assert_equal(bit_set, item.bits.includes(i));
+		}
+		assert_equal(rank.popcount_array(bits), item.bits.length);
+	}
+}
+
+
+function test_rank_multi() {
+	let nav = create_navigator();
+	const weights = nav.calculate_weights({"size": ["S", "L"]});
+	assert_equal(JSON.stringify(weights), `[["a",100],["b",50],["c",100]]`);
+}
+
+
+function test_filter_multi() {
+	let nav = create_navigator();
+	let weights = nav.calculate_weights({"size": ["S", "L"], "_mode": "filter"});
+	assert_equal(JSON.stringify(weights), `[["a",100],["c",100]]`);
+	weights = nav.calculate_weights({"size": ["M"], "_mode": "filter"});
+	assert_equal(JSON.stringify(weights), `[["b",100]]`);
+}
+
+
+function test_rank_limit() {
+	const ranker = new rank.Ranker(["a", "b", "c"], create_navigator().ranker.weights_dict);
+	const result = ranker.rank({"size": ["L"]}, 2);
+	assert_equal(JSON.stringify(result), `{"weights_list":[["c",100],["b",50]],"total":3}`);
+}
+
+
+function test_shard_result() {
+	const shard = {"weights_list": [["c", 100.0], ["b", 50.0], ["a", 0.0]], "total": 3, "matching": 1};
+	let result = mod.shard_to_result(shard, "rank", 2);
+	assert_equal(JSON.stringify(result), `{"weights_list":[["c",100],["b",50]],"total":3}`);
+	result = mod.shard_to_result(shard, "filter", 2);
+	assert_equal(JSON.stringify(result), `{"weights_list":[["c",100]],"total":1}`);
+}
+
+
+function test_load_weights() {
+	const values_dict = {"name": ["a", "b", "c"], "size": ["S", "M", "L"]};
+	let nav = new mod.Navigator(values_dict, null, {}, {}, "name");
+	nav.weights_path = "weights.js";
+	let scripts_list = [];
+	globalThis.document = {createElement: () => ({}), head: {appendChild: (script) => scripts_list.push(script)}};
+	nav.rank_full({"size": ["L"]}).then((result) => {
+		assert_equal(JSON.stringify(result.weights_list), `[["c",100],["b",50],["a",0]]`);
+	});
+	assert_equal(scripts_list.length, 1);
+	assert_equal(scripts_list[0].src, "weights.js");
+	/// executed by loaded script
+	mod.load_weights(create_navigator().ranker.weights_dict);
+}
+
+
+/// items of details shards and content of details pages generated by generator/jsgen.py (checked by test_jsgen.py)
+function test_details_fixture() {
+	const fixture = require(__dirname + '/details.json');
+	globalThis.DETAILS_CONFIG = fixture.config;
+	for (const item of fixture.items) {
+		assert_equal(details.render_details(item.item), item.content);
+	}
+	const content = details.render_details({"answer": "a", "rows": [["size", []]]});
+	assert_equal(content.includes(`<tr> <td>size</td> <td>${fixture.config.empty_value}</td> </tr>`), true);
+}
+
+
+function test_worker_source() {
+	/// worker source has to be valid script
+	const source = rank.get_rank_worker_source();
+	new Function("self", "setTimeout", source);
+}
+
+
 // ===============================
 
 
 test_empty();
+test_parse_params();
+test_bitset();
+test_bitset_fixture();
+test_rank_multi();
+test_filter_multi();
+test_rank_limit();
+test_shard_result();
+test_load_weights();
+test_details_fixture();
+test_worker_source();
@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import os
+import re
+import json
+import tempfile
+
+from rankpagegenerator.utils import read_data, calculate_hash
+from rankpagegenerator.generator.dataloader import DataLoader
+from rankpagegenerator.generator.writer import OutputWriter, get_compressed_extensions
+from rankpagegenerator.generator.jsgen import (
+    write_assets,
+    write_assets_manifest,
+    generate_javascript,
+    BuildOptions,
+    DATA_DIR,
+)
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, os.pardir, os.pardir, os.pardir, "examples", "furniture", "model.xls")
+
+
+class WriteAssetsTest(unittest.TestCase):
+    def setUp(self):
+        ## Called before testfunction is executed
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.out_dir = os.path.join(self.temp_dir.name, "out")
+
+    def tearDown(self):
+        ## Called after testfunction was executed
+        self.temp_dir.cleanup()
+
+    def test_plain(self):
+        with OutputWriter(self.out_dir) as writer:
+            assets_dict = write_assets(writer, ["navigate.js"], False)
+        self.assertEqual(assets_dict, {"styles.css": "styles.css", "navigate.js": "navigate.js"})
+        self.assertTrue(os.path.isfile(os.path.join(self.out_dir, "navigate.js")))
+        self.assertFalse(os.path.exists(os.path.join(self.out_dir, "assets-manifest.json")))
+
+    def test_hashed(self):
+        with OutputWriter(self.out_dir) as writer:
+            assets_dict = write_assets(writer, ["navigate.js"], True)
+            write_assets_manifest(writer, assets_dict)
+        self.assertEqual(sorted(assets_dict.keys()), ["navigate.js", "styles.css"])
+        for asset_name, out_name in assets_dict.items():
+            self.assertRegex(out_name, r"^\w+\.[0-9a-f]{12}\.\w+$")
+            content = read_data(os.path.join(self.out_dir, out_name))
+            self.assertEqual(content, read_data(os.path.join(DATA_DIR, asset_name)))
+            ## name contains hash of content
+            self.assertIn(calculate_hash(content)[:12], out_name)
+        self.assertFalse(os.path.exists(os.path.join(self.out_dir, "navigate.js")))
+
+        manifest_path = os.path.join(self.out_dir, "assets-manifest.json")
+        manifest_dict = json.loads(read_data(manifest_path))
+        self.assertEqual(manifest_dict["assets"], assets_dict)
+        headers_dict = manifest_dict["headers"]
+        self.assertEqual(headers_dict["*.html"], {"Cache-Control": "no-cache"})
+        for out_name in assets_dict.values():
+            self.assertIn("immutable", headers_dict[out_name]["Cache-Control"])
+
+    def test_hashed_reuse(self):
+        ## unchanged asset keeps its name in next build, so cached copy can be reused by browsers
+        with OutputWriter(self.out_dir, precompress=True) as writer:
+            first_dict = write_assets(writer, ["navigate.js"], True)
+            write_assets_manifest(writer, first_dict)
+        with OutputWriter(self.out_dir, precompress=True) as writer:
+            second_dict = write_assets(writer, ["navigate.js"], True)
+            write_assets_manifest(writer, second_dict)
+        self.assertEqual(first_dict, second_dict)
+        ## compressed siblings of assets and manifest are reused
+        self.assertEqual(writer.compressed_num, 0)
+        self.assertEqual(writer.reused_num, 3 * len(get_compressed_extensions()))
+        files_list = [name for name in os.listdir(self.out_dir) if re.match(r"^navigate\..*\.js$", name)]
+        self.assertEqual(files_list, [first_dict["navigate.js"]])
+
+    def test_hashed_data(self):
+        ## data files loaded by scripts are hashed and listed in manifest
+        options = BuildOptions(nophotos=True, hashassets=True, shards_limit=2, details_shard_size=2)
+        generate_javascript(DataLoader(MODEL_PATH), self.out_dir, options)
+        manifest_path = os.path.join(self.out_dir, "assets-manifest.json")
+        manifest_dict = json.loads(read_data(manifest_path))
+        assets_dict = manifest_dict["assets"]
+        data_list = [name for name in assets_dict if name.startswith(("shards/", "details/", "weights"))]
+        self.assertIn("weights.js", data_list)
+        self.assertIn("shards/0/0.json", data_list)
+        self.assertIn("details/shard_1.js", data_list)
+        for data_path in data_list:
+            out_path = assets_dict[data_path]
+            content = read_data(os.path.join(self.out_dir, out_path))
+            self.assertIn(calculate_hash(content)[:12], out_path)
+            self.assertIn("immutable", manifest_dict["headers"][out_path]["Cache-Control"])
+            ## plain names are not written
+            self.assertFalse(os.path.exists(os.path.join(self.out_dir, data_path)))
+
+        index_content = read_data(os.path.join(self.out_dir, "index.html"))
+        self.assertIn(f'const WEIGHTS_PATH = "{assets_dict["weights.js"]}";', index_content)
+        self.assertIn(assets_dict["shards/0/0.json"], index_content)
+        details_content = read_data(os.path.join(self.out_dir, "details.html"))
+        self.assertIn(assets_dict["details/shard_1.js"], details_content)
@@ -0,0 +1,59 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+import json
+
+from rankpagegenerator.generator.batchgen import load_manifest, format_results_table, is_enabled
+
+
+class BatchGenTest(unittest.TestCase):
+    def test_load_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest_path = os.path.join(tmp_dir, "manifest.json")
+            with open(manifest_path, "w", encoding="utf8") as fp:
+                json.dump({"models": [{"model": "horse/model.xls", "outdir": "out", "similaritems": 2}]}, fp)
+            entries_list = load_manifest(manifest_path)
+            self.assertEqual(1, len(entries_list))
+            entry = entries_list[0]
+            self.assertEqual("horse/model.xls", entry["name"])
+            self.assertEqual(os.path.join(tmp_dir, "horse/model.xls"), entry["model"])
+            self.assertEqual(os.path.join(tmp_dir, "out"), entry["outdir"])
+            self.assertEqual(2, entry["similaritems"])
+            self.assertEqual(None, entry["translation"])
+
+    def test_load_manifest_invalid(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest_path = os.path.join(tmp_dir, "manifest.json")
+            with open(manifest_path, "w", encoding="utf8") as fp:
+                json.dump([{"model": "model.xls", "outdir": "out", "unknown": 1}], fp)
+            self.assertRaises(ValueError, load_manifest, manifest_path)
+
+    def test_format_results_table(self):
+        results_list = [
+            {
+                "name": "horse",
+                "status": "ok",
+                "duration": 1.5,
+                "stages": [{"name": "loading", "duration": 0.5}, {"name": "photos", "duration": 1.0}],
+            },
+            {"name": "broken", "status": "failed", "duration": None, "stages": []},
+        ]
+        table = format_results_table(results_list)
+        lines_list = table.split("\n")
+        self.assertEqual(3, len(lines_list))
+        self.assertEqual("horse   ok      1.50      photos (1.00s)", lines_list[1])
+        self.assertEqual("broken  failed  -         -", lines_list[2])
+
+    def test_is_enabled(self):
+        self.assertTrue(is_enabled(True))
+        self.assertTrue(is_enabled("True"))
+        self.assertFalse(is_enabled("false"))
+        self.assertFalse(is_enabled(0))
@@ -0,0 +1,31 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import os
+import json
+
+import numpy
+
+from rankpagegenerator.generator.bitset import encode_bitset
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+## the same cases are decoded by 'decode_bitset()' of rankworker.js in test_nav.js
+FIXTURE_PATH = os.path.join(SCRIPT_DIR, os.pardir, "data", "bitsets.json")
+
+
+class BitsetTest(unittest.TestCase):
+    def test_encode_fixture(self):
+        with open(FIXTURE_PATH, "r", encoding="utf8") as fp:
+            cases_list = json.load(fp)
+        for item in cases_list:
+            bits_array = numpy.zeros(item["size"], dtype=bool)
+            bits_array[item["bits"]] = True
+            self.assertEqual(item["encoded"], encode_bitset(bits_array))
@@ -0,0 +1,59 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from rankpagegenerator.generator.intrange import IntRange, calculate_range_weights
+from rankpagegenerator.generator.dataloader import calculate_weights
+
+
+class IntRangeTest(unittest.TestCase):
+    def test_parse(self):
+        value = IntRange.parse("7,1-5, 4-6")
+        self.assertEqual(value.intervals, ((1, 7),))
+        self.assertEqual(value.count(), 7)
+
+        value = IntRange.parse("1-100000,200000")
+        self.assertEqual(str(value), "1-100000,200000")
+        self.assertEqual(value.count(), 100001)
+
+    def test_rank(self):
+        value = IntRange.parse("1-10,20-29")
+        self.assertEqual(value.rank(1), 0)
+        self.assertEqual(value.rank(15), 10)
+        self.assertEqual(value.rank(20), 10)
+        self.assertEqual(value.value_at(10), 20)
+        self.assertEqual(value.count_between(5, 25), 12)
+
+    def test_split(self):
+        value = IntRange.parse("1-10,20-29")
+        buckets = [str(item) for item in value.split(4)]
+        self.assertEqual(buckets, ["1-5", "6-10", "20-24", "25-29"])
+
+        value = IntRange.parse("3-5")
+        buckets = [item.label() for item in value.split(4)]
+        self.assertEqual(buckets, ["3", "4", "5"])
+
+    def test_weights_equal_expanded(self):
+        ## weights of single values have to be the same as calculated on expanded list
+        order_values = list(range(1, 11))
+        domain = IntRange.parse("1-10")
+        buckets_dict = {str(val): IntRange.parse(val) for val in order_values}
+        for row in ["3", "1-2", "4,9"]:
+            row_range = IntRange.parse(row)
+            expected = calculate_weights(list(row_range.values()), order_values)
+            weights = calculate_range_weights(row_range, buckets_dict, domain)
+            expected = {str(key): val for key, val in expected.items()}
+            self.assertEqual(weights, expected)
+
+    def test_weights_binary(self):
+        buckets_dict = {"1-50": IntRange.parse("1-50"), "51-100": IntRange.parse("51-100")}
+        weights = calculate_range_weights(IntRange.parse("40-60"), buckets_dict)
+        self.assertEqual(weights, {"1-50": 1.0, "51-100": 1.0})
+        weights = calculate_range_weights(IntRange.parse("70"), buckets_dict)
+        self.assertEqual(weights, {"1-50": 0.0, "51-100": 1.0})
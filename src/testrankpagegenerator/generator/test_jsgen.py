@@ -0,0 +1,197 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import os
+import re
+import json
+import tempfile
+import posixpath
+
+from rankpagegenerator.generator.dataloader import DataLoader
+from rankpagegenerator.generator.templates import PageTemplates
+from rankpagegenerator.generator.pagelayout import PageLayout
+from rankpagegenerator.generator.writer import OutputWriter
+from rankpagegenerator.generator.jsgen import (
+    BuildOptions,
+    generate_pages,
+    calculate_similar_dict,
+    get_details_item,
+    generate_details_content,
+    generate_similar_content,
+    get_category_answer_cells,
+    generate_category_column_pages,
+    get_category_rows,
+    generate_category_table,
+    generate_category_index,
+)
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HORSE_MODEL_PATH = os.path.join(SCRIPT_DIR, os.pardir, os.pardir, os.pardir, "examples", "horse", "model.xls")
+## items of details shards are rendered by 'render_details()' of details.js in test_nav.js
+DETAILS_FIXTURE_PATH = os.path.join(SCRIPT_DIR, os.pardir, "data", "details.json")
+
+
+class DetailsShardsTest(unittest.TestCase):
+    def test_details_fixture(self):
+        ## data of details shard corresponds to content of separate details page
+        with open(DETAILS_FIXTURE_PATH, "r", encoding="utf8") as fp:
+            fixture_dict = json.load(fp)
+        data_loader = DataLoader(HORSE_MODEL_PATH)
+        templates = PageTemplates(data_loader)
+        config_dict = fixture_dict["config"]
+        self.assertEqual(config_dict["table_header"], templates.table_header)
+        self.assertEqual(config_dict["empty_value"], templates.empty_value)
+        for label in ["similar_label", "photos_label", "license_label"]:
+            self.assertEqual(config_dict[label], templates.labels[label])
+
+        answer_column_id = data_loader.get_answer_column_name()
+        similar_dict = calculate_similar_dict(data_loader, 2)
+        pages_dict = {}
+        for answer_index, answer_value in enumerate(data_loader.get_answers_list()):
+            pages_dict[answer_value] = f"details.html?id={answer_index}"
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with OutputWriter(tmp_dir) as writer:
+                data_loader.copy_photos(writer)
+            rows_list = list(data_loader.iter_model_rows())
+            self.assertEqual(len(rows_list), len(fixture_dict["items"]))
+            for row_dict, case_dict in zip(rows_list, fixture_dict["items"]):
+                similar_list = similar_dict.get(row_dict[answer_column_id][0], [])
+                item_dict = get_details_item(data_loader, row_dict, similar_list, pages_dict, False, tmp_dir)
+                ## item is stored in shard as JSON
+                self.assertEqual(case_dict["item"], json.loads(json.dumps(item_dict)))
+                similar_content = generate_similar_content(templates, similar_list, pages_dict)
+                content = generate_details_content(data_loader, templates, row_dict, False, tmp_dir, similar_content)
+                self.assertEqual(case_dict["content"], content)
+
+
+class CategoryPagesTest(unittest.TestCase):
+    def setUp(self):
+        ## Called before testfunction is executed
+        ## values of 'horn': 'no' (horse, pegasus) and 'yes' (unicorn)
+        self.data_loader = DataLoader(HORSE_MODEL_PATH)
+        self.answer_cells_dict = get_category_answer_cells(self.data_loader, {}, {}, "../")
+
+    def test_rows(self):
+        rows_list, values_list = get_category_rows(self.data_loader, "horn", ["no", "yes", "maybe"], 2)
+        self.assertEqual(
+            rows_list,
+            [
+                (0, "no", 0, "horse", 2),
+                (0, "no", 1, "pegasus", 2),
+                (1, "yes", 0, "unicorn", 1),
+                ## value without answers occupies single row
+                (2, "maybe", 0, None, 1),
+            ],
+        )
+        ## values with page index of first row
+        self.assertEqual(values_list, [("no", 2, 0), ("yes", 1, 1), ("maybe", 0, 1)])
+
+    def test_table_single_page(self):
+        rows_list, _ = get_category_rows(self.data_loader, "horn", ["no", "yes"], 10)
+        content = generate_category_table("horn", rows_list, self.answer_cells_dict, False)
+        self.assertIn("<td rowspan='2'>no</td> <td>horse</td>", content)
+        self.assertIn("<td rowspan='1'>yes</td> <td>unicorn</td>", content)
+        self.assertNotIn("value_", content)
+
+    def test_table_rowspan_split(self):
+        ## rows of value 'no' are split between pages
+        rows_list, _ = get_category_rows(self.data_loader, "horn", ["no", "yes"], 1)
+        first_content = generate_category_table("horn", rows_list[0:1], self.answer_cells_dict, True)
+        self.assertIn("""<td rowspan='1' id="value_0">no</td> <td>horse</td>""", first_content)
+        ## value cell is repeated on next page, anchor is only on first page of value
+        second_content = generate_category_table("horn", rows_list[1:2], self.answer_cells_dict, True)
+        self.assertIn("<td rowspan='1'>no</td> <td>pegasus</td>", second_content)
+
+        rows_list, _ = get_category_rows(self.data_loader, "horn", ["no", "yes"], 2)
+        content = generate_category_table("horn", rows_list[0:2], self.answer_cells_dict, True)
+        self.assertIn("""<td rowspan='2' id="value_0">no</td> <td>horse</td>""", content)
+        self.assertEqual(content.count("<td rowspan="), 1)
+
+    def test_index(self):
+        layout = PageLayout("pages")
+        pages_list = ["category_1.html", "category_1_1.html"]
+        content = generate_category_index(layout, "horn", [("no", 2, 0), ("yes", 1, 1)], pages_list)
+        self.assertIn("""<tr> <td><a href="#value_0">no</a></td> <td>2</td> </tr>""", content)
+        self.assertIn("""<tr> <td><a href="category_1_1.html#value_1">yes</a></td> <td>1</td> </tr>""", content)
+
+    def test_sharded_pages_links(self):
+        ## links between pages of category are valid in nested directories of pages
+        self.data_loader.config_dict["subpage_shard_levels"] = 2
+        self.data_loader.config_dict["category_page_rows"] = 1
+        layout = PageLayout.create(self.data_loader.config_dict)
+        templates = PageTemplates(self.data_loader)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with OutputWriter(tmp_dir) as writer:
+                pages_num = generate_category_column_pages(
+                    self.data_loader,
+                    templates,
+                    self.answer_cells_dict,
+                    "horn",
+                    ["no", "yes"],
+                    "category_1.html",
+                    {"styles.css": "styles.css"},
+                    writer,
+                )
+            self.assertEqual(pages_num, 3)
+            pages_list = ["category_1.html", "category_1_1.html", "category_1_2.html"]
+            for page_name in pages_list:
+                page_path = layout.get_page_path(page_name)
+                with open(os.path.join(tmp_dir, page_path), "r", encoding="utf8") as fp:
+                    content = fp.read()
+                targets_set = set()
+                for link, anchor in re.findall(r'href="([^"#]*)#?([^"]*)"', content):
+                    target_path = page_path
+                    if link:
+                        target_path = posixpath.normpath(posixpath.join(layout.get_page_dir(page_name), link))
+                    targets_set.add(target_path)
+                    if not target_path.startswith("subpage/"):
+                        continue
+                    with open(os.path.join(tmp_dir, target_path), "r", encoding="utf8") as fp:
+                        target_content = fp.read()
+                    if anchor:
+                        ## index links first row of value
+                        self.assertIn(f'id="{anchor}"', target_content)
+                ## pagination links other pages of category
+                for other_name in pages_list:
+                    if other_name != page_name:
+                        self.assertIn(layout.get_page_path(other_name), targets_set)
+                self.assertIn("index.html", targets_set)
+                self.assertIn("styles.css", targets_set)
+
+
+class LanguagesTest(unittest.TestCase):
+    def test_shared_data(self):
+        ## result shards and weights are written once and linked by pages of all languages
+        options = BuildOptions(nophotos=True, shards_limit=2, similar_num=2)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            translations_list = []
+            for language in ["pl", "en"]:
+                translation_path = os.path.join(tmp_dir, f"{language}.json")
+                with open(translation_path, "w", encoding="utf8") as fp:
+                    json.dump({"Similar items": f"similar_{language}"}, fp)
+                translations_list.append(translation_path)
+            out_dir = os.path.join(tmp_dir, "out")
+            generate_pages(HORSE_MODEL_PATH, translations_list, out_dir, options)
+
+            self.assertTrue(os.path.isfile(os.path.join(out_dir, "weights.js")))
+            self.assertTrue(os.path.isfile(os.path.join(out_dir, "shards", "0", "0.json")))
+            for language in ["pl", "en"]:
+                lang_dir = os.path.join(out_dir, language)
+                self.assertFalse(os.path.exists(os.path.join(lang_dir, "shards")))
+                self.assertFalse(os.path.exists(os.path.join(lang_dir, "weights.js")))
+                with open(os.path.join(lang_dir, "index.html"), "r", encoding="utf8") as fp:
+                    content = fp.read()
+                self.assertIn("""const WEIGHTS_PATH = "../weights.js";""", content)
+                self.assertIn("'../shards/0/0.json'", content)
+                with open(os.path.join(lang_dir, "subpage", "match_0.html"), "r", encoding="utf8") as fp:
+                    content = fp.read()
+                self.assertIn(f"similar_{language}", content)
@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import os
+import tempfile
+
+from rankpagegenerator.generator.modelreader import (
+    ModelReader,
+    ExcelReader,
+    DirectoryReader,
+    TableFileReader,
+    create_reader,
+    read_model_tables,
+    write_model_dir,
+)
+from rankpagegenerator.generator.dataloader import DataLoader
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, os.pardir, os.pardir, os.pardir, "examples", "furniture", "model.xls")
+HORSE_MODEL_PATH = os.path.join(SCRIPT_DIR, os.pardir, os.pardir, os.pardir, "examples", "horse", "model.xls")
+
+
+class ModelReaderTest(unittest.TestCase):
+    def setUp(self):
+        ## Called before testfunction is executed
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        ## Called after testfunction was executed
+        self.temp_dir.cleanup()
+
+    def test_create_reader(self):
+        self.assertIsInstance(create_reader(MODEL_PATH), ExcelReader)
+        self.assertIsInstance(create_reader(self.temp_dir.name), DirectoryReader)
+        self.assertIsInstance(create_reader("model.csv"), TableFileReader)
+        ## 'get_table()' is abstract
+        self.assertRaises(TypeError, ModelReader, MODEL_PATH)
+
+    def test_directory(self):
+        tables_dict = read_model_tables(create_reader(MODEL_PATH))
+        model_dir = os.path.join(self.temp_dir.name, "model")
+        write_model_dir(tables_dict, model_dir)
+        self.assertIn("data.csv", os.listdir(model_dir))
+
+        dir_tables = read_model_tables(create_reader(model_dir))
+        for marker, table in tables_dict.items():
+            if table is None:
+                self.assertIsNone(dir_tables[marker])
+                continue
+            self.assertEqual(table.columns.tolist(), dir_tables[marker].columns.tolist())
+            self.assertEqual(table.values.tolist(), dir_tables[marker].values.tolist())
+
+        excel_loader = DataLoader(MODEL_PATH)
+        dir_loader = DataLoader(model_dir)
+        self.assertEqual(excel_loader.get_model_json(), dir_loader.get_model_json())
+        self.assertEqual(excel_loader.weights_dict, dir_loader.weights_dict)
+
+    def test_iter_table(self):
+        tables_dict = read_model_tables(create_reader(MODEL_PATH))
+        model_dir = os.path.join(self.temp_dir.name, "model")
+        write_model_dir(tables_dict, model_dir)
+
+        reader = create_reader(model_dir)
+        data_table = reader.get_table("Data:", True)
+        chunks_list = list(reader.iter_table("Data:", True, chunk_size=2))
+        self.assertEqual(len(chunks_list), (len(data_table) + 1) // 2)
+        self.assertEqual(0, chunks_list[-1].index.tolist()[0])
+        rows_list = []
+        for chunk in chunks_list:
+            rows_list.extend(chunk.values.tolist())
+        self.assertEqual(data_table.values.tolist(), rows_list)
+
+    def test_streamed_loader(self):
+        tables_dict = read_model_tables(create_reader(HORSE_MODEL_PATH))
+        ## rows in reverse order of answers
+        tables_dict["Data:"] = tables_dict["Data:"].iloc[::-1]
+        model_dir = os.path.join(self.temp_dir.name, "model")
+        write_model_dir(tables_dict, model_dir)
+
+        loader = DataLoader(model_dir)
+        streamed_loader = DataLoader(model_dir, chunk_size=2)
+        self.assertIsNone(streamed_loader.model_data)
+        self.assertEqual(loader.get_columns_list(), streamed_loader.get_columns_list())
+        self.assertEqual(loader.get_possible_values_dict(), streamed_loader.get_possible_values_dict())
+        self.assertEqual(loader.weights_dict, streamed_loader.weights_dict)
+        self.assertEqual(loader.links_dict, streamed_loader.links_dict)
+        self.assertEqual(loader.details_dict, streamed_loader.details_dict)
+
+        ## streamed rows keep order of data table
+        answers_list = streamed_loader.get_answers_list()
+        self.assertEqual(tables_dict["Data:"]["name"].tolist(), answers_list)
+        self.assertEqual(sorted(answers_list), loader.get_answers_list())
+        streamed_rows = streamed_loader.get_model_json()
+        self.assertEqual(sorted(streamed_rows, key=lambda row_dict: row_dict["name"]), loader.get_model_json())
+        self.assertEqual(answers_list, [row_dict["name"][0] for row_dict in streamed_rows])
+
+    def test_directory_nodata(self):
+        reader = create_reader(self.temp_dir.name)
+        self.assertIsNone(reader.get_table("Order:"))
+        self.assertRaises(FileNotFoundError, reader.get_table, "Data:", True)
@@ -0,0 +1,30 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+import posixpath
+
+from rankpagegenerator.generator.pagelayout import PageLayout
+
+
+class PageLayoutTest(unittest.TestCase):
+    def test_flat(self):
+        layout = PageLayout("pages")
+        self.assertEqual(layout.get_page_path("match_1.html"), "pages/match_1.html")
+        self.assertEqual(layout.get_root_path("match_1.html"), "../")
+        self.assertEqual(layout.get_link("match_1.html", "match_2.html"), "match_2.html")
+        self.assertEqual(layout.get_dirs(["match_1.html", "match_2.html"]), ["pages"])
+
+    def test_sharded(self):
+        layout = PageLayout("pages", 2)
+        page_path = layout.get_page_path("match_1.html")
+        self.assertRegex(page_path, r"^pages/[0-9a-f]{2}/[0-9a-f]{2}/match_1\.html$")
+        self.assertEqual(layout.get_root_path("match_1.html"), "../../../")
+        link = layout.get_link("match_1.html", "match_2.html")
+        target_path = posixpath.normpath(posixpath.join(layout.get_page_dir("match_1.html"), link))
+        self.assertEqual(target_path, layout.get_page_path("match_2.html"))
@@ -0,0 +1,76 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import os
+import time
+import tempfile
+
+from rankpagegenerator.utils import prune_cache_dir
+from rankpagegenerator.generator.photoindex import PhotoIndex, scan_photos
+
+
+def write_file(file_path, content):
+    with open(file_path, "w", encoding="utf8") as fp:
+        fp.write(content)
+
+
+class PhotoIndexTest(unittest.TestCase):
+    def setUp(self):
+        ## Called before testfunction is executed
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.photos_dir = os.path.join(self.temp_dir.name, "photos")
+        answer_dir = os.path.join(self.photos_dir, "horse")
+        os.makedirs(answer_dir)
+        write_file(os.path.join(answer_dir, "b.jpg"), "image b")
+        write_file(os.path.join(answer_dir, "a.jpg"), "image a")
+        write_file(os.path.join(answer_dir, "a.jpg.lic"), "license a")
+
+    def tearDown(self):
+        ## Called after testfunction was executed
+        self.temp_dir.cleanup()
+
+    def test_get_photos(self):
+        index = PhotoIndex(self.photos_dir, use_cache=False)
+        answer_dir = os.path.join(self.photos_dir, "horse")
+        photos_list = index.get_photos("horse")
+        self.assertEqual([os.path.join(answer_dir, "a.jpg"), os.path.join(answer_dir, "b.jpg")], photos_list)
+        self.assertEqual(None, index.get_photos("pegasus"))
+        self.assertEqual("license a", index.get_license(photos_list[0]))
+        self.assertEqual(None, index.get_license(photos_list[1]))
+
+    def test_get_photos_nodir(self):
+        index = PhotoIndex(os.path.join(self.temp_dir.name, "missing"), use_cache=False)
+        self.assertEqual({}, index.photos_dict)
+
+    def test_scan_cached(self):
+        photos_dict = scan_photos(self.photos_dir)
+        ## unchanged license is taken from previous scan
+        photos_dict["horse"][0]["license"]["content"] = "cached license"
+        photos_dict = scan_photos(self.photos_dir, photos_dict)
+        self.assertEqual("cached license", photos_dict["horse"][0]["license"]["content"])
+        self.assertEqual(7, photos_dict["horse"][0]["size"])
+
+    def test_prune_cache(self):
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        os.makedirs(cache_dir)
+        curr_time = time.time()
+        ## files used 1, 2 and 3 hours ago and 40 days ago
+        for file_index, file_age in enumerate([3600, 7200, 10800, 40 * 24 * 3600]):
+            file_path = os.path.join(cache_dir, f"{file_index}.json")
+            write_file(file_path, "{}")
+            os.utime(file_path, (curr_time - file_age, curr_time - file_age))
+        write_file(os.path.join(cache_dir, "4.json.1.2.tmp"), "{}")
+
+        prune_cache_dir(cache_dir, max_files=3)
+        self.assertEqual(["0.json", "1.json", "2.json", "4.json.1.2.tmp"], sorted(os.listdir(cache_dir)))
+        prune_cache_dir(cache_dir, max_files=2)
+        self.assertEqual(["0.json", "1.json", "4.json.1.2.tmp"], sorted(os.listdir(cache_dir)))
+        ## missing directory
+        prune_cache_dir(os.path.join(self.temp_dir.name, "missing"))
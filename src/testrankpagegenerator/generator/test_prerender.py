@@ -0,0 +1,44 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from rankpagegenerator.generator.prerender import NavigationRenderer
+from rankpagegenerator.generator.translation import TranslationResolver
+
+
+class NavigationRendererTest(unittest.TestCase):
+    def test_empty(self):
+        renderer = NavigationRenderer({}, {}, {}, None, None, {})
+        content = renderer.generate_content()
+        self.assertEqual(
+            content,
+            """<table cellspacing="0" class="filterstable"><tr> <th>Parameters:</th> </tr></table>"""
+            """<table cellspacing="0" class="resultstable"><tr> <th>Results:</th> </tr></table>""",
+        )
+
+    def test_content(self):
+        values_dict = {"name": ["a", "b"], "size": ["S", 2.0]}
+        translation = TranslationResolver({"filterseparator": "#", "category": {"2": "two"}})
+        renderer = NavigationRenderer(values_dict, {}, {"a": "pages/a.html"}, "name", translation, {})
+        content = renderer.generate_filter_table()
+        self.assertIn(
+            """<tr> <td>size</td> <td><a href='?size=S' class="navlink">S</a>  # """
+            """<a href='?size=2' class="navlink">two</a> </td> </tr>""",
+            content,
+        )
+        self.assertIn("""<a href='?_mode=rank' class="navlink activeoption">Rank</a>""", content)
+
+        content = renderer.find_simple_answer()
+        self.assertEqual(
+            content, """<tr> <td><a href="pages/a.html">a</a></td> <td></td> </tr><tr> <td>b</td> <td></td> </tr>"""
+        )
+
+        ## labels of index page are reported as missing
+        self.assertIn("Parameters", translation.missing_dict[None])
+        self.assertIn("size", translation.missing_dict["category"])
@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from rankpagegenerator.generator.ranking import RankingEngine, parse_query
+
+
+def create_engine():
+    values_dict = {"size": ["S", "M", "L"], "legs": [3, 4]}
+    weights_dict = {
+        "a": {"size": {"S": 1.0, "M": 0.5, "L": 0.0}, "legs": {3: 1.0, 4: 0.0}},
+        "b": {"size": {"S": 0.5, "M": 1.0, "L": 0.5}, "legs": {3: 0.0, 4: 1.0}},
+        "c": {"size": {"S": 0.0, "M": 0.5, "L": 1.0}, "legs": {3: 0.0, 4: 1.0}},
+    }
+    return RankingEngine(["a", "b", "c"], weights_dict, values_dict)
+
+
+class RankingEngineTest(unittest.TestCase):
+    def test_rank(self):
+        engine = create_engine()
+        result = engine.rank({"size": "L"})
+        self.assertEqual(result, {"weights_list": [["c", 100.0], ["b", 50.0], ["a", 0.0]], "total": 3})
+
+        result = engine.rank({"size": ["S", "L"], "legs": "4"}, limit=2)
+        self.assertEqual(result, {"weights_list": [["c", 100.0], ["b", 75.0]], "total": 3})
+
+    def test_filter(self):
+        engine = create_engine()
+        result = engine.rank({"size": ["S", "L"], "_mode": "filter"})
+        self.assertEqual(result, {"weights_list": [["a", 100.0], ["c", 100.0]], "total": 2})
+
+        result = engine.rank({"size": ["S", "L"], "legs": [4], "_mode": "filter"})
+        self.assertEqual(result, {"weights_list": [["c", 100.0]], "total": 1})
+
+    def test_batch(self):
+        engine = create_engine()
+        queries_list = [{"size": "M"}, {"legs": 3, "_mode": "filter"}, {"size": "XL"}]
+        results = engine.rank_batch(queries_list, limit=1, chunk_size=2)
+        self.assertEqual(
+            results,
+            [
+                {"weights_list": [["b", 100.0]], "total": 3},
+                {"weights_list": [["a", 100.0]], "total": 1},
+                {"weights_list": [["a", 0.0]], "total": 3},
+            ],
+        )
+
+    def test_unknown_category(self):
+        engine = create_engine()
+        self.assertRaises(ValueError, engine.rank, {"color": "red"})
+
+    def test_parse_query(self):
+        query = parse_query("?size=S&size=L&size=S&_mode=filter")
+        self.assertEqual(query, {"size": ["S", "L"], "_mode": "filter"})
+        query = parse_query('{"size": "M"}')
+        self.assertEqual(query, {"size": "M"})
@@ -0,0 +1,48 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import os
+import time
+import tempfile
+
+import numpy
+
+from rankpagegenerator.generator.similarity import calculate_similar, load_cache, save_cache
+
+
+class SimilarityTest(unittest.TestCase):
+    def test_calculate_similar(self):
+        features = numpy.array([[1.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 0.0, 1.0]])
+        indexes, values = calculate_similar(features, 2, block_size=3)
+        self.assertEqual(indexes.tolist(), [[3, 1], [0, 3], [0, 1], [0, 1]])
+        self.assertAlmostEqual(values[0][0], 1.0, places=5)
+        self.assertAlmostEqual(values[0][1], 0.70711, places=5)
+        self.assertAlmostEqual(values[2][0], 0.0, places=5)
+
+    def test_zero_vector(self):
+        features = numpy.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+        indexes, values = calculate_similar(features, 1)
+        self.assertEqual(indexes.tolist(), [[1], [0], [0]])
+        self.assertEqual(values.tolist(), [[0.0], [0.0], [0.0]])
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ## cache of previous content of model not used for long time
+            stale_path = os.path.join(tmp_dir, "stale.npz")
+            save_cache(stale_path, numpy.array([[1]]), numpy.array([[0.5]]))
+            stale_time = time.time() - 40 * 24 * 3600
+            os.utime(stale_path, (stale_time, stale_time))
+
+            cache_path = os.path.join(tmp_dir, "curr.npz")
+            save_cache(cache_path, numpy.array([[1], [0]]), numpy.array([[0.5], [0.5]]))
+            self.assertEqual(["curr.npz"], os.listdir(tmp_dir))
+            indexes, values = load_cache(cache_path)
+            numpy.testing.assert_array_equal(indexes, [[1], [0]])
+            numpy.testing.assert_array_equal(values, [[0.5], [0.5]])
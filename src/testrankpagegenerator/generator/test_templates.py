@@ -0,0 +1,65 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+
+from rankpagegenerator.generator.dataloader import DataLoader
+from rankpagegenerator.generator.templates import Template, PageTemplates
+from rankpagegenerator.generator.translation import TranslationResolver
+
+
+SCRIPT_DIR = os.path.dirname(__file__)
+
+MODEL_PATH = os.path.join(SCRIPT_DIR, os.pardir, os.pardir, os.pardir, "examples", "simple", "model.xls")
+
+
+class TemplateTest(unittest.TestCase):
+    def test_render(self):
+        template = Template("<a href='{{link}}'>{{ label }}</a>{{link}}")
+        self.assertEqual(template.fields, ["link", "label", "link"])
+        content = template.render({"link": "x.html"}, {"label": "X", "link": "default"})
+        self.assertEqual(content, "<a href='x.html'>X</a>x.html")
+
+    def test_missing(self):
+        template = Template("{{title}}", "page")
+        with self.assertRaises(KeyError):
+            template.render({})
+
+
+class PageTemplatesTest(unittest.TestCase):
+    def test_user_template(self):
+        data_loader = DataLoader(MODEL_PATH)
+        with tempfile.TemporaryDirectory() as templates_dir:
+            with open(os.path.join(templates_dir, "category_page.html"), "w", encoding="utf8") as template_file:
+                template_file.write("{{back_label}}: {{content}}")
+            templates = PageTemplates(data_loader, templates_dir)
+            self.assertEqual(templates.render("category_page.html", content="abc"), "Back to Filters: abc")
+            ## not overridden template is taken from defaults
+            content = templates.render(
+                "details_page.html",
+                title="",
+                root_path="../",
+                styles_path="s.css",
+                prev_link="",
+                next_link="",
+                content="",
+            )
+            self.assertIn('href="../s.css"', content)
+
+    def test_lazy_labels(self):
+        data_loader = DataLoader(MODEL_PATH)
+        data_loader.translation = TranslationResolver({"Back to Filters": "Wstecz"})
+        templates = PageTemplates(data_loader)
+        ## labels are translated on first use
+        self.assertEqual({}, data_loader.translation.missing_dict)
+        content = templates.render("category_page.html", title="", root_path="", styles_path="", content="")
+        self.assertIn("Wstecz", content)
+        self.assertEqual(templates.labels["prev_label"], "Prev")
+        self.assertEqual({None: {"Prev": 1}}, data_loader.translation.missing_dict)
@@ -0,0 +1,38 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from rankpagegenerator.generator.translation import TranslationResolver, is_url
+
+
+class TranslationResolverTest(unittest.TestCase):
+    def test_translate(self):
+        resolver = TranslationResolver({"Prev": "Wstecz", "category": {"size": "rozmiar"}})
+        self.assertEqual(resolver.translate("Prev"), "Wstecz")
+        self.assertEqual(resolver.translate("size", "category"), "rozmiar")
+        self.assertEqual(resolver.translate("Next"), "Next")
+        self.assertEqual(resolver.translate("color", "category"), "color")
+        self.assertEqual(resolver.translate("color", "category"), "color")
+        self.assertEqual(resolver.translate("https://example.com", "category"), "https://example.com")
+        ## unknown group
+        self.assertEqual(resolver.translate("abc", "other"), "abc")
+
+        self.assertEqual(resolver.missing_dict, {None: {"Next": 1}, "category": {"color": 2}})
+        self.assertEqual(resolver.get_missing_stub(), {"Next": "Next", "category": {"color": "color"}})
+
+    def test_no_translation(self):
+        resolver = TranslationResolver(None)
+        self.assertEqual(resolver.translate("Prev"), "Prev")
+        self.assertEqual(resolver.get_missing_count(), 0)
+
+    def test_is_url(self):
+        self.assertTrue(is_url("https://en.wikipedia.org/wiki/Horse"))
+        self.assertFalse(is_url("en.wikipedia.org"))
+        self.assertFalse(is_url("a://b"))
+        self.assertFalse(is_url(12))
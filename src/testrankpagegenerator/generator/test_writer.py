@@ -0,0 +1,136 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import os
+import gzip
+import tempfile
+import tarfile
+import zipfile
+
+from rankpagegenerator.utils import read_data, write_data
+from rankpagegenerator.generator.writer import (
+    OutputWriter,
+    SubdirWriter,
+    create_writer,
+    get_compressed_extensions,
+    BUILD_MARKER,
+)
+
+
+class OutputWriterTest(unittest.TestCase):
+    def setUp(self):
+        ## Called before testfunction is executed
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.out_dir = os.path.join(self.temp_dir.name, "out")
+
+    def tearDown(self):
+        ## Called after testfunction was executed
+        self.temp_dir.cleanup()
+
+    def test_commit(self):
+        ## output of previous build
+        with OutputWriter(self.out_dir) as writer:
+            writer.write_data("old.html", "old")
+
+        with OutputWriter(self.out_dir) as writer:
+            writer.write_data("index.html", "index")
+            writer.write_data(os.path.join(self.out_dir, "pages", "page.html"), "page")
+            ## output not touched until commit
+            self.assertTrue(os.path.exists(os.path.join(self.out_dir, "old.html")))
+            self.assertFalse(os.path.exists(os.path.join(self.out_dir, "index.html")))
+
+        self.assertEqual(sorted(os.listdir(self.out_dir)), [BUILD_MARKER, "index.html", "pages"])
+        self.assertEqual(read_data(os.path.join(self.out_dir, "pages", "page.html")), "page")
+        self.assertEqual(writer.files_num, 2)
+        self.assertEqual(writer.bytes_num, 9)
+        self.assertEqual(os.listdir(self.temp_dir.name), ["out"])
+
+    def test_abort(self):
+        with OutputWriter(self.out_dir) as writer:
+            writer.write_data("old.html", "old")
+
+        with self.assertRaises(RuntimeError):
+            with OutputWriter(self.out_dir) as writer:
+                writer.write_data("index.html", "index")
+                raise RuntimeError("interrupted")
+
+        self.assertEqual(sorted(os.listdir(self.out_dir)), [BUILD_MARKER, "old.html"])
+        self.assertEqual(os.listdir(self.temp_dir.name), ["out"])
+
+    def test_commit_user_dir(self):
+        ## directory not created by build is not replaced
+        os.makedirs(self.out_dir)
+        write_data(os.path.join(self.out_dir, "user.txt"), "user")
+
+        with OutputWriter(self.out_dir) as writer:
+            writer.write_data("index.html", "index")
+        self.assertFalse(writer.atomic)
+
+        self.assertEqual(sorted(os.listdir(self.out_dir)), ["index.html", "user.txt"])
+        self.assertEqual(os.listdir(self.temp_dir.name), ["out"])
+
+    def test_precompress(self):
+        for _ in range(0, 2):
+            with OutputWriter(self.out_dir, precompress=True) as writer:
+                writer.write_data("index.html", "index")
+                writer.write_bytes("photo.jpg", b"\xff\xd8")
+            self.assertTrue(os.path.isfile(os.path.join(self.out_dir, "index.html.gz")))
+            self.assertFalse(os.path.isfile(os.path.join(self.out_dir, "photo.jpg.gz")))
+            with gzip.open(os.path.join(self.out_dir, "index.html.gz"), "rb") as fp:
+                self.assertEqual(fp.read(), b"index")
+        ## second build reuses compressed file
+        self.assertEqual(writer.compressed_num, 0)
+        self.assertEqual(writer.reused_num, len(get_compressed_extensions()))
+
+    def test_outside(self):
+        with OutputWriter(self.out_dir, atomic=False) as writer:
+            self.assertRaises(ValueError, writer.write_data, "../index.html", "index")
+
+    def test_subdir(self):
+        with OutputWriter(self.out_dir) as writer:
+            writer.write_data("img/photo.jpg", "photo")
+            sub_writer = SubdirWriter(writer, "pl")
+            sub_writer.write_data("index.html", "index")
+            sub_writer.write_data(os.path.join(sub_writer.output_path, "pages", "page.html"), "page")
+            self.assertEqual(sub_writer.get_rel_path("../img/photo.jpg"), os.path.join("img", "photo.jpg"))
+
+        self.assertEqual(sorted(os.listdir(self.out_dir)), [BUILD_MARKER, "img", "pl"])
+        self.assertEqual(read_data(os.path.join(self.out_dir, "pl", "index.html")), "index")
+        self.assertEqual(read_data(os.path.join(self.out_dir, "pl", "pages", "page.html")), "page")
+
+
+class ArchiveWriterTest(unittest.TestCase):
+    def setUp(self):
+        ## Called before testfunction is executed
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        ## Called after testfunction was executed
+        self.temp_dir.cleanup()
+
+    def test_zip(self):
+        archive_path = os.path.join(self.temp_dir.name, "out.zip")
+        with create_writer(None, archive_path) as writer:
+            writer.write_data(os.path.join(writer.output_path, "pages", "page.html"), "page")
+            writer.write_bytes("img/photo.jpg", b"\xff\xd8")
+
+        self.assertEqual(os.listdir(self.temp_dir.name), ["out.zip"])
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertEqual(archive.read("pages/page.html"), b"page")
+            self.assertEqual(archive.getinfo("pages/page.html").compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(archive.getinfo("img/photo.jpg").compress_type, zipfile.ZIP_STORED)
+
+    def test_targz(self):
+        archive_path = os.path.join(self.temp_dir.name, "out.tar.gz")
+        with create_writer(None, archive_path) as writer:
+            writer.write_data("index.html", "index")
+
+        with tarfile.open(archive_path) as archive:
+            self.assertEqual(archive.extractfile("index.html").read(), b"index")
@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+
+from rankpagegenerator.apiserver import LRUCache, RankServer
+
+
+SCRIPT_DIR = os.path.dirname(__file__)
+
+MODEL_PATH = os.path.join(SCRIPT_DIR, os.pardir, os.pardir, "examples", "furniture", "model.xls")
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_evict(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.size(), 2)
+
+
+class RankServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = RankServer(MODEL_PATH, port=0, reload_interval=0)
+
+    def tearDown(self):
+        self.server.http_server.server_close()
+
+    def test_rank(self):
+        status, response = self.server.handle("/rank", "back=yes&_limit=2")
+        self.assertEqual(status, 200)
+        self.assertEqual(response, {"query": {"back": ["yes"]}, "results": [["chair", 100], ["stool", 0]], "total": 3})
+
+        ## normalized query is cached
+        self.server.handle("/rank", "back=yes&back=yes&_limit=2")
+        self.assertEqual(self.server.state.cache.hits, 1)
+
+    def test_category(self):
+        status, response = self.server.handle("/category", "name=back&value=yes")
+        self.assertEqual(status, 200)
+        self.assertEqual(response, {"answers": ["chair"]})
+
+    def test_details(self):
+        rows_list = list(self.server.state.data_loader.iter_model_rows())
+        status, response = self.server.handle("/details", "answer=stool")
+        self.assertEqual(status, 200)
+        self.assertIn(response, rows_list)
+        self.assertEqual(response["name"], ["stool"])
+
+    def test_unknown(self):
+        status, _ = self.server.handle("/unknown")
+        self.assertEqual(status, 404)
+        status, response = self.server.handle("/details", "answer=xxx")
+        self.assertEqual(status, 404)
+        self.assertEqual(response, {"error": "unknown answer: xxx"})
+        status, _ = self.server.handle("/category", "name=back&value=xxx")
+        self.assertEqual(status, 404)
+        status, _ = self.server.handle("/rank", "_limit=abc")
+        self.assertEqual(status, 400)
+
+    def test_internal_error(self):
+        def raise_error():
+            raise RuntimeError("broken model")
+
+        self.server.state.get_values = raise_error
+        with self.assertLogs("rankpagegenerator.apiserver", level="ERROR"):
+            status, response = self.server.handle("/values")
+        self.assertEqual(status, 500)
+        self.assertEqual(response, {"error": "internal server error"})
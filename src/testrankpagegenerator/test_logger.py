@@ -10,6 +10,9 @@ import unittest
 
 import logging
 import io
+import os
+import tempfile
+from logging import handlers
 
 from rankpagegenerator import logger
 
@@ -46,3 +49,34 @@ class LoggerTest(unittest.TestCase):
         self.logger.info("\r\n\r\n\r\n")
         msg = self.buffer.getvalue()
         self.assertEqual(msg, "\r\n\r\n\r\n\n")
+
+    def test_throughput(self):
+        pages_log = logger.ThroughputLogger(self.logger, "pages", interval=3600.0)
+        for _ in range(0, 100):
+            pages_log.add()
+        self.assertEqual(self.buffer.getvalue(), "")
+        pages_log.finish()
+        msg = self.buffer.getvalue()
+        self.assertIn("100 pages written in total", msg)
+        self.assertIn("test_throughput", msg)
+
+    def test_configure_twice(self):
+        root_handlers = list(logging.root.handlers)
+        root_level = logging.root.level
+        stream = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_path = os.path.join(tmp_dir, "log.txt")
+            try:
+                logger.configure(logFile=log_path, logStream=stream)
+                logger.configure(logFile=log_path, logStream=stream)
+                queue_handlers = [item for item in logging.root.handlers if isinstance(item, handlers.QueueHandler)]
+                self.assertEqual(1, len(queue_handlers))
+                logging.getLogger(__name__).info("single record")
+            finally:
+                logger.stop()
+                for handler in list(logging.root.handlers):
+                    logging.root.removeHandler(handler)
+                for handler in root_handlers:
+                    logging.root.addHandler(handler)
+                logging.root.setLevel(root_level)
+        self.assertEqual(1, stream.getvalue().count("single record"))
@@ -0,0 +1,56 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import io
+import os
+import json
+import tempfile
+
+from rankpagegenerator import progress
+
+
+class ProgressReporterTest(unittest.TestCase):
+    def test_summary(self):
+        reporter = progress.ProgressReporter(stream=io.StringIO(), tty=False)
+        with reporter.stage("loading") as stage:
+            stage.add(10)
+        stage = reporter.stage("pages", total=4)
+        for _ in range(0, 4):
+            stage.add()
+        stage.finish()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            summary_path = os.path.join(tmp_dir, "summary.json")
+            reporter.write_summary(summary_path)
+            with open(summary_path, "r", encoding="utf8") as fp:
+                summary_dict = json.load(fp)
+
+        stages_list = summary_dict["stages"]
+        self.assertEqual(["loading", "pages"], [item["name"] for item in stages_list])
+        self.assertEqual(10, stages_list[0]["items"])
+        self.assertEqual(None, stages_list[0]["total"])
+        self.assertEqual(4, stages_list[1]["items"])
+        self.assertEqual(4, stages_list[1]["total"])
+        self.assertIn("items_per_second", stages_list[1])
+
+    def test_tty(self):
+        stream = io.StringIO()
+        reporter = progress.ProgressReporter(stream=stream, tty=True)
+        with reporter.stage("pages", total=10) as stage:
+            stage.add(5)
+            self.assertIn("pages: 5/10 (50%)", stream.getvalue())
+            self.assertIn("ETA", stream.getvalue())
+        ## status line is cleared
+        self.assertTrue(stream.getvalue().endswith("\r\x1b[K"))
+
+    def test_format_duration(self):
+        self.assertEqual("0:00:00", progress.format_duration(0))
+        self.assertEqual("0:01:05", progress.format_duration(65))
+        self.assertEqual("2:00:01", progress.format_duration(7201))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Measures throughput of generation of pages.
+##
+## Synthetic model of given number of rows is stored as spreadsheet file and
+## 'generate' tool is executed on it (without photos). Tool is executed as separate
+## process from sources given by '--srcdir', so the same model can be measured
+## with different revisions of package (e.g. checked out by 'git worktree').
+##
+## Example:
+##     python3 tools/benchpages.py --rows 5000 --repeat 3
+##     python3 tools/benchpages.py --rows 5000 --srcdir /tmp/old-revision/src
+##
+
+import os
+import sys
+import argparse
+import subprocess  # nosec
+import tempfile
+import time
+import random
+
+import pandas
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(SCRIPT_DIR, "..", "src")
+
+
+def write_model(model_path, rows_num, columns_num, values_num):
+    ## sheet containing only data table (first column is answer column),
+    ## categories have 'values_num' values
+    random.seed(0)
+    columns_list = [f"param_{index}" for index in range(0, columns_num)]
+    rows_list = []
+    for row_index in range(0, rows_num):
+        values_list = [f"value_{random.randrange(values_num)}" for _ in columns_list]
+        rows_list.append([f"item_{row_index}"] + values_list)
+    data_frame = pandas.DataFrame(rows_list, columns=["name"] + columns_list)
+    data_frame.to_excel(model_path, index=False)
+
+
+def count_pages(out_dir):
+    pages_num = 0
+    for _root, _dirs, files in os.walk(out_dir):
+        pages_num += len([name for name in files if name.endswith(".html")])
+    return pages_num
+
+
+def measure(src_dir, model_path, out_dir, repeat):
+    ## returns pair: best time of given number of runs, number of generated pages
+    command = [sys.executable, "-m", "rankpagegenerator.main", "generate"]
+    command += ["--data", model_path, "--outdir", out_dir, "--nophotos", "true"]
+    best_time = None
+    for _ in range(0, repeat):
+        start_time = time.perf_counter()
+        subprocess.run(command, cwd=src_dir, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # nosec
+        duration = time.perf_counter() - start_time
+        if best_time is None or duration < best_time:
+            best_time = duration
+    return best_time, count_pages(out_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="measure throughput of generation of pages")
+    parser.add_argument("--rows", type=int, default=2000, help="Number of rows (answers) of model")
+    parser.add_argument("--columns", type=int, default=8, help="Number of categories of model")
+    parser.add_argument("--values", type=int, default=10, help="Number of values of each category")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs (best is taken)")
+    parser.add_argument("--srcdir", default=SRC_DIR, help="Directory of sources of package to measure")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = os.path.join(tmp_dir, "model.xlsx")
+        write_model(model_path, args.rows, args.columns, args.values)
+        out_dir = os.path.join(tmp_dir, "out")
+        duration, pages_num = measure(os.path.abspath(args.srcdir), model_path, out_dir, args.repeat)
+    print(f"rows: {args.rows} pages: {pages_num} time: {duration:.3f}s throughput: {pages_num / duration:.1f} pages/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
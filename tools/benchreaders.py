@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Compares loading time of the same model stored in different formats.
+##
+## Model is converted to Excel (.xlsx, .ods if 'odfpy' is installed) and to directory
+## of section files (CSV, Parquet if 'pyarrow' is installed). Then for each format
+## reading of tables and complete loading of model ('DataLoader') is measured.
+##
+## Example:
+##     python3 tools/benchreaders.py examples/furniture/model.xls --repeat 5
+##
+
+import os
+import sys
+import argparse
+import importlib.util
+import logging
+import tempfile
+import time
+
+import pandas
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "src"))
+
+# pylint: disable=C0413
+from rankpagegenerator.generator.modelreader import (  # noqa: E402
+    create_reader,
+    read_model_tables,
+    write_model_dir,
+    get_excel_engine,
+)
+from rankpagegenerator.generator.dataloader import DataLoader  # noqa: E402
+
+
+def convert_model(model_path, out_dir):
+    ## returns list of pairs [format name, model path]
+    ret_list = [(os.path.splitext(model_path)[1][1:], model_path)]
+
+    ## raw sheet (without converting empty cells), so layout of markers is kept
+    sheet = pandas.read_excel(model_path, sheet_name=0)
+    if not model_path.endswith(".xlsx"):
+        xlsx_path = os.path.join(out_dir, "model.xlsx")
+        sheet.to_excel(xlsx_path, index=False)
+        ret_list.append(("xlsx", xlsx_path))
+    if importlib.util.find_spec("odf") is not None:
+        ods_path = os.path.join(out_dir, "model.ods")
+        sheet.to_excel(ods_path, index=False, engine="odf")
+        ret_list.append(("ods", ods_path))
+
+    tables_dict = read_model_tables(create_reader(model_path))
+    csv_dir = os.path.join(out_dir, "model_csv")
+    write_model_dir(tables_dict, csv_dir, ".csv")
+    ret_list.append(("csv dir", csv_dir))
+    if importlib.util.find_spec("pyarrow") is not None or importlib.util.find_spec("fastparquet") is not None:
+        parquet_dir = os.path.join(out_dir, "model_parquet")
+        write_model_dir(tables_dict, parquet_dir, ".parquet")
+        ret_list.append(("parquet dir", parquet_dir))
+    return ret_list
+
+
+def measure(function, repeat):
+    ## returns best time of given number of runs
+    best_time = None
+    for _ in range(0, repeat):
+        start_time = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start_time
+        if best_time is None or duration < best_time:
+            best_time = duration
+    return best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compare loading time of model formats")
+    parser.add_argument("model", help="Path to model file (Excel)")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs of each measurement (best is taken)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        formats_list = convert_model(args.model, out_dir)
+        print(f"excel engine: {get_excel_engine(args.model) or 'pandas default'}")
+        print(f"{'format':<14} {'tables [s]':>12} {'loader [s]':>12}")
+        for format_name, model_path in formats_list:
+            tables_time = measure(lambda path=model_path: read_model_tables(create_reader(path)), args.repeat)
+            loader_time = measure(lambda path=model_path: DataLoader(path), args.repeat)
+            print(f"{format_name:<14} {tables_time:>12.3f} {loader_time:>12.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())